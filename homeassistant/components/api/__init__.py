@@ -13,6 +13,7 @@ from homeassistant.auth.permissions.const import POLICY_READ
 from homeassistant.bootstrap import DATA_LOGGING
 from homeassistant.components.http import HomeAssistantView
 from homeassistant.const import (
+    CONTENT_TYPE_JSON,
     EVENT_HOMEASSISTANT_STOP,
     EVENT_TIME_CHANGED,
     HTTP_BAD_REQUEST,
@@ -35,7 +36,6 @@ from homeassistant.const import (
 import homeassistant.core as ha
 from homeassistant.exceptions import ServiceNotFound, TemplateError, Unauthorized
 from homeassistant.helpers import template
-from homeassistant.helpers.json import JSONEncoder
 from homeassistant.helpers.network import NoURLAvailableError, get_url
 from homeassistant.helpers.service import async_get_all_descriptions
 from homeassistant.helpers.system_info import async_get_system_info
@@ -120,7 +120,7 @@ class APIEventStream(HomeAssistantView):
             if event.event_type == EVENT_HOMEASSISTANT_STOP:
                 data = stop_obj
             else:
-                data = json.dumps(event, cls=JSONEncoder)
+                data = ha.event_as_dict_json(event)
 
             await to_write.put(data)
 
@@ -225,7 +225,13 @@ class APIStatesView(HomeAssistantView):
             for state in request.app["hass"].states.async_all()
             if entity_perm(state.entity_id, "read")
         ]
-        return self.json(states)
+        # Join the JSON cached on each state instead of serializing all states
+        try:
+            states_json = ", ".join([state.as_dict_json() for state in states])
+        except (ValueError, TypeError):
+            # Serialize the regular way to report the error
+            return self.json(states)
+        return _json_response(f"[{states_json}]")
 
 
 class APIEntityStateView(HomeAssistantView):
@@ -242,9 +248,12 @@ class APIEntityStateView(HomeAssistantView):
             raise Unauthorized(entity_id=entity_id)
 
         state = request.app["hass"].states.get(entity_id)
-        if state:
+        if not state:
+            return self.json_message("Entity not found.", HTTP_NOT_FOUND)
+        try:
+            return _json_response(state.as_dict_json())
+        except (ValueError, TypeError):
             return self.json(state)
-        return self.json_message("Entity not found.", HTTP_NOT_FOUND)
 
     async def post(self, request, entity_id):
         """Update state of entity."""
@@ -433,6 +442,13 @@ class APIErrorLog(HomeAssistantView):
         return web.FileResponse(request.app["hass"].data[DATA_LOGGING])
 
 
+def _json_response(body: str) -> web.Response:
+    """Return a JSON response for an already serialized body."""
+    response = web.Response(body=body.encode("UTF-8"), content_type=CONTENT_TYPE_JSON)
+    response.enable_compression()
+    return response
+
+
 async def async_services_json(hass):
     """Generate services data to JSONify."""
     descriptions = await async_get_all_descriptions(hass)
@@ -46,7 +46,7 @@ from homeassistant.helpers.config_validation import (  # noqa: F401
     PLATFORM_SCHEMA,
     PLATFORM_SCHEMA_BASE,
 )
-from homeassistant.helpers.entity import Entity, entity_sources
+from homeassistant.helpers.entity import Entity, async_write_ha_states, entity_sources
 from homeassistant.helpers.entity_component import EntityComponent
 from homeassistant.helpers.network import get_url
 from homeassistant.helpers.typing import ConfigType
@@ -273,9 +273,8 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     def update_tokens(time: datetime) -> None:
         """Update tokens of the entities."""
         for entity in component.entities:
-            entity = cast(Camera, entity)
-            entity.async_update_token()
-            entity.async_write_ha_state()
+            cast(Camera, entity).async_update_token()
+        async_write_ha_states(hass, component.entities)
 
     hass.helpers.event.async_track_time_interval(update_tokens, TOKEN_CHANGE_INTERVAL)
 
@@ -1,9 +1,13 @@
 """Provide pre-made queries on top of the recorder component."""
 from __future__ import annotations
 
+import asyncio
 from collections.abc import Iterable
+import concurrent.futures
 from datetime import datetime as dt, timedelta
+import json
 import logging
+import threading
 import time
 from typing import cast
 
@@ -24,6 +28,7 @@ from homeassistant.const import (
     CONF_ENTITIES,
     CONF_EXCLUDE,
     CONF_INCLUDE,
+    CONTENT_TYPE_JSON,
     HTTP_BAD_REQUEST,
 )
 from homeassistant.core import HomeAssistant
@@ -33,6 +38,7 @@ from homeassistant.helpers.entityfilter import (
     CONF_ENTITY_GLOBS,
     INCLUDE_EXCLUDE_BASE_FILTER_SCHEMA,
 )
+from homeassistant.helpers.json import json_dumps
 import homeassistant.util.dt as dt_util
 
 # mypy: allow-untyped-defs, no-check-untyped-defs
@@ -42,6 +48,11 @@ _LOGGER = logging.getLogger(__name__)
 DOMAIN = "history"
 CONF_ORDER = "use_include_order"
 
+# Chunks of streamed states read ahead of the client
+STREAM_QUEUE_SIZE = 4
+# Seconds between checks whether a stream was stopped while the queue is full
+STREAM_PUT_TIMEOUT = 1
+
 GLOB_TO_SQL_CHARS = {
     42: "%",  # *
     46: "_",  # .
@@ -195,7 +206,7 @@ class HistoryPeriodView(HomeAssistantView):
 
     async def get(
         self, request: web.Request, datetime: str | None = None
-    ) -> web.Response:
+    ) -> web.StreamResponse:
         """Return history over a period of time."""
         datetime_ = None
         if datetime:
@@ -234,6 +245,7 @@ class HistoryPeriodView(HomeAssistantView):
         )
 
         minimal_response = "minimal_response" in request.query
+        compressed_state_format = "compressed_state_format" in request.query
 
         hass = request.app["hass"]
 
@@ -244,6 +256,44 @@ class HistoryPeriodView(HomeAssistantView):
         ):
             return self.json([])
 
+        # Reordering by the include order needs the full result
+        if "stream" in request.query and not (self.filters and self.use_include_order):
+            response = web.StreamResponse()
+            response.content_type = CONTENT_TYPE_JSON
+            response.enable_compression()
+            await response.prepare(request)
+            queue: asyncio.Queue[bytes | None] = asyncio.Queue(STREAM_QUEUE_SIZE)
+            stop = threading.Event()
+            producer = hass.async_add_executor_job(
+                self._stream_significant_states_json,
+                hass,
+                queue,
+                stop,
+                start_time,
+                end_time,
+                entity_ids,
+                include_start_time_state,
+                significant_changes_only,
+                minimal_response,
+                compressed_state_format,
+            )
+            try:
+                while (chunk := await queue.get()) is not None:
+                    await response.write(chunk)
+                await producer
+                await response.write_eof()
+            except ConnectionResetError:
+                _LOGGER.debug("Client closed the history stream")
+            except asyncio.CancelledError:
+                _LOGGER.debug("History stream was cancelled")
+                raise
+            except (TypeError, ValueError):
+                _LOGGER.exception("Error encoding the history stream")
+                response.force_close()
+            finally:
+                stop.set()
+            return response
+
         return cast(
             web.Response,
             await hass.async_add_executor_job(
@@ -255,6 +305,7 @@ class HistoryPeriodView(HomeAssistantView):
                 include_start_time_state,
                 significant_changes_only,
                 minimal_response,
+                compressed_state_format,
             ),
         )
 
@@ -267,6 +318,7 @@ class HistoryPeriodView(HomeAssistantView):
         include_start_time_state,
         significant_changes_only,
         minimal_response,
+        compressed_state_format,
     ):
         """Fetch significant stats from the database as json."""
         timer_start = time.perf_counter()
@@ -283,13 +335,30 @@ class HistoryPeriodView(HomeAssistantView):
                     include_start_time_state,
                     significant_changes_only,
                     minimal_response,
+                    compressed_state_format,
                 )
             )
 
-        result = list(result.values())
         if _LOGGER.isEnabledFor(logging.DEBUG):
             elapsed = time.perf_counter() - timer_start
-            _LOGGER.debug("Extracted %d states in %fs", sum(map(len, result)), elapsed)
+            _LOGGER.debug(
+                "Extracted states of %d entities in %fs", len(result), elapsed
+            )
+
+        if compressed_state_format:
+            # The compressed format is keyed by entity_id
+            if self.filters and self.use_include_order:
+                result = {
+                    **{
+                        entity_id: result[entity_id]
+                        for entity_id in self.filters.included_entities
+                        if entity_id in result
+                    },
+                    **result,
+                }
+            return self.json(result)
+
+        result = list(result.values())
 
         # Optionally reorder the result to respect the ordering given
         # by any entities explicitly included in the configuration.
@@ -306,6 +375,79 @@ class HistoryPeriodView(HomeAssistantView):
 
         return self.json(result)
 
+    def _stream_significant_states_json(
+        self,
+        hass,
+        queue,
+        stop,
+        start_time,
+        end_time,
+        entity_ids,
+        include_start_time_state,
+        significant_changes_only,
+        minimal_response,
+        compressed_state_format,
+    ):
+        """Put significant states from the database as json on a queue.
+
+        The states of each entity are queued as soon as they are read. The
+        queue is bounded, so the next rows are only fetched once the client
+        accepted most of the data. The queue is ended with None.
+        """
+        timer_start = time.perf_counter()
+
+        def put(data: bytes | None) -> bool:
+            """Queue data, return False if the stream was stopped."""
+            future = asyncio.run_coroutine_threadsafe(queue.put(data), hass.loop)
+            while True:
+                try:
+                    future.result(STREAM_PUT_TIMEOUT)
+                    return True
+                except concurrent.futures.TimeoutError:
+                    if stop.is_set():
+                        future.cancel()
+                        return False
+
+        if compressed_state_format:
+            start, end = b"{", b"}"
+        else:
+            start, end = b"[", b"]"
+
+        count = 0
+        with session_scope(hass=hass) as session:
+            entities_states = (
+                history._iter_significant_states(  # pylint: disable=protected-access
+                    hass,
+                    session,
+                    start_time,
+                    end_time,
+                    entity_ids,
+                    self.filters,
+                    include_start_time_state,
+                    significant_changes_only,
+                    minimal_response,
+                    compressed_state_format,
+                )
+            )
+            try:
+                separator = start
+                for entity_id, states in entities_states:
+                    msg = json_dumps(states, allow_nan=False)
+                    if compressed_state_format:
+                        msg = f"{json.dumps(entity_id)}:{msg}"
+                    if stop.is_set() or not put(separator + msg.encode("UTF-8")):
+                        _LOGGER.debug("Stopped streaming after %d entities", count)
+                        return
+                    separator = b","
+                    count += 1
+                put(start + end if separator == start else end)
+            finally:
+                put(None)
+
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            elapsed = time.perf_counter() - timer_start
+            _LOGGER.debug("Streamed states of %d entities in %fs", count, elapsed)
+
 
 def sqlalchemy_filter_from_include_exclude_conf(conf):
     """Build a sql filter from config."""
@@ -373,17 +515,25 @@ class Filters:
         """Generate the entity filter query."""
         includes = []
         if self.included_domains:
-            includes.append(history_models.States.domain.in_(self.included_domains))
+            includes.append(
+                history_models.StatesMeta.entity_id_in_domains(self.included_domains)
+            )
         if self.included_entities:
-            includes.append(history_models.States.entity_id.in_(self.included_entities))
+            includes.append(
+                history_models.StatesMeta.entity_id.in_(self.included_entities)
+            )
         for glob in self.included_entity_globs:
             includes.append(_glob_to_like(glob))
 
         excludes = []
         if self.excluded_domains:
-            excludes.append(history_models.States.domain.in_(self.excluded_domains))
+            excludes.append(
+                history_models.StatesMeta.entity_id_in_domains(self.excluded_domains)
+            )
         if self.excluded_entities:
-            excludes.append(history_models.States.entity_id.in_(self.excluded_entities))
+            excludes.append(
+                history_models.StatesMeta.entity_id.in_(self.excluded_entities)
+            )
         for glob in self.excluded_entity_globs:
             excludes.append(_glob_to_like(glob))
 
@@ -401,7 +551,9 @@ class Filters:
 
 def _glob_to_like(glob_str):
     """Translate glob to sql."""
-    return history_models.States.entity_id.like(glob_str.translate(GLOB_TO_SQL_CHARS))
+    return history_models.StatesMeta.entity_id.like(
+        glob_str.translate(GLOB_TO_SQL_CHARS)
+    )
 
 
 def _entities_may_have_state_changes_after(
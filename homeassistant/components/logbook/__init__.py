@@ -14,9 +14,12 @@ from homeassistant.components.automation import EVENT_AUTOMATION_TRIGGERED
 from homeassistant.components.history import sqlalchemy_filter_from_include_exclude_conf
 from homeassistant.components.http import HomeAssistantView
 from homeassistant.components.recorder.models import (
+    EventData,
     Events,
+    StateAttributes,
     States,
-    process_timestamp_to_utc_isoformat,
+    StatesMeta,
+    timestamp_to_utc_isoformat,
 )
 from homeassistant.components.recorder.util import session_scope
 from homeassistant.components.script import EVENT_SCRIPT_STARTED
@@ -86,10 +89,17 @@ ALL_EVENT_TYPES = [
     *ALL_EVENT_TYPES_EXCEPT_STATE_CHANGED,
 ]
 
+# Event data and state attributes are stored in shared tables,
+# rows written before they existed still have them inline
+EVENT_DATA_JSON = sqlalchemy.func.coalesce(Events.event_data, EventData.shared_data)
+STATE_ATTRIBUTES_JSON = sqlalchemy.func.coalesce(
+    States.attributes, StateAttributes.shared_attrs
+)
+
 EVENT_COLUMNS = [
     Events.event_type,
-    Events.event_data,
-    Events.time_fired,
+    EVENT_DATA_JSON.label("event_data"),
+    Events.time_fired_ts,
     Events.context_id,
     Events.context_user_id,
     Events.context_parent_id,
@@ -469,7 +479,7 @@ def _get_events(
             query = _apply_events_types_and_states_filter(
                 hass, query, old_state
             ).filter(
-                (States.last_updated == States.last_changed)
+                (States.last_updated_ts == States.last_changed_ts)
                 | (Events.event_type != EVENT_STATE_CHANGED)
             )
             if filters:
@@ -480,7 +490,7 @@ def _get_events(
             if context_id is not None:
                 query = query.filter(Events.context_id == context_id)
 
-        query = query.order_by(Events.time_fired)
+        query = query.order_by(Events.time_fired_ts)
 
         return list(
             humanify(hass, yield_events(query), entity_attr_cache, context_lookup)
@@ -491,9 +501,8 @@ def _generate_events_query(session):
     return session.query(
         *EVENT_COLUMNS,
         States.state,
-        States.entity_id,
-        States.domain,
-        States.attributes,
+        StatesMeta.entity_id,
+        STATE_ATTRIBUTES_JSON.label("attributes"),
     )
 
 
@@ -502,29 +511,45 @@ def _generate_events_query_without_states(session):
         *EVENT_COLUMNS,
         literal(value=None, type_=sqlalchemy.String).label("state"),
         literal(value=None, type_=sqlalchemy.String).label("entity_id"),
-        literal(value=None, type_=sqlalchemy.String).label("domain"),
         literal(value=None, type_=sqlalchemy.Text).label("attributes"),
-    )
+    ).outerjoin(EventData, (Events.data_id == EventData.data_id))
 
 
 def _generate_states_query(session, start_day, end_day, old_state, entity_ids):
     return (
         _generate_events_query(session)
         .outerjoin(Events, (States.event_id == Events.event_id))
+        .outerjoin(EventData, (Events.data_id == EventData.data_id))
+        .outerjoin(StatesMeta, (States.metadata_id == StatesMeta.metadata_id))
+        .outerjoin(
+            StateAttributes, (States.attributes_id == StateAttributes.attributes_id)
+        )
         .outerjoin(old_state, (States.old_state_id == old_state.state_id))
         .filter(_missing_state_matcher(old_state))
         .filter(_continuous_entity_matcher())
-        .filter((States.last_updated > start_day) & (States.last_updated < end_day))
         .filter(
-            (States.last_updated == States.last_changed)
-            & States.entity_id.in_(entity_ids)
+            (States.last_updated_ts > start_day.timestamp())
+            & (States.last_updated_ts < end_day.timestamp())
+        )
+        .filter(
+            (States.last_updated_ts == States.last_changed_ts)
+            & States.metadata_id.in_(
+                session.query(StatesMeta.metadata_id).filter(
+                    StatesMeta.entity_id.in_(entity_ids)
+                )
+            )
         )
     )
 
 
 def _apply_events_types_and_states_filter(hass, query, old_state):
     events_query = (
-        query.outerjoin(States, (Events.event_id == States.event_id))
+        query.outerjoin(EventData, (Events.data_id == EventData.data_id))
+        .outerjoin(States, (Events.event_id == States.event_id))
+        .outerjoin(StatesMeta, (States.metadata_id == StatesMeta.metadata_id))
+        .outerjoin(
+            StateAttributes, (States.attributes_id == StateAttributes.attributes_id)
+        )
         .outerjoin(old_state, (States.old_state_id == old_state.state_id))
         .filter(
             (Events.event_type != EVENT_STATE_CHANGED)
@@ -554,14 +579,15 @@ def _continuous_entity_matcher():
     # ATTR_UNIT_OF_MEASUREMENT as its much faster in sql.
     #
     return sqlalchemy.or_(
-        sqlalchemy.not_(States.domain.in_(CONTINUOUS_DOMAINS)),
-        sqlalchemy.not_(States.attributes.contains(UNIT_OF_MEASUREMENT_JSON)),
+        sqlalchemy.not_(StatesMeta.entity_id_in_domains(CONTINUOUS_DOMAINS)),
+        sqlalchemy.not_(STATE_ATTRIBUTES_JSON.contains(UNIT_OF_MEASUREMENT_JSON)),
     )
 
 
 def _apply_event_time_filter(events_query, start_day, end_day):
     return events_query.filter(
-        (Events.time_fired > start_day) & (Events.time_fired < end_day)
+        (Events.time_fired_ts > start_day.timestamp())
+        & (Events.time_fired_ts < end_day.timestamp())
     )
 
 
@@ -575,7 +601,7 @@ def _apply_event_entity_id_matchers(events_query, entity_ids):
     return events_query.filter(
         sqlalchemy.or_(
             *[
-                Events.event_data.contains(ENTITY_ID_JSON_TEMPLATE.format(entity_id))
+                EVENT_DATA_JSON.contains(ENTITY_ID_JSON_TEMPLATE.format(entity_id))
                 for entity_id in entity_ids
             ]
         )
@@ -703,11 +729,11 @@ class LazyEventPartialState:
         self.event_type = self._row.event_type
         self.entity_id = self._row.entity_id
         self.state = self._row.state
-        self.domain = self._row.domain
+        self.domain = self.entity_id and split_entity_id(self.entity_id)[0]
         self.context_id = self._row.context_id
         self.context_user_id = self._row.context_user_id
         self.context_parent_id = self._row.context_parent_id
-        self.time_fired_minute = self._row.time_fired.minute
+        self.time_fired_minute = int(self._row.time_fired_ts // 60 % 60)
 
     @property
     def attributes_icon(self):
@@ -763,9 +789,12 @@ class LazyEventPartialState:
     def time_fired_isoformat(self):
         """Time event was fired in utc isoformat."""
         if not self._time_fired_isoformat:
-            self._time_fired_isoformat = process_timestamp_to_utc_isoformat(
-                self._row.time_fired or dt_util.utcnow()
-            )
+            if self._row.time_fired_ts is None:
+                self._time_fired_isoformat = dt_util.utcnow().isoformat()
+            else:
+                self._time_fired_isoformat = timestamp_to_utc_isoformat(
+                    self._row.time_fired_ts
+                )
 
         return self._time_fired_isoformat
 
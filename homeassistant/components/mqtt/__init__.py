@@ -2,12 +2,13 @@
 from __future__ import annotations
 
 import asyncio
-from functools import lru_cache, partial, wraps
+from functools import partial, wraps
 import inspect
 from itertools import groupby
 import logging
 from operator import attrgetter
 import ssl
+import threading
 import time
 from typing import Any, Awaitable, Callable, Union, cast
 import uuid
@@ -73,11 +74,13 @@ from .const import (
     PROTOCOL_311,
 )
 from .discovery import LAST_DISCOVERY
+from .matcher import TopicMatcher
 from .models import (
     AsyncMessageCallbackType,
     Message,
     MessageCallbackType,
     PublishPayloadType,
+    SharedPayload,
 )
 from .util import _VALID_QOS_SCHEMA, valid_publish_topic, valid_subscribe_topic
 
@@ -90,6 +93,7 @@ SERVICE_DUMP = "dump"
 
 CONF_DISCOVERY_PREFIX = "discovery_prefix"
 CONF_KEEPALIVE = "keepalive"
+CONF_MESSAGE_BATCH_LATENCY = "message_batch_latency"
 CONF_CERTIFICATE = "certificate"
 CONF_CLIENT_KEY = "client_key"
 CONF_CLIENT_CERT = "client_cert"
@@ -103,6 +107,7 @@ PROTOCOL_31 = "3.1"
 
 DEFAULT_PORT = 1883
 DEFAULT_KEEPALIVE = 60
+DEFAULT_MESSAGE_BATCH_LATENCY = 0
 DEFAULT_PROTOCOL = PROTOCOL_311
 DEFAULT_TLS_PROTOCOL = "auto"
 
@@ -170,6 +175,10 @@ CONFIG_SCHEMA = vol.Schema(
                     vol.Optional(CONF_KEEPALIVE, default=DEFAULT_KEEPALIVE): vol.All(
                         vol.Coerce(int), vol.Range(min=15)
                     ),
+                    vol.Optional(
+                        CONF_MESSAGE_BATCH_LATENCY,
+                        default=DEFAULT_MESSAGE_BATCH_LATENCY,
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0, max=1)),
                     vol.Optional(CONF_BROKER): cv.string,
                     vol.Optional(CONF_PORT, default=DEFAULT_PORT): cv.port,
                     vol.Optional(CONF_USERNAME): cv.string,
@@ -414,6 +423,7 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     websocket_api.async_register_command(hass, websocket_subscribe)
     websocket_api.async_register_command(hass, websocket_remove_device)
     websocket_api.async_register_command(hass, websocket_mqtt_info)
+    websocket_api.async_register_command(hass, websocket_message_batch_stats)
 
     if conf is None:
         # If we have a config entry, setup is done by that config entry.
@@ -553,12 +563,43 @@ class Subscription:
     """Class to hold data about an active subscription."""
 
     topic: str = attr.ib()
-    matcher: Any = attr.ib()
     job: HassJob = attr.ib()
     qos: int = attr.ib(default=0)
     encoding: str | None = attr.ib(default="utf-8")
 
 
+@attr.s(slots=True)
+class MessageBatchStats:
+    """Class to hold the sizes of the message batches handed to the event loop."""
+
+    batches: int = attr.ib(default=0)
+    messages: int = attr.ib(default=0)
+    last_batch_size: int = attr.ib(default=0)
+    max_batch_size: int = attr.ib(default=0)
+
+    @property
+    def average_batch_size(self) -> float:
+        """Return the average number of messages per batch."""
+        return self.messages / self.batches if self.batches else 0
+
+    def record(self, size: int) -> None:
+        """Record a batch of messages."""
+        self.batches += 1
+        self.messages += size
+        self.last_batch_size = size
+        self.max_batch_size = max(self.max_batch_size, size)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a dictionary version of the batch statistics."""
+        return {
+            "batches": self.batches,
+            "messages": self.messages,
+            "last_batch_size": self.last_batch_size,
+            "max_batch_size": self.max_batch_size,
+            "average_batch_size": self.average_batch_size,
+        }
+
+
 class MQTT:
     """Home Assistant MQTT client."""
 
@@ -577,6 +618,7 @@ class MQTT:
         self.config_entry = config_entry
         self.conf = conf
         self.subscriptions: list[Subscription] = []
+        self._matcher = TopicMatcher()
         self.connected = False
         self._ha_started = asyncio.Event()
         self._last_subscribe = time.time()
@@ -585,6 +627,12 @@ class MQTT:
 
         self._pending_operations: dict[str, asyncio.Event] = {}
 
+        # Messages received on the paho thread waiting to be handled in the loop
+        self._pending_messages: list[Any] = []
+        self._pending_messages_lock = threading.Lock()
+        self._flush_scheduled = False
+        self.message_batch_stats = MessageBatchStats()
+
         if self.hass.state == CoreState.running:
             self._ha_started.set()
         else:
@@ -752,11 +800,9 @@ class MQTT:
         if not isinstance(topic, str):
             raise HomeAssistantError("Topic needs to be a string!")
 
-        subscription = Subscription(
-            topic, _matcher_for_topic(topic), HassJob(msg_callback), qos, encoding
-        )
+        subscription = Subscription(topic, HassJob(msg_callback), qos, encoding)
         self.subscriptions.append(subscription)
-        self._matching_subscriptions.cache_clear()
+        self._matcher.add(topic, subscription)
 
         # Only subscribe if currently connected.
         if self.connected:
@@ -769,7 +815,7 @@ class MQTT:
             if subscription not in self.subscriptions:
                 raise HomeAssistantError("Can't remove subscription twice")
             self.subscriptions.remove(subscription)
-            self._matching_subscriptions.cache_clear()
+            self._matcher.remove(topic, subscription)
 
             if any(other.topic == topic for other in self.subscriptions):
                 # Other subscriptions on topic remaining - don't unsubscribe.
@@ -859,16 +905,50 @@ class MQTT:
             )
 
     def _mqtt_on_message(self, _mqttc, _userdata, msg) -> None:
-        """Message received callback."""
-        self.hass.add_job(self._mqtt_handle_message, msg)
+        """Message received callback.
+
+        Messages are collected and handed to the event loop in batches, so
+        the loop is only woken up once for all messages received until the
+        batch is handled.
+        """
+        with self._pending_messages_lock:
+            self._pending_messages.append(msg)
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+
+        self.hass.loop.call_soon_threadsafe(self._async_schedule_message_flush)
 
-    @lru_cache(2048)
-    def _matching_subscriptions(self, topic):
-        subscriptions = []
-        for subscription in self.subscriptions:
-            if subscription.matcher(topic):
-                subscriptions.append(subscription)
-        return subscriptions
+    @callback
+    def _async_schedule_message_flush(self) -> None:
+        """Schedule handling the pending messages."""
+        latency = self.conf.get(
+            CONF_MESSAGE_BATCH_LATENCY, DEFAULT_MESSAGE_BATCH_LATENCY
+        )
+        if latency:
+            self.hass.loop.call_later(latency, self._async_flush_messages)
+        else:
+            self._async_flush_messages()
+
+    @callback
+    def _async_flush_messages(self) -> None:
+        """Handle the messages received since the last batch."""
+        with self._pending_messages_lock:
+            messages = self._pending_messages
+            self._pending_messages = []
+            self._flush_scheduled = False
+
+        self.message_batch_stats.record(len(messages))
+
+        for msg in messages:
+            try:
+                self._mqtt_handle_message(msg)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Error handling message on %s", msg.topic)
+
+    def _matching_subscriptions(self, topic: str) -> list[Subscription]:
+        """Return the subscriptions matching a topic."""
+        return self._matcher.match(topic)
 
     @callback
     def _mqtt_handle_message(self, msg) -> None:
@@ -881,32 +961,38 @@ class MQTT:
         timestamp = dt_util.utcnow()
 
         subscriptions = self._matching_subscriptions(msg.topic)
+        # The payload is decoded once per encoding and shared by the subscribers
+        shared_payloads: dict[str | None, SharedPayload | None] = {}
 
         for subscription in subscriptions:
 
-            payload: SubscribePayloadType = msg.payload
-            if subscription.encoding is not None:
-                try:
-                    payload = msg.payload.decode(subscription.encoding)
-                except (AttributeError, UnicodeDecodeError):
-                    _LOGGER.warning(
-                        "Can't decode payload %s on %s with encoding %s (for %s)",
-                        msg.payload[0:8192],
-                        msg.topic,
-                        subscription.encoding,
-                        subscription.job,
-                    )
-                    continue
+            if subscription.encoding in shared_payloads:
+                shared_payload = shared_payloads[subscription.encoding]
+            else:
+                shared_payload = shared_payloads[
+                    subscription.encoding
+                ] = _decode_payload(msg, subscription.encoding)
+
+            if shared_payload is None:
+                _LOGGER.warning(
+                    "Can't decode payload %s on %s with encoding %s (for %s)",
+                    msg.payload[0:8192],
+                    msg.topic,
+                    subscription.encoding,
+                    subscription.job,
+                )
+                continue
 
             self.hass.async_run_hass_job(
                 subscription.job,
                 Message(
                     msg.topic,
-                    payload,
+                    shared_payload.payload,
                     msg.qos,
                     msg.retain,
                     subscription.topic,
                     timestamp,
+                    shared_payload,
                 ),
             )
 
@@ -969,6 +1055,17 @@ class MQTT:
             )
 
 
+def _decode_payload(msg, encoding: str | None) -> SharedPayload | None:
+    """Decode the payload of a received message, return None if that fails."""
+    payload: SubscribePayloadType = msg.payload
+    if encoding is not None:
+        try:
+            payload = msg.payload.decode(encoding)
+        except (AttributeError, UnicodeDecodeError):
+            return None
+    return SharedPayload(payload)
+
+
 def _raise_on_error(result_code: int | None) -> None:
     """Raise error if error result."""
     # pylint: disable=import-outside-toplevel
@@ -980,16 +1077,6 @@ def _raise_on_error(result_code: int | None) -> None:
         )
 
 
-def _matcher_for_topic(subscription: str) -> Any:
-    # pylint: disable=import-outside-toplevel
-    from paho.mqtt.matcher import MQTTMatcher
-
-    matcher = MQTTMatcher()
-    matcher[subscription] = True
-
-    return lambda topic: next(matcher.iter_match(topic), False)
-
-
 @websocket_api.websocket_command(
     {vol.Required("type"): "mqtt/device/debug_info", vol.Required("device_id"): str}
 )
@@ -1002,6 +1089,18 @@ async def websocket_mqtt_info(hass, connection, msg):
     connection.send_result(msg["id"], mqtt_info)
 
 
+@websocket_api.websocket_command({vol.Required("type"): "mqtt/message_batch_stats"})
+@callback
+def websocket_message_batch_stats(hass, connection, msg):
+    """Get the sizes of the message batches handed to the event loop."""
+    if not connection.user.is_admin:
+        raise Unauthorized
+
+    connection.send_result(
+        msg["id"], hass.data[DATA_MQTT].message_batch_stats.as_dict()
+    )
+
+
 @websocket_api.websocket_command(
     {vol.Required("type"): "mqtt/device/remove", vol.Required("device_id"): str}
 )
@@ -85,7 +85,9 @@ class MqttDeviceTracker(MqttEntity, TrackerEntity):
             payload = msg.payload
             value_template = self._config.get(CONF_VALUE_TEMPLATE)
             if value_template is not None:
-                payload = value_template.async_render_with_possible_json_value(payload)
+                payload = value_template.async_render_with_possible_json_value(
+                    payload, parse_json=msg.payload_json
+                )
             if payload == self._config[CONF_PAYLOAD_HOME]:
                 self._location_name = STATE_HOME
             elif payload == self._config[CONF_PAYLOAD_NOT_HOME]:
@@ -159,7 +159,9 @@ class MqttLightTemplate(MqttEntity, LightEntity, RestoreEntity):
             """Handle new MQTT messages."""
             state = self._templates[
                 CONF_STATE_TEMPLATE
-            ].async_render_with_possible_json_value(msg.payload)
+            ].async_render_with_possible_json_value(
+                msg.payload, parse_json=msg.payload_json
+            )
             if state == STATE_ON:
                 self._state = True
             elif state == STATE_OFF:
@@ -172,7 +174,9 @@ class MqttLightTemplate(MqttEntity, LightEntity, RestoreEntity):
                     self._brightness = int(
                         self._templates[
                             CONF_BRIGHTNESS_TEMPLATE
-                        ].async_render_with_possible_json_value(msg.payload)
+                        ].async_render_with_possible_json_value(
+                            msg.payload, parse_json=msg.payload_json
+                        )
                     )
                 except ValueError:
                     _LOGGER.warning("Invalid brightness value received")
@@ -182,7 +186,9 @@ class MqttLightTemplate(MqttEntity, LightEntity, RestoreEntity):
                     self._color_temp = int(
                         self._templates[
                             CONF_COLOR_TEMP_TEMPLATE
-                        ].async_render_with_possible_json_value(msg.payload)
+                        ].async_render_with_possible_json_value(
+                            msg.payload, parse_json=msg.payload_json
+                        )
                     )
                 except ValueError:
                     _LOGGER.warning("Invalid color temperature value received")
@@ -196,17 +202,23 @@ class MqttLightTemplate(MqttEntity, LightEntity, RestoreEntity):
                     red = int(
                         self._templates[
                             CONF_RED_TEMPLATE
-                        ].async_render_with_possible_json_value(msg.payload)
+                        ].async_render_with_possible_json_value(
+                            msg.payload, parse_json=msg.payload_json
+                        )
                     )
                     green = int(
                         self._templates[
                             CONF_GREEN_TEMPLATE
-                        ].async_render_with_possible_json_value(msg.payload)
+                        ].async_render_with_possible_json_value(
+                            msg.payload, parse_json=msg.payload_json
+                        )
                     )
                     blue = int(
                         self._templates[
                             CONF_BLUE_TEMPLATE
-                        ].async_render_with_possible_json_value(msg.payload)
+                        ].async_render_with_possible_json_value(
+                            msg.payload, parse_json=msg.payload_json
+                        )
                     )
                     self._hs = color_util.color_RGB_to_hs(red, green, blue)
                 except ValueError:
@@ -217,7 +229,9 @@ class MqttLightTemplate(MqttEntity, LightEntity, RestoreEntity):
                     self._white_value = int(
                         self._templates[
                             CONF_WHITE_VALUE_TEMPLATE
-                        ].async_render_with_possible_json_value(msg.payload)
+                        ].async_render_with_possible_json_value(
+                            msg.payload, parse_json=msg.payload_json
+                        )
                     )
                 except ValueError:
                     _LOGGER.warning("Invalid white value received")
@@ -225,7 +239,9 @@ class MqttLightTemplate(MqttEntity, LightEntity, RestoreEntity):
             if self._templates[CONF_EFFECT_TEMPLATE] is not None:
                 effect = self._templates[
                     CONF_EFFECT_TEMPLATE
-                ].async_render_with_possible_json_value(msg.payload)
+                ].async_render_with_possible_json_value(
+                    msg.payload, parse_json=msg.payload_json
+                )
 
                 if effect in self._config.get(CONF_EFFECT_LIST):
                     self._effect = effect
@@ -0,0 +1,109 @@
+"""Match MQTT topics against subscribed topic filters."""
+from __future__ import annotations
+
+from operator import itemgetter
+from typing import Any
+
+MULTI_LEVEL_WILDCARD = "#"
+SINGLE_LEVEL_WILDCARD = "+"
+TOPIC_LEVEL_SEPARATOR = "/"
+
+
+class _TopicNode:
+    """A level in the topic filter trie."""
+
+    __slots__ = ("children", "values")
+
+    def __init__(self) -> None:
+        """Initialize the node."""
+        self.children: dict[str, _TopicNode] = {}
+        self.values: list[tuple[int, Any]] = []
+
+
+class TopicMatcher:
+    """Trie of topic filters to find the values subscribed to a topic.
+
+    Every topic filter is split in levels that are stored as a path in the
+    trie, so finding the matches for a topic only walks the levels of that
+    topic, regardless of the number of filters.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the matcher."""
+        self._root = _TopicNode()
+        self._sequence = 0
+
+    def add(self, topic_filter: str, value: Any) -> None:
+        """Add a value for a topic filter."""
+        node = self._root
+        for level in topic_filter.split(TOPIC_LEVEL_SEPARATOR):
+            node = node.children.setdefault(level, _TopicNode())
+        self._sequence += 1
+        node.values.append((self._sequence, value))
+
+    def remove(self, topic_filter: str, value: Any) -> None:
+        """Remove a value for a topic filter, raises KeyError if it is unknown."""
+        path = [self._root]
+        levels = topic_filter.split(TOPIC_LEVEL_SEPARATOR)
+        for level in levels:
+            node = path[-1].children.get(level)
+            if node is None:
+                raise KeyError(topic_filter)
+            path.append(node)
+
+        node = path[-1]
+        for idx, (_, existing) in enumerate(node.values):
+            if existing is value:
+                del node.values[idx]
+                break
+        else:
+            raise KeyError(topic_filter)
+
+        # Prune the levels that no longer lead to any value
+        for level, parent in zip(reversed(levels), reversed(path[:-1])):
+            node = parent.children[level]
+            if node.values or node.children:
+                break
+            del parent.children[level]
+
+    def match(self, topic: str) -> list[Any]:
+        """Return the values matching a topic, in the order they were added."""
+        matches: list[tuple[int, Any]] = []
+        self._match(
+            self._root,
+            topic.split(TOPIC_LEVEL_SEPARATOR),
+            0,
+            # Topics starting with $ do not match wildcards on the first level
+            not topic.startswith("$"),
+            matches,
+        )
+        if len(matches) > 1:
+            matches.sort(key=itemgetter(0))
+        return [value for _, value in matches]
+
+    def _match(
+        self,
+        node: _TopicNode,
+        levels: list[str],
+        idx: int,
+        wildcards: bool,
+        matches: list[tuple[int, Any]],
+    ) -> None:
+        """Collect the matches below a node for the levels from idx on."""
+        if wildcards:
+            multi = node.children.get(MULTI_LEVEL_WILDCARD)
+            if multi is not None:
+                matches.extend(multi.values)
+
+        if idx == len(levels):
+            matches.extend(node.values)
+            return
+
+        child = node.children.get(levels[idx])
+        if child is not None:
+            self._match(child, levels, idx + 1, True, matches)
+
+        if wildcards:
+            child = node.children.get(SINGLE_LEVEL_WILDCARD)
+            if child is not None:
+                self._match(child, levels, idx + 1, True, matches)
@@ -225,7 +225,10 @@ class MqttAttributes(Entity):
             try:
                 payload = msg.payload
                 if attr_tpl is not None:
-                    payload = attr_tpl.async_render_with_possible_json_value(payload)
+                    payload = attr_tpl.async_render_with_possible_json_value(
+                        payload, parse_json=msg.payload_json
+                    )
+                # The attributes keep the parsed payload, it is not shared
                 json_dict = json.loads(payload) if isinstance(payload, str) else None
                 if isinstance(json_dict, dict):
                     filtered_dict = {
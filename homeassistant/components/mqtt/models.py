@@ -2,12 +2,45 @@
 from __future__ import annotations
 
 import datetime as dt
-from typing import Awaitable, Callable, Union
+import json
+from typing import Any, Awaitable, Callable, Union
 
 import attr
 
 PublishPayloadType = Union[str, bytes, int, float, None]
 
+_UNPARSED = object()
+_INVALID_JSON = object()
+
+
+class SharedPayload:
+    """Payload of a received message shared by all its subscribers.
+
+    Subscriptions using the same encoding share the decoded payload, which is
+    only parsed as JSON once, when the first subscriber asks for it.
+    """
+
+    __slots__ = ("payload", "_json")
+
+    def __init__(self, payload: PublishPayloadType) -> None:
+        """Initialize the shared payload."""
+        self.payload = payload
+        self._json: Any = _UNPARSED
+
+    def json(self) -> Any:
+        """Return the payload parsed as JSON.
+
+        Raises ValueError if the payload is not valid JSON.
+        """
+        if self._json is _UNPARSED:
+            try:
+                self._json = json.loads(self.payload)  # type: ignore[arg-type]
+            except (ValueError, TypeError):
+                self._json = _INVALID_JSON
+        if self._json is _INVALID_JSON:
+            raise ValueError("Payload is not valid JSON")
+        return self._json
+
 
 @attr.s(slots=True, frozen=True)
 class Message:
@@ -19,6 +52,25 @@ class Message:
     retain: bool = attr.ib()
     subscribed_topic: str | None = attr.ib(default=None)
     timestamp: dt.datetime | None = attr.ib(default=None)
+    shared_payload: SharedPayload | None = attr.ib(default=None, eq=False, repr=False)
+
+    def payload_json(self) -> Any:
+        """Return the payload parsed as JSON.
+
+        The result is shared with the other subscribers of the message, it
+        must only be read. Use copy_payload_json to keep or modify it.
+        Raises ValueError if the payload is not valid JSON.
+        """
+        if self.shared_payload is None:
+            return json.loads(self.payload)  # type: ignore[arg-type]
+        return self.shared_payload.json()
+
+    def copy_payload_json(self) -> Any:
+        """Return the payload parsed as JSON, owned by the caller.
+
+        Raises ValueError if the payload is not valid JSON.
+        """
+        return json.loads(self.payload)  # type: ignore[arg-type]
 
 
 AsyncMessageCallbackType = Callable[[Message], Awaitable[None]]
@@ -136,7 +136,9 @@ class MqttNumber(MqttEntity, NumberEntity, RestoreEntity):
             payload = msg.payload
             value_template = self._config.get(CONF_VALUE_TEMPLATE)
             if value_template is not None:
-                payload = value_template.async_render_with_possible_json_value(payload)
+                payload = value_template.async_render_with_possible_json_value(
+                    payload, parse_json=msg.payload_json
+                )
             try:
                 if payload.isnumeric():
                     num_value = int(payload)
@@ -124,7 +124,9 @@ class MqttSelect(MqttEntity, SelectEntity, RestoreEntity):
             payload = msg.payload
             value_template = self._config.get(CONF_VALUE_TEMPLATE)
             if value_template is not None:
-                payload = value_template.async_render_with_possible_json_value(payload)
+                payload = value_template.async_render_with_possible_json_value(
+                    payload, parse_json=msg.payload_json
+                )
 
             if payload not in self.options:
                 _LOGGER.error(
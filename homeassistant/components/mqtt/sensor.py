@@ -157,6 +157,7 @@ class MqttSensor(MqttEntity, SensorEntity):
                     payload,
                     self._state,
                     variables=variables,
+                    parse_json=msg.payload_json,
                 )
             self._state = payload
             self.async_write_ha_state()
@@ -180,6 +181,7 @@ class MqttSensor(MqttEntity, SensorEntity):
                     payload,
                     self._state,
                     variables=variables,
+                    parse_json=msg.payload_json,
                 )
             if not payload:
                 _LOGGER.debug("Ignoring empty last_reset message from '%s'", msg.topic)
@@ -1,6 +1,5 @@
 """Offer MQTT listening automation rules."""
 from contextlib import suppress
-import json
 import logging
 
 import voluptuous as vol
@@ -83,7 +82,7 @@ async def async_attach_trigger(hass, config, action, automation_info):
             }
 
             with suppress(ValueError):
-                data["payload_json"] = json.loads(mqttmsg.payload)
+                data["payload_json"] = mqttmsg.copy_payload_json()
 
             hass.async_run_hass_job(job, {"trigger": data})
 
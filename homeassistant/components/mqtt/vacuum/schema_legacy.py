@@ -250,7 +250,9 @@ class MqttVacuum(MqttEntity, VacuumEntity):
             ):
                 battery_level = self._templates[
                     CONF_BATTERY_LEVEL_TEMPLATE
-                ].async_render_with_possible_json_value(msg.payload, error_value=None)
+                ].async_render_with_possible_json_value(
+                    msg.payload, error_value=None, parse_json=msg.payload_json
+                )
                 if battery_level:
                     self._battery_level = int(battery_level)
 
@@ -260,7 +262,9 @@ class MqttVacuum(MqttEntity, VacuumEntity):
             ):
                 charging = self._templates[
                     CONF_CHARGING_TEMPLATE
-                ].async_render_with_possible_json_value(msg.payload, error_value=None)
+                ].async_render_with_possible_json_value(
+                    msg.payload, error_value=None, parse_json=msg.payload_json
+                )
                 if charging:
                     self._charging = cv.boolean(charging)
 
@@ -270,7 +274,9 @@ class MqttVacuum(MqttEntity, VacuumEntity):
             ):
                 cleaning = self._templates[
                     CONF_CLEANING_TEMPLATE
-                ].async_render_with_possible_json_value(msg.payload, error_value=None)
+                ].async_render_with_possible_json_value(
+                    msg.payload, error_value=None, parse_json=msg.payload_json
+                )
                 if cleaning:
                     self._cleaning = cv.boolean(cleaning)
 
@@ -280,7 +286,9 @@ class MqttVacuum(MqttEntity, VacuumEntity):
             ):
                 docked = self._templates[
                     CONF_DOCKED_TEMPLATE
-                ].async_render_with_possible_json_value(msg.payload, error_value=None)
+                ].async_render_with_possible_json_value(
+                    msg.payload, error_value=None, parse_json=msg.payload_json
+                )
                 if docked:
                     self._docked = cv.boolean(docked)
 
@@ -290,7 +298,9 @@ class MqttVacuum(MqttEntity, VacuumEntity):
             ):
                 error = self._templates[
                     CONF_ERROR_TEMPLATE
-                ].async_render_with_possible_json_value(msg.payload, error_value=None)
+                ].async_render_with_possible_json_value(
+                    msg.payload, error_value=None, parse_json=msg.payload_json
+                )
                 if error is not None:
                     self._error = cv.string(error)
 
@@ -312,7 +322,9 @@ class MqttVacuum(MqttEntity, VacuumEntity):
             ):
                 fan_speed = self._templates[
                     CONF_FAN_SPEED_TEMPLATE
-                ].async_render_with_possible_json_value(msg.payload, error_value=None)
+                ].async_render_with_possible_json_value(
+                    msg.payload, error_value=None, parse_json=msg.payload_json
+                )
                 if fan_speed:
                     self._fan_speed = fan_speed
 
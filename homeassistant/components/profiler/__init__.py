@@ -18,8 +18,10 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_SCAN_INTERVAL, CONF_TYPE
 from homeassistant.core import HomeAssistant, ServiceCall
 import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.entity_platform import DATA_ENTITY_PLATFORM
 from homeassistant.helpers.event import async_track_time_interval
 from homeassistant.helpers.service import async_register_admin_service
+from homeassistant.helpers.template import filter_cache_info
 
 from .const import DOMAIN
 
@@ -30,6 +32,8 @@ SERVICE_STOP_LOG_OBJECTS = "stop_log_objects"
 SERVICE_DUMP_LOG_OBJECTS = "dump_log_objects"
 SERVICE_LOG_THREAD_FRAMES = "log_thread_frames"
 SERVICE_LOG_EVENT_LOOP_SCHEDULED = "log_event_loop_scheduled"
+SERVICE_LOG_TEMPLATE_CACHE_STATS = "log_template_cache_stats"
+SERVICE_LOG_POLLING_STATS = "log_polling_stats"
 
 
 SERVICES = (
@@ -40,6 +44,8 @@ SERVICES = (
     SERVICE_DUMP_LOG_OBJECTS,
     SERVICE_LOG_THREAD_FRAMES,
     SERVICE_LOG_EVENT_LOOP_SCHEDULED,
+    SERVICE_LOG_TEMPLATE_CACHE_STATS,
+    SERVICE_LOG_POLLING_STATS,
 )
 
 DEFAULT_SCAN_INTERVAL = timedelta(seconds=30)
@@ -128,6 +134,28 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             arepr.max_string = original_maxstring
             arepr.max_other = original_maxother
 
+    async def _async_log_template_cache_stats(call: ServiceCall) -> None:
+        """Log the hits, misses and size of the template filter caches."""
+        for name, info in filter_cache_info().items():
+            _LOGGER.critical("Template %s cache: %s", name, info)
+
+    async def _async_log_polling_stats(call: ServiceCall) -> None:
+        """Log the updates, overruns and lag of the polling entity platforms."""
+        for platforms in hass.data.get(DATA_ENTITY_PLATFORM, {}).values():
+            for platform in platforms:
+                stats = platform.polling_stats
+                if not stats.updates and not stats.overruns:
+                    continue
+                _LOGGER.critical(
+                    "Polling %s.%s: updates=%s overruns=%s average_lag=%.3fs max_lag=%.3fs",
+                    platform.domain,
+                    platform.platform_name,
+                    stats.updates,
+                    stats.overruns,
+                    stats.average_lag,
+                    stats.max_lag,
+                )
+
     async_register_admin_service(
         hass,
         DOMAIN,
@@ -191,6 +219,20 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         _async_dump_scheduled,
     )
 
+    async_register_admin_service(
+        hass,
+        DOMAIN,
+        SERVICE_LOG_TEMPLATE_CACHE_STATS,
+        _async_log_template_cache_stats,
+    )
+
+    async_register_admin_service(
+        hass,
+        DOMAIN,
+        SERVICE_LOG_POLLING_STATS,
+        _async_log_polling_stats,
+    )
+
     return True
 
 
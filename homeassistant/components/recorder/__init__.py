@@ -11,7 +11,7 @@ import threading
 import time
 from typing import Any, Callable, NamedTuple
 
-from sqlalchemy import create_engine, event as sqlalchemy_event, exc, select
+from sqlalchemy import create_engine, event as sqlalchemy_event, exc, func, select
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import scoped_session, sessionmaker
 from sqlalchemy.pool import StaticPool
@@ -48,13 +48,35 @@ from homeassistant.helpers.typing import ConfigType
 from homeassistant.loader import bind_hass
 import homeassistant.util.dt as dt_util
 
-from . import history, migration, purge, statistics
-from .const import CONF_DB_INTEGRITY_CHECK, DATA_INSTANCE, DOMAIN, SQLITE_URL_PREFIX
-from .models import Base, Events, RecorderRuns, States
+from . import history, migration, purge, statistics, websocket_api
+from .const import (
+    CONF_DB_INTEGRITY_CHECK,
+    DATA_INSTANCE,
+    DOMAIN,
+    MAX_BIND_VARS,
+    SQLITE_URL_PREFIX,
+)
+from .history_cache import HistoryCache
+from .models import (
+    Base,
+    EventData,
+    Events,
+    LatestStates,
+    RecorderRuns,
+    StateAttributes,
+    States,
+    StatesMeta,
+    hash_shared_json,
+    latest_states_bucket,
+    process_timestamp,
+)
 from .pool import RecorderPool
 from .util import (
+    LRU,
+    PrimaryKeyAllocator,
     dburl_to_path,
     end_incomplete_runs,
+    insert_row,
     move_away_broken_database,
     perodic_db_cleanups,
     session_scope,
@@ -75,6 +97,16 @@ ATTR_APPLY_FILTER = "apply_filter"
 
 MAX_QUEUE_BACKLOG = 30000
 
+# Dialects where the recorder allocates primary keys itself so
+# rows can be written with executemany
+BULK_INSERT_DIALECTS = {"sqlite", "mysql", "postgresql"}
+
+# The number of event data and state attributes ids to keep in memory
+EVENT_DATA_ID_CACHE_SIZE = 2048
+STATE_ATTRIBUTES_ID_CACHE_SIZE = 2048
+# The number of states meta ids to keep in memory, enough for all entities
+STATES_META_ID_CACHE_SIZE = 8192
+
 SERVICE_PURGE_SCHEMA = vol.Schema(
     {
         vol.Optional(ATTR_KEEP_DAYS): cv.positive_int,
@@ -103,6 +135,8 @@ DEFAULT_DB_INTEGRITY_CHECK = True
 DEFAULT_DB_MAX_RETRIES = 10
 DEFAULT_DB_RETRY_WAIT = 3
 DEFAULT_COMMIT_INTERVAL = 1
+# The memory in megabytes used by the cache of the recently recorded states
+DEFAULT_HISTORY_CACHE_SIZE = 16
 KEEPALIVE_TIME = 30
 
 # Controls how often we clean up
@@ -117,6 +151,7 @@ CONF_PURGE_KEEP_DAYS = "purge_keep_days"
 CONF_PURGE_INTERVAL = "purge_interval"
 CONF_EVENT_TYPES = "event_types"
 CONF_COMMIT_INTERVAL = "commit_interval"
+CONF_HISTORY_CACHE_SIZE = "history_cache_size"
 
 INVALIDATED_ERR = "Database connection invalidated"
 CONNECTIVITY_ERR = "Error in database connectivity during commit"
@@ -154,6 +189,9 @@ CONFIG_SCHEMA = vol.Schema(
                     vol.Optional(
                         CONF_DB_INTEGRITY_CHECK, default=DEFAULT_DB_INTEGRITY_CHECK
                     ): cv.boolean,
+                    vol.Optional(
+                        CONF_HISTORY_CACHE_SIZE, default=DEFAULT_HISTORY_CACHE_SIZE
+                    ): cv.positive_int,
                 }
             ),
         )
@@ -224,6 +262,7 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     commit_interval = conf[CONF_COMMIT_INTERVAL]
     db_max_retries = conf[CONF_DB_MAX_RETRIES]
     db_retry_wait = conf[CONF_DB_RETRY_WAIT]
+    history_cache_size = conf[CONF_HISTORY_CACHE_SIZE]
     db_url = conf.get(CONF_DB_URL) or DEFAULT_URL.format(
         hass_config_path=hass.config.path(DEFAULT_DB_FILE)
     )
@@ -237,6 +276,7 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
         uri=db_url,
         db_max_retries=db_max_retries,
         db_retry_wait=db_retry_wait,
+        history_cache_size=history_cache_size,
         entity_filter=entity_filter,
         exclude_t=exclude_t,
     )
@@ -245,6 +285,7 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     _async_register_services(hass, instance)
     history.async_setup(hass)
     statistics.async_setup(hass)
+    websocket_api.async_setup(hass)
     await async_process_integration_platforms(hass, DOMAIN, _process_recorder_platform)
 
     return await instance.async_db_ready
@@ -343,6 +384,7 @@ class Recorder(threading.Thread):
         uri: str,
         db_max_retries: int,
         db_retry_wait: int,
+        history_cache_size: int,
         entity_filter: Callable[[str], bool],
         exclude_t: list[str],
     ) -> None:
@@ -370,8 +412,35 @@ class Recorder(threading.Thread):
         self._timechanges_seen = 0
         self._commits_without_expire = 0
         self._keepalive_count = 0
-        self._old_states = {}
-        self._pending_expunge = []
+        self._old_state_ids: dict[str, int] = {}
+        # The bucket of the last written latest states, None when the
+        # old state ids are incomplete and no more can be written this run
+        self._latest_states_bucket: datetime | None = latest_states_bucket(
+            self.recording_start
+        )
+        self._pending_events: list[tuple[dict[str, Any], str | None]] = []
+        self._pending_states: list[tuple[dict[str, Any], dict[str, Any], str, str]] = []
+        self._event_data_ids = LRU(EVENT_DATA_ID_CACHE_SIZE)
+        self._state_attributes_ids = LRU(STATE_ATTRIBUTES_ID_CACHE_SIZE)
+        self._states_meta_ids = LRU(STATES_META_ID_CACHE_SIZE)
+        self._primary_keys_seeded = False
+        self._primary_keys = {
+            column.table.name: PrimaryKeyAllocator(column)
+            for column in (
+                Events.event_id,
+                States.state_id,
+                EventData.data_id,
+                StateAttributes.attributes_id,
+                StatesMeta.metadata_id,
+            )
+        }
+        self.purge_progress: purge.PurgeProgress | None = None
+        # The recently recorded states, None if the cache is disabled
+        self.history_cache: HistoryCache | None = None
+        if history_cache_size:
+            self.history_cache = HistoryCache(
+                history_cache_size * 1024 * 1024, self.recording_start.timestamp()
+            )
         self.event_session = None
         self.get_session = None
         self._completed_first_database_setup = None
@@ -700,7 +769,10 @@ class Recorder(threading.Thread):
 
     def _run_purge(self, purge_before, repack, apply_filter):
         """Purge the database."""
+        if self.history_cache is not None:
+            self.history_cache.evict_before(purge_before.timestamp())
         if purge.purge_old_data(self, purge_before, repack, apply_filter):
+            self.purge_progress = None
             # We always need to do the db cleanups after a purge
             # is finished to ensure the WAL checkpoint and other
             # tasks happen after a vacuum.
@@ -711,6 +783,8 @@ class Recorder(threading.Thread):
 
     def _run_purge_entities(self, entity_filter):
         """Purge entities from the database."""
+        if self.history_cache is not None:
+            self.history_cache.evict_entities(entity_filter)
         if purge.purge_entity_data(self, entity_filter):
             return
         # Schedule a new purge task if this one didn't finish
@@ -725,6 +799,12 @@ class Recorder(threading.Thread):
 
     def _process_one_event(self, event):
         """Process one event."""
+        if self._pending_events and isinstance(
+            event, (PurgeTask, PurgeEntitiesTask, StatisticsTask)
+        ):
+            # The tasks run in their own session, commit the buffered
+            # rows first so that session can see them
+            self._commit_event_session_or_retry()
         if isinstance(event, PurgeTask):
             self._run_purge(event.purge_before, event.repack, event.apply_filter)
             return
@@ -757,38 +837,44 @@ class Recorder(threading.Thread):
 
         try:
             if event.event_type == EVENT_STATE_CHANGED:
-                dbevent = Events.from_event(event, event_data="{}")
+                event_row = Events.row_from_event(event, event_data="{}")
             else:
-                dbevent = Events.from_event(event)
-            dbevent.created = event.time_fired
-            self.event_session.add(dbevent)
+                event_row = Events.row_from_event(event)
         except (TypeError, ValueError):
             _LOGGER.warning("Event is not JSON serializable: %s", event)
             return
 
+        event_row["created"] = event.time_fired
+        if event.event_type == EVENT_STATE_CHANGED:
+            shared_data = None
+        else:
+            # The data is stored once in the event_data table
+            shared_data = event_row["event_data"]
+            event_row["event_data"] = None
+        self._pending_events.append((event_row, shared_data))
+
         if event.event_type == EVENT_STATE_CHANGED:
             try:
-                dbstate = States.from_event(event)
-                has_new_state = event.data.get("new_state")
-                if dbstate.entity_id in self._old_states:
-                    old_state = self._old_states.pop(dbstate.entity_id)
-                    if old_state.state_id:
-                        dbstate.old_state_id = old_state.state_id
-                    else:
-                        dbstate.old_state = old_state
-                if not has_new_state:
-                    dbstate.state = None
-                dbstate.event = dbevent
-                dbstate.created = event.time_fired
-                self.event_session.add(dbstate)
-                if has_new_state:
-                    self._old_states[dbstate.entity_id] = dbstate
-                    self._pending_expunge.append(dbstate)
+                state_row = States.row_from_event(event)
             except (TypeError, ValueError):
                 _LOGGER.warning(
                     "State is not JSON serializable: %s",
                     event.data.get("new_state"),
                 )
+            else:
+                if not event.data.get("new_state"):
+                    state_row["state"] = None
+                state_row["created"] = event.time_fired
+                # The attributes are stored once in the state_attributes table
+                shared_attrs = state_row["attributes"]
+                state_row["attributes"] = None
+                # The entity id is stored once in the states_meta table
+                entity_id = event.data["entity_id"]
+                self._pending_states.append(
+                    (state_row, event_row, shared_attrs, entity_id)
+                )
+                if self.history_cache is not None:
+                    self.history_cache.add_state_row(entity_id, state_row, shared_attrs)
 
         # If they do not have a commit interval
         # than we commit right away
@@ -807,13 +893,29 @@ class Recorder(threading.Thread):
 
     def _commit_event_session_or_retry(self):
         """Commit the event session if there is work to do."""
-        if not self.event_session.new and not self.event_session.dirty:
+        if (
+            not self._pending_events
+            and not self.event_session.new
+            and not self.event_session.dirty
+        ):
             return
         tries = 1
+        reseeded = False
         while tries <= self.db_max_retries:
             try:
                 self._commit_event_session()
                 return
+            except exc.IntegrityError as err:
+                # The keys handed out may collide with rows written by
+                # another writer, continue after the largest keys once
+                if reseeded or self.engine.dialect.name not in BULK_INSERT_DIALECTS:
+                    raise
+                _LOGGER.warning(
+                    "Primary key conflict, continuing after the largest keys in the database: %s",
+                    err,
+                )
+                self.seed_primary_keys(self.event_session)
+                reseeded = True
             except (exc.InternalError, exc.OperationalError) as err:
                 _LOGGER.error(
                     "%s: Error executing query: %s. (retrying in %s seconds)",
@@ -830,15 +932,35 @@ class Recorder(threading.Thread):
     def _commit_event_session(self):
         self._commits_without_expire += 1
 
-        if self._pending_expunge:
-            self.event_session.flush()
-            for dbstate in self._pending_expunge:
-                # Expunge the state so its not expired
-                # until we use it later for dbstate.old_state
-                if dbstate in self.event_session:
-                    self.event_session.expunge(dbstate)
-            self._pending_expunge = []
-        self.event_session.commit()
+        try:
+            (
+                old_state_ids,
+                data_ids,
+                attributes_ids,
+                metadata_ids,
+                latest_bucket,
+            ) = self._insert_pending_rows()
+            self.event_session.commit()
+        except SQLAlchemyError:
+            # Rollback so the buffered rows can be written again on retry
+            self.event_session.rollback()
+            raise
+
+        self._pending_events = []
+        self._pending_states = []
+        for entity_id, state_id in old_state_ids.items():
+            if state_id is None:
+                self._old_state_ids.pop(entity_id, None)
+            else:
+                self._old_state_ids[entity_id] = state_id
+        for shared_data, data_id in data_ids.items():
+            self._event_data_ids[shared_data] = data_id
+        for shared_attrs, attributes_id in attributes_ids.items():
+            self._state_attributes_ids[shared_attrs] = attributes_id
+        for entity_id, metadata_id in metadata_ids.items():
+            self._states_meta_ids[entity_id] = metadata_id
+        if self._latest_states_bucket is not None:
+            self._latest_states_bucket = latest_bucket
 
         # Expire is an expensive operation (frequently more expensive
         # than the flush and commit itself) so we only
@@ -847,6 +969,241 @@ class Recorder(threading.Thread):
             self._commits_without_expire = 0
             self.event_session.expire_all()
 
+    def _insert_pending_rows(self):
+        """Write the buffered event and state rows with executemany.
+
+        Primary keys are allocated by the recorder, which is the only writer
+        of the events and states tables, so old_state_id can be linked without
+        a flush per row.
+
+        The last state of each entity is written to the latest states
+        table before the first state of every hour.
+
+        Returns the changes to the last state id of each entity, the event
+        data, attributes and states meta ids of the written rows and the
+        bucket of the last written latest states to apply once the
+        transaction is committed.
+        """
+        old_state_ids: dict[str, int | None] = {}
+        if not self._pending_events:
+            return old_state_ids, {}, {}, {}, self._latest_states_bucket
+
+        session = self.event_session
+        bulk = self.engine.dialect.name in BULK_INSERT_DIALECTS
+        if bulk and not self._primary_keys_seeded:
+            self.seed_primary_keys(session)
+        if self._latest_states_bucket is None:
+            self._load_old_state_ids()
+        latest_bucket = self._latest_states_bucket
+        event_rows = [event_row for event_row, _ in self._pending_events]
+        state_rows = [state_row for state_row, _, _, _ in self._pending_states]
+        data_ids = self._insert_shared_rows(
+            bulk,
+            [shared_data for _, shared_data in self._pending_events if shared_data],
+            self._event_data_ids,
+            EventData.data_id,
+            EventData.hash,
+            EventData.shared_data,
+            EventData.row_from_shared_data,
+        )
+        attributes_ids = self._insert_shared_rows(
+            bulk,
+            [shared_attrs for _, _, shared_attrs, _ in self._pending_states],
+            self._state_attributes_ids,
+            StateAttributes.attributes_id,
+            StateAttributes.hash,
+            StateAttributes.shared_attrs,
+            StateAttributes.row_from_shared_attrs,
+        )
+        metadata_ids = self._insert_states_meta_rows(
+            bulk, [entity_id for _, _, _, entity_id in self._pending_states]
+        )
+        for event_row, shared_data in self._pending_events:
+            event_row["data_id"] = data_ids.get(shared_data)
+
+        if bulk:
+            self._primary_keys[Events.__tablename__].allocate(session, event_rows)
+            self._primary_keys[States.__tablename__].allocate(session, state_rows)
+            session.execute(Events.__table__.insert(), event_rows)
+        else:
+            for event_row in event_rows:
+                insert_row(session, Events.event_id, event_row)
+
+        for state_row, event_row, shared_attrs, entity_id in self._pending_states:
+            if latest_bucket is not None:
+                bucket = latest_states_bucket(
+                    dt_util.utc_from_timestamp(state_row["last_updated_ts"])
+                )
+                if bucket > latest_bucket:
+                    latest_bucket = bucket
+                    self._insert_latest_states(latest_bucket, old_state_ids)
+            state_row["event_id"] = event_row["event_id"]
+            state_row["attributes_id"] = attributes_ids[shared_attrs]
+            state_row["metadata_id"] = metadata_ids[entity_id]
+            if entity_id in old_state_ids:
+                state_row["old_state_id"] = old_state_ids[entity_id]
+            else:
+                state_row["old_state_id"] = self._old_state_ids.get(entity_id)
+            if not bulk:
+                insert_row(session, States.state_id, state_row)
+            # A removed entity has no old state to link to next time
+            old_state_ids[entity_id] = (
+                state_row["state_id"] if state_row["state"] is not None else None
+            )
+
+        if bulk and state_rows:
+            session.execute(States.__table__.insert(), state_rows)
+
+        return old_state_ids, data_ids, attributes_ids, metadata_ids, latest_bucket
+
+    def seed_primary_keys(self, session):
+        """Continue the allocated primary keys after the largest keys in the database.
+
+        Also called by tests after they added rows without the recorder.
+        """
+        for allocator in self._primary_keys.values():
+            allocator.seed(session, self.engine.dialect.name)
+        self._primary_keys_seeded = True
+
+    def _insert_latest_states(self, bucket_start, old_state_ids):
+        """Write the last state id of every entity before the bucket start."""
+        state_ids = {**self._old_state_ids, **old_state_ids}
+        rows = [
+            {"bucket_start": bucket_start, "entity_id": entity_id, "state_id": state_id}
+            for entity_id, state_id in state_ids.items()
+            if state_id is not None
+        ]
+        if rows:
+            self.event_session.execute(LatestStates.__table__.insert(), rows)
+
+    def _load_old_state_ids(self):
+        """Load the last state id of every entity recorded in this run.
+
+        Writing the latest states is resumed once they are loaded.
+        """
+        session = self.event_session
+        most_recent_state_ids = (
+            session.query(func.max(States.state_id).label("max_state_id"))
+            .filter(States.last_updated_ts >= self.recording_start.timestamp())
+            .group_by(States.metadata_id)
+            .subquery()
+        )
+        query = (
+            session.query(StatesMeta.entity_id, States.state_id)
+            .join(StatesMeta, States.metadata_id == StatesMeta.metadata_id)
+            .join(
+                most_recent_state_ids,
+                States.state_id == most_recent_state_ids.c.max_state_id,
+            )
+        )
+        # A removed entity has no old state to link to
+        self._old_state_ids = dict(query.filter(States.state.isnot(None)))
+        latest_bucket = (
+            session.query(func.max(LatestStates.bucket_start))
+            .filter(LatestStates.bucket_start >= self.recording_start)
+            .scalar()
+        )
+        self._latest_states_bucket = (
+            latest_states_bucket(self.recording_start)
+            if latest_bucket is None
+            else process_timestamp(latest_bucket)
+        )
+
+    def _insert_shared_rows(
+        self,
+        bulk,
+        shared_values,
+        cache,
+        id_column,
+        hash_column,
+        shared_column,
+        row_factory,
+    ):
+        """Return the id of the shared row of each JSON value.
+
+        Values that are neither cached nor in the database are inserted.
+        """
+        ids: dict[str, int] = {}
+        missing: set[str] = set()
+        for shared_value in shared_values:
+            if shared_value in ids or shared_value in missing:
+                continue
+            row_id = cache.get(shared_value)
+            if row_id is None:
+                missing.add(shared_value)
+            else:
+                ids[shared_value] = row_id
+
+        if not missing:
+            return ids
+
+        session = self.event_session
+        hashes = list({hash_shared_json(shared_value) for shared_value in missing})
+        for idx in range(0, len(hashes), MAX_BIND_VARS):
+            query = session.query(id_column, shared_column).filter(
+                hash_column.in_(hashes[idx : idx + MAX_BIND_VARS])
+            )
+            for row_id, shared_value in query:
+                # Different values can share a hash
+                if shared_value in missing:
+                    missing.remove(shared_value)
+                    ids[shared_value] = row_id
+
+        rows = [row_factory(shared_value) for shared_value in missing]
+        if bulk:
+            self._primary_keys[id_column.table.name].allocate(session, rows)
+            if rows:
+                session.execute(id_column.table.insert(), rows)
+        else:
+            for row in rows:
+                insert_row(session, id_column, row)
+
+        for row in rows:
+            ids[row[shared_column.key]] = row[id_column.key]
+        return ids
+
+    def _insert_states_meta_rows(self, bulk, entity_ids):
+        """Return the states meta id of each entity id.
+
+        Entity ids that are neither cached nor in the database are inserted.
+        """
+        ids: dict[str, int] = {}
+        missing: set[str] = set()
+        for entity_id in entity_ids:
+            if entity_id in ids or entity_id in missing:
+                continue
+            metadata_id = self._states_meta_ids.get(entity_id)
+            if metadata_id is None:
+                missing.add(entity_id)
+            else:
+                ids[entity_id] = metadata_id
+
+        if not missing:
+            return ids
+
+        session = self.event_session
+        query_entity_ids = list(missing)
+        for idx in range(0, len(query_entity_ids), MAX_BIND_VARS):
+            query = session.query(StatesMeta.metadata_id, StatesMeta.entity_id).filter(
+                StatesMeta.entity_id.in_(query_entity_ids[idx : idx + MAX_BIND_VARS])
+            )
+            for metadata_id, entity_id in query:
+                missing.remove(entity_id)
+                ids[entity_id] = metadata_id
+
+        rows = [{"entity_id": entity_id} for entity_id in missing]
+        if bulk:
+            self._primary_keys[StatesMeta.__tablename__].allocate(session, rows)
+            if rows:
+                session.execute(StatesMeta.__table__.insert(), rows)
+        else:
+            for row in rows:
+                insert_row(session, StatesMeta.metadata_id, row)
+
+        for row in rows:
+            ids[row["entity_id"]] = row["metadata_id"]
+        return ids
+
     def _handle_sqlite_corruption(self):
         """Handle the sqlite3 database being corrupt."""
         self._close_event_session()
@@ -857,7 +1214,18 @@ class Recorder(threading.Thread):
 
     def _close_event_session(self):
         """Close the event session."""
-        self._old_states = {}
+        self._old_state_ids = {}
+        # Without the old state ids the latest states would miss entities,
+        # they are loaded again by the next commit
+        self._latest_states_bucket = None
+        self._pending_events = []
+        self._pending_states = []
+        self._event_data_ids.clear()
+        self._state_attributes_ids.clear()
+        self._states_meta_ids.clear()
+        # The cache may hold states that were not written
+        if self.history_cache is not None:
+            self.history_cache.clear()
 
         if not self.event_session:
             return
@@ -879,6 +1247,8 @@ class Recorder(threading.Thread):
         """Open the event session."""
         self.event_session = self.get_session()
         self.event_session.expire_on_commit = False
+        # The primary keys are seeded by the first commit of the session
+        self._primary_keys_seeded = False
 
     def _send_keep_alive(self):
         """Send a keep alive to keep the db connection open."""
@@ -8,3 +8,10 @@ CONF_DB_INTEGRITY_CHECK = "db_integrity_check"
 
 # The maximum number of rows (events) we purge in one delete statement
 MAX_ROWS_TO_PURGE = 1000
+
+# The time in seconds a purge runs before the recorder writes the queued events
+PURGE_TIME_SLICE = 1
+
+# The maximum number of bound parameters we use in one query, the
+# default limit of SQLite builds before 3.32
+MAX_BIND_VARS = 999
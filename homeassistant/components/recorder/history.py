@@ -2,7 +2,8 @@
 from __future__ import annotations
 
 from collections import defaultdict
-from itertools import groupby
+from itertools import chain, groupby
+import json
 import logging
 import time
 
@@ -11,8 +12,12 @@ from sqlalchemy.ext import baked
 
 from homeassistant.components import recorder
 from homeassistant.components.recorder.models import (
+    LatestStates,
+    StateAttributes,
     States,
-    process_timestamp_to_utc_isoformat,
+    StatesMeta,
+    process_timestamp,
+    timestamp_to_utc_isoformat,
 )
 from homeassistant.components.recorder.util import execute, session_scope
 from homeassistant.core import split_entity_id
@@ -27,6 +32,12 @@ _LOGGER = logging.getLogger(__name__)
 STATE_KEY = "state"
 LAST_CHANGED_KEY = "last_changed"
 
+# Keys of the compressed state format
+COMPRESSED_STATE_TIMES = "t"
+COMPRESSED_STATE_STATES = "s"
+COMPRESSED_STATE_ATTRIBUTES = "a"
+COMPRESSED_STATE_LAST_CHANGED = "lc"
+
 SIGNIFICANT_DOMAINS = (
     "climate",
     "device_tracker",
@@ -44,22 +55,36 @@ NEED_ATTRIBUTE_DOMAINS = {
 }
 
 QUERY_STATES = [
-    States.domain,
-    States.entity_id,
+    StatesMeta.entity_id,
     States.state,
     States.attributes,
-    States.last_changed,
-    States.last_updated,
+    StateAttributes.shared_attrs,
+    States.last_changed_ts,
+    States.last_updated_ts,
 ]
 
 HISTORY_BAKERY = "recorder_history_bakery"
 
+# The number of rows fetched from the database at a time when streaming
+STREAM_YIELD_PER_ROWS = 1000
+
 
 def async_setup(hass):
     """Set up the history hooks."""
     hass.data[HISTORY_BAKERY] = baked.bakery()
 
 
+def _query_states(session):
+    """Return a query of the states joined with their entity id and attributes."""
+    return (
+        session.query(*QUERY_STATES)
+        .join(StatesMeta, States.metadata_id == StatesMeta.metadata_id)
+        .outerjoin(
+            StateAttributes, States.attributes_id == StateAttributes.attributes_id
+        )
+    )
+
+
 def get_significant_states(hass, *args, **kwargs):
     """Wrap _get_significant_states with a sql session."""
     with session_scope(hass=hass) as session:
@@ -76,6 +101,7 @@ def _get_significant_states(
     include_start_time_state=True,
     significant_changes_only=True,
     minimal_response=False,
+    compressed_state_format=False,
 ):
     """
     Return states changes during UTC period start_time - end_time.
@@ -84,85 +110,287 @@ def _get_significant_states(
     as well as all states from certain domains (for instance
     thermostat so that we get current temperature in our graphs).
     """
+    cached = _get_cached_significant_states(
+        hass,
+        start_time,
+        end_time,
+        entity_ids,
+        filters,
+        include_start_time_state,
+        significant_changes_only,
+        minimal_response,
+        compressed_state_format,
+    )
+    if cached is not None:
+        return cached
+
     timer_start = time.perf_counter()
 
-    baked_query = hass.data[HISTORY_BAKERY](
-        lambda session: session.query(*QUERY_STATES)
+    states = execute(
+        _significant_states_query(
+            hass,
+            session,
+            start_time,
+            end_time,
+            entity_ids,
+            filters,
+            significant_changes_only,
+        )
+    )
+
+    if _LOGGER.isEnabledFor(logging.DEBUG):
+        elapsed = time.perf_counter() - timer_start
+        _LOGGER.debug("get_significant_states took %fs", elapsed)
+
+    return _sorted_states_to_dict(
+        hass,
+        session,
+        states,
+        start_time,
+        entity_ids,
+        filters,
+        include_start_time_state,
+        minimal_response,
+        compressed_state_format,
     )
 
+
+def _iter_significant_states(
+    hass,
+    session,
+    start_time,
+    end_time=None,
+    entity_ids=None,
+    filters=None,
+    include_start_time_state=True,
+    significant_changes_only=True,
+    minimal_response=False,
+    compressed_state_format=False,
+):
+    """Yield the entity_id and significant states of one entity at a time.
+
+    Like _get_significant_states but rows are fetched from the database in
+    batches and the states are yielded per entity, so memory use does
+    not grow with the requested period. Entities that changed during
+    the period are yielded first, ordered by entity_id.
+    """
+    cached = _get_cached_significant_states(
+        hass,
+        start_time,
+        end_time,
+        entity_ids,
+        filters,
+        include_start_time_state,
+        significant_changes_only,
+        minimal_response,
+        compressed_state_format,
+    )
+    if cached is not None:
+        yield from cached.items()
+        return
+
+    query = _significant_states_query(
+        hass,
+        session,
+        start_time,
+        end_time,
+        entity_ids,
+        filters,
+        significant_changes_only,
+    ).with_post_criteria(lambda q: q.yield_per(STREAM_YIELD_PER_ROWS))
+
+    initial_states = {}
+    if include_start_time_state:
+        initial_states = {
+            state.entity_id: state
+            for state in _get_initial_states(
+                hass, session, start_time, entity_ids, filters
+            )
+        }
+
+    for ent_id, group in groupby(query, lambda state: state.entity_id):
+        initial_state = initial_states.pop(ent_id, None)
+        if compressed_state_format:
+            yield ent_id, _compress_entity_states(
+                ent_id, initial_state, group, minimal_response
+            )
+            continue
+        ent_results = [] if initial_state is None else [initial_state]
+        _append_entity_states(ent_id, group, ent_results, minimal_response)
+        yield ent_id, ent_results
+
+    # Entities that did not change during the period
+    for ent_id, initial_state in initial_states.items():
+        if compressed_state_format:
+            yield ent_id, _compress_entity_states(
+                ent_id, initial_state, (), minimal_response
+            )
+        else:
+            yield ent_id, [initial_state]
+
+
+def _get_cached_significant_states(
+    hass,
+    start_time,
+    end_time,
+    entity_ids,
+    filters,
+    include_start_time_state,
+    significant_changes_only,
+    minimal_response,
+    compressed_state_format,
+):
+    """Return the significant states from the history cache of the recorder.
+
+    Returns None if the states are not all cached.
+    """
+    history_cache = hass.data[recorder.DATA_INSTANCE].history_cache
+    if history_cache is None:
+        return None
+
+    entities_states = history_cache.states_during_period(
+        start_time.timestamp(),
+        end_time and end_time.timestamp(),
+        entity_ids,
+        include_start_time_state,
+    )
+    if entities_states is None:
+        return None
+
+    states = []
+    initial_states = []
+    for initial_row, rows in entities_states.values():
+        if initial_row is not None:
+            initial_state = LazyState(initial_row)
+            initial_state.last_changed = start_time
+            initial_state.last_updated = start_time
+            initial_states.append(initial_state)
+        if significant_changes_only:
+            rows = [
+                row
+                for row in rows
+                if split_entity_id(row.entity_id)[0] in SIGNIFICANT_DOMAINS
+                or row.last_changed_ts == row.last_updated_ts
+            ]
+        states.extend(rows)
+
+    return _sorted_states_to_dict(
+        hass,
+        None,
+        states,
+        start_time,
+        entity_ids,
+        filters,
+        include_start_time_state,
+        minimal_response,
+        compressed_state_format,
+        initial_states,
+    )
+
+
+def _get_metadata_ids(session, entity_ids):
+    """Return the states meta ids of the entity ids that have been recorded."""
+    return [
+        metadata_id
+        for (metadata_id,) in session.query(StatesMeta.metadata_id).filter(
+            StatesMeta.entity_id.in_(entity_ids)
+        )
+    ]
+
+
+def _get_metadata_id(session, entity_id):
+    """Return the states meta id of an entity id, None if it was never recorded."""
+    return (
+        session.query(StatesMeta.metadata_id)
+        .filter(StatesMeta.entity_id == entity_id)
+        .scalar()
+    )
+
+
+def _significant_states_query(
+    hass,
+    session,
+    start_time,
+    end_time,
+    entity_ids,
+    filters,
+    significant_changes_only,
+):
+    """Return the query of the significant states sorted by entity_id."""
+    baked_query = hass.data[HISTORY_BAKERY](_query_states)
+
     if significant_changes_only:
         baked_query += lambda q: q.filter(
             (
-                States.domain.in_(SIGNIFICANT_DOMAINS)
-                | (States.last_changed == States.last_updated)
+                StatesMeta.entity_id_in_domains(SIGNIFICANT_DOMAINS)
+                | (States.last_changed_ts == States.last_updated_ts)
             )
-            & (States.last_updated > bindparam("start_time"))
+            & (States.last_updated_ts > bindparam("start_time"))
         )
     else:
-        baked_query += lambda q: q.filter(States.last_updated > bindparam("start_time"))
+        baked_query += lambda q: q.filter(
+            States.last_updated_ts > bindparam("start_time")
+        )
 
+    metadata_ids = None
     if entity_ids is not None:
+        metadata_ids = _get_metadata_ids(session, entity_ids)
         baked_query += lambda q: q.filter(
-            States.entity_id.in_(bindparam("entity_ids", expanding=True))
+            States.metadata_id.in_(bindparam("metadata_ids", expanding=True))
         )
     else:
-        baked_query += lambda q: q.filter(~States.domain.in_(IGNORE_DOMAINS))
+        baked_query += lambda q: q.filter(
+            ~StatesMeta.entity_id_in_domains(IGNORE_DOMAINS)
+        )
         if filters:
             filters.bake(baked_query)
 
     if end_time is not None:
-        baked_query += lambda q: q.filter(States.last_updated < bindparam("end_time"))
-
-    baked_query += lambda q: q.order_by(States.entity_id, States.last_updated)
-
-    states = execute(
-        baked_query(session).params(
-            start_time=start_time, end_time=end_time, entity_ids=entity_ids
+        baked_query += lambda q: q.filter(
+            States.last_updated_ts < bindparam("end_time")
         )
-    )
 
-    if _LOGGER.isEnabledFor(logging.DEBUG):
-        elapsed = time.perf_counter() - timer_start
-        _LOGGER.debug("get_significant_states took %fs", elapsed)
+    baked_query += lambda q: q.order_by(StatesMeta.entity_id, States.last_updated_ts)
 
-    return _sorted_states_to_dict(
-        hass,
-        session,
-        states,
-        start_time,
-        entity_ids,
-        filters,
-        include_start_time_state,
-        minimal_response,
+    return baked_query(session).params(
+        start_time=start_time.timestamp(),
+        end_time=end_time and end_time.timestamp(),
+        metadata_ids=metadata_ids,
     )
 
 
 def state_changes_during_period(hass, start_time, end_time=None, entity_id=None):
     """Return states changes during UTC period start_time - end_time."""
     with session_scope(hass=hass) as session:
-        baked_query = hass.data[HISTORY_BAKERY](
-            lambda session: session.query(*QUERY_STATES)
-        )
+        baked_query = hass.data[HISTORY_BAKERY](_query_states)
 
         baked_query += lambda q: q.filter(
-            (States.last_changed == States.last_updated)
-            & (States.last_updated > bindparam("start_time"))
+            (States.last_changed_ts == States.last_updated_ts)
+            & (States.last_updated_ts > bindparam("start_time"))
         )
 
         if end_time is not None:
             baked_query += lambda q: q.filter(
-                States.last_updated < bindparam("end_time")
+                States.last_updated_ts < bindparam("end_time")
             )
 
+        metadata_id = None
         if entity_id is not None:
-            baked_query += lambda q: q.filter_by(entity_id=bindparam("entity_id"))
+            baked_query += lambda q: q.filter(
+                States.metadata_id == bindparam("metadata_id")
+            )
             entity_id = entity_id.lower()
+            metadata_id = _get_metadata_id(session, entity_id)
 
-        baked_query += lambda q: q.order_by(States.entity_id, States.last_updated)
+        baked_query += lambda q: q.order_by(
+            StatesMeta.entity_id, States.last_updated_ts
+        )
 
         states = execute(
             baked_query(session).params(
-                start_time=start_time, end_time=end_time, entity_id=entity_id
+                start_time=start_time.timestamp(),
+                end_time=end_time and end_time.timestamp(),
+                metadata_id=metadata_id,
             )
         )
 
@@ -176,24 +404,28 @@ def get_last_state_changes(hass, number_of_states, entity_id):
     start_time = dt_util.utcnow()
 
     with session_scope(hass=hass) as session:
-        baked_query = hass.data[HISTORY_BAKERY](
-            lambda session: session.query(*QUERY_STATES)
+        baked_query = hass.data[HISTORY_BAKERY](_query_states)
+        baked_query += lambda q: q.filter(
+            States.last_changed_ts == States.last_updated_ts
         )
-        baked_query += lambda q: q.filter(States.last_changed == States.last_updated)
 
+        metadata_id = None
         if entity_id is not None:
-            baked_query += lambda q: q.filter_by(entity_id=bindparam("entity_id"))
+            baked_query += lambda q: q.filter(
+                States.metadata_id == bindparam("metadata_id")
+            )
             entity_id = entity_id.lower()
+            metadata_id = _get_metadata_id(session, entity_id)
 
         baked_query += lambda q: q.order_by(
-            States.entity_id, States.last_updated.desc()
+            StatesMeta.entity_id, States.last_updated_ts.desc()
         )
 
         baked_query += lambda q: q.limit(bindparam("number_of_states"))
 
         states = execute(
             baked_query(session).params(
-                number_of_states=number_of_states, entity_id=entity_id
+                number_of_states=number_of_states, metadata_id=metadata_id
             )
         )
 
@@ -242,20 +474,40 @@ def _get_states_with_session(
 
     # We have more than one entity to look at (most commonly we want
     # all entities,) so we need to do a search on all states since the
-    # last recorder run started.
-    query = session.query(*QUERY_STATES)
+    # last recorder run started. When the recorder wrote the latest states
+    # before an hour of this run, only the states since then are searched.
+    latest_bucket = (
+        session.query(func.max(LatestStates.bucket_start))
+        .filter(
+            (LatestStates.bucket_start >= run.start)
+            & (LatestStates.bucket_start <= utc_point_in_time)
+        )
+        .scalar()
+    )
+    search_start = process_timestamp(
+        run.start if latest_bucket is None else latest_bucket
+    ).timestamp()
+
+    metadata_ids = None
+    if entity_ids is not None:
+        metadata_ids = _get_metadata_ids(session, entity_ids)
+
+    query = _query_states(session)
 
     most_recent_states_by_date = session.query(
-        States.entity_id.label("max_entity_id"),
-        func.max(States.last_updated).label("max_last_updated"),
+        States.metadata_id.label("max_metadata_id"),
+        func.max(States.last_updated_ts).label("max_last_updated"),
     ).filter(
-        (States.last_updated >= run.start) & (States.last_updated < utc_point_in_time)
+        (States.last_updated_ts >= search_start)
+        & (States.last_updated_ts < utc_point_in_time.timestamp())
     )
 
-    if entity_ids:
-        most_recent_states_by_date.filter(States.entity_id.in_(entity_ids))
+    if metadata_ids is not None:
+        most_recent_states_by_date = most_recent_states_by_date.filter(
+            States.metadata_id.in_(metadata_ids)
+        )
 
-    most_recent_states_by_date = most_recent_states_by_date.group_by(States.entity_id)
+    most_recent_states_by_date = most_recent_states_by_date.group_by(States.metadata_id)
 
     most_recent_states_by_date = most_recent_states_by_date.subquery()
 
@@ -264,12 +516,34 @@ def _get_states_with_session(
     ).join(
         most_recent_states_by_date,
         and_(
-            States.entity_id == most_recent_states_by_date.c.max_entity_id,
-            States.last_updated == most_recent_states_by_date.c.max_last_updated,
+            States.metadata_id == most_recent_states_by_date.c.max_metadata_id,
+            States.last_updated_ts == most_recent_states_by_date.c.max_last_updated,
         ),
     )
 
-    most_recent_state_ids = most_recent_state_ids.group_by(States.entity_id)
+    most_recent_state_ids = most_recent_state_ids.group_by(States.metadata_id)
+
+    if latest_bucket is not None:
+        # The entities that did not change since are at their latest state
+        latest_state_ids = (
+            session.query(States.state_id)
+            .join(StatesMeta, States.metadata_id == StatesMeta.metadata_id)
+            .join(
+                LatestStates,
+                # The state ids of purged entities may have been reused
+                and_(
+                    States.state_id == LatestStates.state_id,
+                    StatesMeta.entity_id == LatestStates.entity_id,
+                ),
+            )
+            .filter(
+                (LatestStates.bucket_start == latest_bucket)
+                & ~States.metadata_id.in_(
+                    session.query(most_recent_states_by_date.c.max_metadata_id)
+                )
+            )
+        )
+        most_recent_state_ids = most_recent_state_ids.union_all(latest_state_ids)
 
     most_recent_state_ids = most_recent_state_ids.subquery()
 
@@ -278,31 +552,33 @@ def _get_states_with_session(
         States.state_id == most_recent_state_ids.c.max_state_id,
     )
 
-    if entity_ids is not None:
-        query = query.filter(States.entity_id.in_(entity_ids))
+    if metadata_ids is not None:
+        query = query.filter(States.metadata_id.in_(metadata_ids))
     else:
-        query = query.filter(~States.domain.in_(IGNORE_DOMAINS))
+        query = query.filter(~StatesMeta.entity_id_in_domains(IGNORE_DOMAINS))
         if filters:
             query = filters.apply(query)
 
+    # Keep the states sorted by entity_id like the states during a period
+    query = query.order_by(StatesMeta.entity_id)
+
     return [LazyState(row) for row in execute(query)]
 
 
 def _get_single_entity_states_with_session(hass, session, utc_point_in_time, entity_id):
     # Use an entirely different (and extremely fast) query if we only
     # have a single entity id
-    baked_query = hass.data[HISTORY_BAKERY](
-        lambda session: session.query(*QUERY_STATES)
-    )
+    baked_query = hass.data[HISTORY_BAKERY](_query_states)
     baked_query += lambda q: q.filter(
-        States.last_updated < bindparam("utc_point_in_time"),
-        States.entity_id == bindparam("entity_id"),
+        States.last_updated_ts < bindparam("utc_point_in_time"),
+        States.metadata_id == bindparam("metadata_id"),
     )
-    baked_query += lambda q: q.order_by(States.last_updated.desc())
+    baked_query += lambda q: q.order_by(States.last_updated_ts.desc())
     baked_query += lambda q: q.limit(1)
 
     query = baked_query(session).params(
-        utc_point_in_time=utc_point_in_time, entity_id=entity_id
+        utc_point_in_time=utc_point_in_time.timestamp(),
+        metadata_id=_get_metadata_id(session, entity_id),
     )
 
     return [LazyState(row) for row in execute(query)]
@@ -317,17 +593,23 @@ def _sorted_states_to_dict(
     filters=None,
     include_start_time_state=True,
     minimal_response=False,
+    compressed_state_format=False,
+    initial_states=None,
 ):
     """Convert SQL results into JSON friendly data structure.
 
     This takes our state list and turns it into a JSON friendly data
     structure {'entity_id': [list of states], 'entity_id2': [list of states]}
 
+    With compressed_state_format the states of each entity are in the
+    columnar format of _compress_entity_states instead of a list.
+
     States must be sorted by entity_id and last_updated
 
     We also need to go back and create a synthetic zero data point for
     each list of states, otherwise our graphs won't start on the Y
-    axis correctly.
+    axis correctly. The states at the start time are read from the
+    database unless initial_states are passed.
     """
     result = defaultdict(list)
     # Set all entity IDs to empty lists in result set to maintain the order
@@ -338,65 +620,152 @@ def _sorted_states_to_dict(
     # Get the states at the start time
     timer_start = time.perf_counter()
     if include_start_time_state:
-        run = recorder.run_information_from_instance(hass, start_time)
-        for state in _get_states_with_session(
-            hass, session, start_time, entity_ids, run=run, filters=filters
-        ):
-            state.last_changed = start_time
-            state.last_updated = start_time
+        if initial_states is None:
+            initial_states = _get_initial_states(
+                hass, session, start_time, entity_ids, filters
+            )
+        for state in initial_states:
             result[state.entity_id].append(state)
 
     if _LOGGER.isEnabledFor(logging.DEBUG):
         elapsed = time.perf_counter() - timer_start
         _LOGGER.debug("getting %d first datapoints took %fs", len(result), elapsed)
 
-    # Called in a tight loop so cache the function
-    # here
-    _process_timestamp_to_utc_isoformat = process_timestamp_to_utc_isoformat
-
     # Append all changes to it
     for ent_id, group in groupby(states, lambda state: state.entity_id):
-        domain = split_entity_id(ent_id)[0]
-        ent_results = result[ent_id]
-        if not minimal_response or domain in NEED_ATTRIBUTE_DOMAINS:
-            ent_results.extend(LazyState(db_state) for db_state in group)
-
-        # With minimal response we only provide a native
-        # State for the first and last response. All the states
-        # in-between only provide the "state" and the
-        # "last_changed".
-        if not ent_results:
-            ent_results.append(LazyState(next(group)))
-
-        prev_state = ent_results[-1]
-        initial_state_count = len(ent_results)
-
-        for db_state in group:
-            # With minimal response we do not care about attribute
-            # changes so we can filter out duplicate states
-            if db_state.state == prev_state.state:
-                continue
-
-            ent_results.append(
-                {
-                    STATE_KEY: db_state.state,
-                    LAST_CHANGED_KEY: _process_timestamp_to_utc_isoformat(
-                        db_state.last_changed
-                    ),
-                }
+        if compressed_state_format:
+            initial_state = result[ent_id][0] if result[ent_id] else None
+            result[ent_id] = _compress_entity_states(
+                ent_id, initial_state, group, minimal_response
             )
-            prev_state = db_state
+        else:
+            _append_entity_states(ent_id, group, result[ent_id], minimal_response)
 
-        if prev_state and len(ent_results) != initial_state_count:
-            # There was at least one state change
-            # replace the last minimal state with
-            # a full state
-            ent_results[-1] = LazyState(prev_state)
+    if compressed_state_format:
+        # Entities that did not change during the period
+        for ent_id, ent_results in result.items():
+            if isinstance(ent_results, list) and ent_results:
+                result[ent_id] = _compress_entity_states(
+                    ent_id, ent_results[0], (), minimal_response
+                )
 
     # Filter out the empty lists if some states had 0 results.
     return {key: val for key, val in result.items() if val}
 
 
+def _get_initial_states(hass, session, start_time, entity_ids, filters):
+    """Return the states at the start time with their time set to it."""
+    run = recorder.run_information_from_instance(hass, start_time)
+    states = _get_states_with_session(
+        hass, session, start_time, entity_ids, run=run, filters=filters
+    )
+    for state in states:
+        state.last_changed = start_time
+        state.last_updated = start_time
+    return states
+
+
+def _append_entity_states(ent_id, group, ent_results, minimal_response):
+    """Append the states of one entity, sorted by last_updated, to ent_results."""
+    domain = split_entity_id(ent_id)[0]
+    if not minimal_response or domain in NEED_ATTRIBUTE_DOMAINS:
+        ent_results.extend(LazyState(db_state) for db_state in group)
+
+    # With minimal response we only provide a native
+    # State for the first and last response. All the states
+    # in-between only provide the "state" and the
+    # "last_changed".
+    if not ent_results:
+        ent_results.append(LazyState(next(group)))
+
+    # Called in a tight loop so cache the function
+    # here
+    _timestamp_to_utc_isoformat = timestamp_to_utc_isoformat
+
+    prev_state = ent_results[-1]
+    initial_state_count = len(ent_results)
+
+    for db_state in group:
+        # With minimal response we do not care about attribute
+        # changes so we can filter out duplicate states
+        if db_state.state == prev_state.state:
+            continue
+
+        ent_results.append(
+            {
+                STATE_KEY: db_state.state,
+                LAST_CHANGED_KEY: _timestamp_to_utc_isoformat(db_state.last_changed_ts),
+            }
+        )
+        prev_state = db_state
+
+    if prev_state and len(ent_results) != initial_state_count:
+        # There was at least one state change
+        # replace the last minimal state with
+        # a full state
+        ent_results[-1] = LazyState(prev_state)
+
+
+def _compress_entity_states(ent_id, initial_state, group, minimal_response):
+    """Return the states of one entity, sorted by last_updated, as columns.
+
+    Times are the epoch timestamps of last_updated, the first one absolute
+    and the others relative to the previous state. Attributes are only sent
+    for the states where they differ from the previous state, as pairs of
+    the index of the state and the attributes. The last_changed of the states
+    where it differs from last_updated is sent as pairs of the index of the
+    state and the time from last_changed to last_updated. With minimal
+    response states that do not change the state are left out.
+    """
+    skip_same_state = (
+        minimal_response and split_entity_id(ent_id)[0] not in NEED_ATTRIBUTE_DOMAINS
+    )
+    entries = ((row.last_updated_ts, row.last_changed_ts, row) for row in group)
+    if initial_state is not None:
+        start_ts = initial_state.last_updated.timestamp()
+        # pylint: disable=protected-access
+        entries = chain([(start_ts, start_ts, initial_state._row)], entries)
+
+    times = []
+    states = []
+    attributes = []
+    last_changed = []
+    prev_time_us = 0
+    prev_attributes_json = None
+    for last_updated_ts, last_changed_ts, row in entries:
+        state = row.state or ""
+        if skip_same_state and states and state == states[-1]:
+            continue
+
+        # Delta encode in whole microseconds so rounding errors do not add up
+        time_us = round(last_updated_ts * 1000000)
+        times.append((time_us - prev_time_us) / 1000000)
+        prev_time_us = time_us
+        states.append(state)
+
+        if last_changed_ts != last_updated_ts:
+            changed_us = round(last_changed_ts * 1000000)
+            last_changed.append([len(states) - 1, (time_us - changed_us) / 1000000])
+
+        attributes_json = row.shared_attrs or row.attributes
+        if attributes_json == prev_attributes_json:
+            continue
+        prev_attributes_json = attributes_json
+        try:
+            attributes.append([len(states) - 1, json.loads(attributes_json)])
+        except ValueError:
+            # When json.loads fails
+            _LOGGER.exception("Error converting row to state: %s", row)
+            attributes.append([len(states) - 1, {}])
+
+    return {
+        COMPRESSED_STATE_TIMES: times,
+        COMPRESSED_STATE_STATES: states,
+        COMPRESSED_STATE_ATTRIBUTES: attributes,
+        COMPRESSED_STATE_LAST_CHANGED: last_changed,
+    }
+
+
 def get_state(hass, utc_point_in_time, entity_id, run=None):
     """Return a state at a specific point in time."""
     states = get_states(hass, utc_point_in_time, (entity_id,), run)
@@ -0,0 +1,185 @@
+"""Cache of the recently recorded states to serve history from memory."""
+from __future__ import annotations
+
+from collections import deque
+from operator import attrgetter
+import sys
+import threading
+import time
+from typing import Any, Callable, Iterable, NamedTuple
+
+# The estimated memory used by a cached row besides its state and attributes
+ROW_OVERHEAD = 200
+
+
+class CachedStateRow(NamedTuple):
+    """A recorded state with the columns read by the history queries."""
+
+    entity_id: str
+    state: str | None
+    attributes: str | None
+    shared_attrs: str | None
+    last_changed_ts: float
+    last_updated_ts: float
+
+
+class _EntityStates:
+    """The cached states of one entity, oldest first."""
+
+    __slots__ = ("rows", "complete_since")
+
+    def __init__(self, complete_since: float) -> None:
+        """Initialize the entity states."""
+        self.rows: deque[CachedStateRow] = deque()
+        # All the states of the entity recorded since are cached
+        self.complete_since = complete_since
+
+
+class HistoryCache:
+    """Ring buffers of the recently recorded states of every entity.
+
+    The buffers share a memory budget, when it is exceeded the oldest
+    recorded states are dropped first. The states are added by the
+    recorder thread and read by the history queries in other threads.
+    """
+
+    def __init__(self, max_size: int, started: float) -> None:
+        """Initialize the cache of max_size bytes of the states since started."""
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._started = started
+        self._entities: dict[str, _EntityStates] = {}
+        # Since when all states of the evicted entities are cached
+        self._evicted: dict[str, float] = {}
+        # The cached rows in the order they were recorded with their size
+        self._rows: deque[tuple[_EntityStates, CachedStateRow, int]] = deque()
+        self._size = 0
+
+    def add_state_row(
+        self, entity_id: str, state_row: dict[str, Any], shared_attrs: str
+    ) -> None:
+        """Add a state row of an entity written by the recorder."""
+        row = CachedStateRow(
+            entity_id,
+            state_row["state"],
+            None,
+            shared_attrs,
+            state_row["last_changed_ts"],
+            state_row["last_updated_ts"],
+        )
+        size = ROW_OVERHEAD + sys.getsizeof(row.state) + sys.getsizeof(shared_attrs)
+        with self._lock:
+            # The history queries do not look for states before the run started
+            if row.last_updated_ts < self._started:
+                return
+            entity = self._entities.get(row.entity_id)
+            if entity is None:
+                entity = self._entities[row.entity_id] = _EntityStates(
+                    self._evicted.pop(row.entity_id, self._started)
+                )
+            entity.rows.append(row)
+            self._rows.append((entity, row, size))
+            self._size += size
+            while self._size > self.max_size:
+                self._drop_oldest_row()
+
+    def _drop_oldest_row(self) -> None:
+        """Drop the oldest recorded row, the lock must be held."""
+        entity, row, size = self._rows.popleft()
+        self._size -= size
+        entity.rows.popleft()
+        entity.complete_since = row.last_updated_ts
+
+    def evict_before(self, purge_before_ts: float) -> None:
+        """Evict the rows recorded before purge_before_ts, which are purged."""
+        with self._lock:
+            while self._rows and self._rows[0][1].last_updated_ts < purge_before_ts:
+                self._drop_oldest_row()
+
+    def evict_entities(self, entity_filter: Callable[[str], bool]) -> None:
+        """Evict the rows of the entities that are purged."""
+        now = time.time()
+        with self._lock:
+            evicted_ids = [
+                entity_id for entity_id in self._entities if entity_filter(entity_id)
+            ]
+            if not evicted_ids:
+                return
+            evicted = set()
+            for entity_id in evicted_ids:
+                evicted.add(self._entities.pop(entity_id))
+                self._evicted[entity_id] = now
+            rows = self._rows
+            self._rows = deque(item for item in rows if item[0] not in evicted)
+            self._size -= sum(item[2] for item in rows if item[0] in evicted)
+
+    def clear(self) -> None:
+        """Evict all rows, the cache holds the states recorded from now on."""
+        with self._lock:
+            self._started = time.time()
+            self._entities.clear()
+            self._evicted.clear()
+            self._rows.clear()
+            self._size = 0
+
+    def states_during_period(
+        self,
+        start_ts: float,
+        end_ts: float | None,
+        entity_ids: Iterable[str] | None,
+        include_start_time_state: bool,
+    ) -> dict[str, tuple[CachedStateRow | None, list[CachedStateRow]]] | None:
+        """Return the last state before start_ts and the states until end_ts.
+
+        Returns None if any of the entities may have states in the period
+        that are not cached, or the state before start_ts is needed and
+        not cached. The states of all entities, when entity_ids is None,
+        are never served from the cache.
+        """
+        result: dict[str, tuple[CachedStateRow | None, list[CachedStateRow]]] = {}
+        with self._lock:
+            if entity_ids is None:
+                self.misses += 1
+                return None
+            for entity_id in entity_ids:
+                entity = self._entities.get(entity_id)
+                if entity is None:
+                    complete_since = self._evicted.get(entity_id, self._started)
+                else:
+                    complete_since = entity.complete_since
+                if start_ts < complete_since:
+                    self.misses += 1
+                    return None
+                initial_row = None
+                rows = []
+                for row in () if entity is None else entity.rows:
+                    last_updated_ts = row.last_updated_ts
+                    if last_updated_ts > start_ts:
+                        if end_ts is None or last_updated_ts < end_ts:
+                            rows.append(row)
+                    elif last_updated_ts < start_ts and (
+                        initial_row is None
+                        or last_updated_ts >= initial_row.last_updated_ts
+                    ):
+                        initial_row = row
+                if include_start_time_state and initial_row is None:
+                    self.misses += 1
+                    return None
+                # The rows are in the order they were recorded
+                rows.sort(key=attrgetter("last_updated_ts"))
+                result[entity_id] = (initial_row, rows)
+            self.hits += 1
+        return result
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the size and the hits and misses of the cache."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "states": len(self._rows),
+                "size": self._size,
+                "max_size": self.max_size,
+            }
@@ -2,7 +2,19 @@
 import logging
 
 import sqlalchemy
-from sqlalchemy import ForeignKeyConstraint, MetaData, Table, text
+from sqlalchemy import (
+    ForeignKeyConstraint,
+    Integer,
+    MetaData,
+    Table,
+    bindparam,
+    cast,
+    extract,
+    func,
+    literal_column,
+    select,
+    text,
+)
 from sqlalchemy.exc import (
     InternalError,
     OperationalError,
@@ -15,7 +27,10 @@ from .models import (
     SCHEMA_VERSION,
     TABLE_STATES,
     Base,
+    Events,
     SchemaChanges,
+    States,
+    StatesMeta,
     Statistics,
     StatisticsMeta,
 )
@@ -23,6 +38,9 @@ from .util import session_scope
 
 _LOGGER = logging.getLogger(__name__)
 
+# The number of rows of which the timestamps are filled in at a time
+TIMESTAMP_MIGRATION_BATCH_SIZE = 10000
+
 
 def raise_if_exception_missing_str(ex, match_substrs):
     """Raise an exception if the exception and cause do not contain the match substrs."""
@@ -347,7 +365,7 @@ def _drop_foreign_key_constraints(connection, engine, table, columns):
             )
 
 
-def _apply_update(engine, session, new_version, old_version):
+def _apply_update(engine, session, new_version, old_version):  # noqa: C901
     """Perform operations to bring schema up to date."""
     connection = session.connection()
     if new_version == 1:
@@ -475,10 +493,147 @@ def _apply_update(engine, session, new_version, old_version):
 
         StatisticsMeta.__table__.create(engine)
         Statistics.__table__.create(engine)
+    elif new_version == 19:
+        # The state_attributes table is created by create_all,
+        # existing states keep their attributes inline
+        _add_columns(connection, "states", ["attributes_id INTEGER"])
+        _create_index(connection, "states", "ix_states_attributes_id")
+    elif new_version == 20:
+        # The event_data table is created by create_all,
+        # existing events keep their data inline
+        _add_columns(connection, "events", ["data_id INTEGER"])
+        _create_index(connection, "events", "ix_events_data_id")
+    elif new_version == 21:
+        # The latest_states table is created by create_all, get_states
+        # falls back to scanning the states until it has been filled
+        pass
+    elif new_version == 22:
+        # Reads use epoch timestamp columns, the datetime columns are
+        # no longer written or indexed
+        timestamp_type = (
+            "FLOAT" if engine.dialect.name == "mssql" else "DOUBLE PRECISION"
+        )
+        _add_columns(connection, "events", [f"time_fired_ts {timestamp_type}"])
+        _add_columns(
+            connection,
+            "states",
+            [f"last_changed_ts {timestamp_type}", f"last_updated_ts {timestamp_type}"],
+        )
+        _migrate_columns_to_timestamp(
+            connection, Events.event_id, {Events.time_fired: Events.time_fired_ts}
+        )
+        _migrate_columns_to_timestamp(
+            connection,
+            States.state_id,
+            {
+                States.last_updated: States.last_updated_ts,
+                States.last_changed: States.last_changed_ts,
+            },
+        )
+        _create_index(connection, "events", "ix_events_time_fired_ts")
+        _create_index(connection, "events", "ix_events_event_type_time_fired_ts")
+        _create_index(connection, "states", "ix_states_last_updated_ts")
+        _create_index(connection, "states", "ix_states_entity_id_last_updated_ts")
+        _drop_index(connection, "events", "ix_events_time_fired")
+        _drop_index(connection, "events", "ix_events_event_type_time_fired")
+        _drop_index(connection, "states", "ix_states_last_updated")
+    elif new_version == 23:
+        # The states_meta table is created by create_all, the states
+        # refer to their entity id by its metadata_id and no longer
+        # write the entity_id and domain columns
+        _add_columns(connection, "states", ["metadata_id INTEGER"])
+        _migrate_entity_ids_to_states_meta(connection)
+        _create_index(connection, "states", "ix_states_metadata_id_last_updated_ts")
+        _drop_index(connection, "states", "ix_states_entity_id_last_updated_ts")
+        _drop_index(connection, "states", "ix_states_entity_id_last_updated")
     else:
         raise ValueError(f"No schema migration defined for version {new_version}")
 
 
+def _migrate_columns_to_timestamp(connection, id_column, columns):
+    """Fill in the timestamp columns from their datetime columns.
+
+    The database converts the values itself, one range of primary keys
+    at a time, so no rows are read and each statement stays short.
+    """
+    table = id_column.table
+    dialect_name = connection.dialect.name
+    update = (
+        table.update()
+        .where(id_column.between(bindparam("_first_id"), bindparam("_last_id")))
+        .values(
+            {
+                timestamp_column: _epoch_expression(dialect_name, datetime_column)
+                for datetime_column, timestamp_column in columns.items()
+            }
+        )
+    )
+    first_id, last_id = connection.execute(
+        select([func.min(id_column), func.max(id_column)])
+    ).one()
+    if first_id is None:
+        return
+    for batch_first_id in range(first_id, last_id + 1, TIMESTAMP_MIGRATION_BATCH_SIZE):
+        connection.execute(
+            update,
+            {
+                "_first_id": batch_first_id,
+                "_last_id": batch_first_id + TIMESTAMP_MIGRATION_BATCH_SIZE - 1,
+            },
+        )
+
+
+def _epoch_expression(dialect_name, column):
+    """Return the SQL expression of the epoch timestamp of a datetime column."""
+    if dialect_name == "sqlite":
+        # Naive UTC datetimes are stored as text with 6 digit microseconds
+        return (
+            cast(func.strftime("%s", column), Integer) * 1000000
+            + cast(func.substr(column, 21, 6), Integer)
+        ) / 1000000.0
+    if dialect_name == "postgresql":
+        return extract("epoch", column)
+    if dialect_name == "mysql":
+        # Naive UTC datetimes, UNIX_TIMESTAMP would use the session time zone
+        return func.timestampdiff(
+            literal_column("MICROSECOND"), "1970-01-01 00:00:00", column
+        ) / literal_column("1e6")
+    if dialect_name == "mssql":
+        return func.datediff_big(
+            literal_column("MICROSECOND"), "1970-01-01", column
+        ) / literal_column("1e6")
+    raise ValueError(f"No timestamp migration defined for dialect {dialect_name}")
+
+
+def _migrate_entity_ids_to_states_meta(connection):
+    """Add the entity ids of the states to states_meta and link the states."""
+    known_entity_ids = {
+        entity_id for (entity_id,) in connection.execute(select([StatesMeta.entity_id]))
+    }
+    new_entity_ids = [
+        {"entity_id": entity_id}
+        for (entity_id,) in connection.execute(select([States.entity_id]).distinct())
+        if entity_id is not None and entity_id not in known_entity_ids
+    ]
+    if new_entity_ids:
+        connection.execute(StatesMeta.__table__.insert(), new_entity_ids)
+
+    # One update per entity uses the index on entity_id
+    update = (
+        States.__table__.update()
+        .where(
+            (States.entity_id == bindparam("_entity_id")) & States.metadata_id.is_(None)
+        )
+        .values(metadata_id=bindparam("_metadata_id"))
+    )
+    for metadata_id, entity_id in connection.execute(
+        select([StatesMeta.metadata_id, StatesMeta.entity_id])
+    ).fetchall():
+        connection.execute(
+            update, {"_entity_id": entity_id, "_metadata_id": metadata_id}
+        )
+
+
 def _inspect_schema_version(engine, session):
     """Determine the schema version by inspecting the db structure.
 
@@ -492,7 +647,7 @@ def _inspect_schema_version(engine, session):
     indexes = inspector.get_indexes("events")
 
     for index in indexes:
-        if index["column_names"] == ["time_fired"]:
+        if index["column_names"] in (["time_fired"], ["time_fired_ts"]):
             # Schema addition from version 1 detected. New DB.
             session.add(SchemaChanges(schema_version=SCHEMA_VERSION))
             return SCHEMA_VERSION
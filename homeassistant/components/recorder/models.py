@@ -1,8 +1,10 @@
 """Models for SQLAlchemy."""
 import json
 import logging
+import zlib
 
 from sqlalchemy import (
+    BigInteger,
     Boolean,
     Column,
     DateTime,
@@ -14,6 +16,7 @@ from sqlalchemy import (
     String,
     Text,
     distinct,
+    or_,
 )
 from sqlalchemy.dialects import mysql
 from sqlalchemy.ext.declarative import declarative_base
@@ -28,22 +31,26 @@ from homeassistant.const import (
     MAX_LENGTH_STATE_ENTITY_ID,
     MAX_LENGTH_STATE_STATE,
 )
-from homeassistant.core import Context, Event, EventOrigin, State, split_entity_id
-from homeassistant.helpers.json import JSONEncoder
+from homeassistant.core import Context, Event, EventOrigin, State
+from homeassistant.helpers.json import json_dumps
 import homeassistant.util.dt as dt_util
 
 # SQLAlchemy Schema
 # pylint: disable=invalid-name
 Base = declarative_base()
 
-SCHEMA_VERSION = 18
+SCHEMA_VERSION = 23
 
 _LOGGER = logging.getLogger(__name__)
 
 DB_TIMEZONE = "+00:00"
 
 TABLE_EVENTS = "events"
+TABLE_EVENT_DATA = "event_data"
 TABLE_STATES = "states"
+TABLE_STATES_META = "states_meta"
+TABLE_STATE_ATTRIBUTES = "state_attributes"
+TABLE_LATEST_STATES = "latest_states"
 TABLE_RECORDER_RUNS = "recorder_runs"
 TABLE_SCHEMA_CHANGES = "schema_changes"
 TABLE_STATISTICS = "statistics"
@@ -51,7 +58,11 @@ TABLE_STATISTICS_META = "statistics_meta"
 
 ALL_TABLES = [
     TABLE_STATES,
+    TABLE_STATES_META,
+    TABLE_STATE_ATTRIBUTES,
+    TABLE_LATEST_STATES,
     TABLE_EVENTS,
+    TABLE_EVENT_DATA,
     TABLE_RECORDER_RUNS,
     TABLE_SCHEMA_CHANGES,
     TABLE_STATISTICS,
@@ -61,6 +72,24 @@ ALL_TABLES = [
 DATETIME_TYPE = DateTime(timezone=True).with_variant(
     mysql.DATETIME(timezone=True, fsp=6), "mysql"
 )
+# Epoch timestamps, the FLOAT of MySQL is single precision
+TIMESTAMP_TYPE = Float().with_variant(mysql.DOUBLE(asdecimal=False), "mysql")
+
+
+def _timestamp_default(datetime_column):
+    """Return the default of a timestamp column, the time of its datetime column.
+
+    Keeps the timestamp columns filled for rows that are created with only
+    the datetime columns set.
+    """
+
+    def default(context):
+        value = context.get_current_parameters().get(datetime_column)
+        if value is None:
+            return dt_util.utcnow().timestamp()
+        return process_timestamp(value).timestamp()
+
+    return default
 
 
 class Events(Base):  # type: ignore
@@ -69,7 +98,7 @@ class Events(Base):  # type: ignore
     __table_args__ = (
         # Used for fetching events at a specific time
         # see logbook
-        Index("ix_events_event_type_time_fired", "event_type", "time_fired"),
+        Index("ix_events_event_type_time_fired_ts", "event_type", "time_fired_ts"),
         {"mysql_default_charset": "utf8mb4", "mysql_collate": "utf8mb4_unicode_ci"},
     )
     __tablename__ = TABLE_EVENTS
@@ -77,33 +106,48 @@ class Events(Base):  # type: ignore
     event_type = Column(String(MAX_LENGTH_EVENT_EVENT_TYPE))
     event_data = Column(Text().with_variant(mysql.LONGTEXT, "mysql"))
     origin = Column(String(MAX_LENGTH_EVENT_ORIGIN))
-    time_fired = Column(DATETIME_TYPE, index=True)
+    # Only filled for events recorded before schema version 22
+    time_fired = Column(DATETIME_TYPE)
+    time_fired_ts = Column(
+        TIMESTAMP_TYPE, default=_timestamp_default("time_fired"), index=True
+    )
     created = Column(DATETIME_TYPE, default=dt_util.utcnow)
     context_id = Column(String(MAX_LENGTH_EVENT_CONTEXT_ID), index=True)
     context_user_id = Column(String(MAX_LENGTH_EVENT_CONTEXT_ID), index=True)
     context_parent_id = Column(String(MAX_LENGTH_EVENT_CONTEXT_ID), index=True)
+    data_id = Column(Integer, ForeignKey("event_data.data_id"), index=True)
+    shared_event_data = relationship("EventData", uselist=False)
 
     def __repr__(self) -> str:
         """Return string representation of instance for debugging."""
         return (
             f"<recorder.Events("
             f"id={self.event_id}, type='{self.event_type}', data='{self.event_data}', "
-            f"origin='{self.origin}', time_fired='{self.time_fired}'"
+            f"origin='{self.origin}', time_fired_ts='{self.time_fired_ts}', "
+            f"data_id={self.data_id}"
             f")>"
         )
 
     @staticmethod
     def from_event(event, event_data=None):
         """Create an event database object from a native event."""
-        return Events(
-            event_type=event.event_type,
-            event_data=event_data or json.dumps(event.data, cls=JSONEncoder),
-            origin=str(event.origin.value),
-            time_fired=event.time_fired,
-            context_id=event.context.id,
-            context_user_id=event.context.user_id,
-            context_parent_id=event.context.parent_id,
-        )
+        return Events(**Events.row_from_event(event, event_data))
+
+    @staticmethod
+    def row_from_event(event, event_data=None):
+        """Create the column values of an event row from a native event.
+
+        Used for bulk inserts that bypass the ORM unit of work.
+        """
+        return {
+            "event_type": event.event_type,
+            "event_data": event_data or json_dumps(event.data),
+            "origin": str(event.origin.value),
+            "time_fired_ts": event.time_fired.timestamp(),
+            "context_id": event.context.id,
+            "context_user_id": event.context.user_id,
+            "context_parent_id": event.context.parent_id,
+        }
 
     def to_native(self, validate_entity_id=True):
         """Convert to a natve HA Event."""
@@ -115,9 +159,9 @@ class Events(Base):  # type: ignore
         try:
             return Event(
                 self.event_type,
-                json.loads(self.event_data),
+                json.loads(self.shared_data),
                 EventOrigin(self.origin),
-                process_timestamp(self.time_fired),
+                dt_util.utc_from_timestamp(self.time_fired_ts),
                 context=context,
             )
         except ValueError:
@@ -125,6 +169,53 @@ class Events(Base):  # type: ignore
             _LOGGER.exception("Error converting to event: %s", self)
             return None
 
+    @property
+    def shared_data(self):
+        """Return the event data JSON, stored inline or in the shared table."""
+        if self.event_data is not None:
+            return self.event_data
+        if self.shared_event_data is not None:
+            return self.shared_event_data.shared_data
+        return "{}"
+
+
+class EventData(Base):  # type: ignore
+    """Event data shared between events with the same data."""
+
+    __table_args__ = (
+        {"mysql_default_charset": "utf8mb4", "mysql_collate": "utf8mb4_unicode_ci"},
+    )
+    __tablename__ = TABLE_EVENT_DATA
+    data_id = Column(Integer, Identity(), primary_key=True)
+    hash = Column(BigInteger, index=True)
+    # Note that this is not named event_data to avoid confusion with the events table
+    shared_data = Column(Text().with_variant(mysql.LONGTEXT, "mysql"))
+
+    def __repr__(self) -> str:
+        """Return string representation of instance for debugging."""
+        return (
+            f"<recorder.EventData("
+            f"id={self.data_id}, hash='{self.hash}', data='{self.shared_data}'"
+            f")>"
+        )
+
+    @staticmethod
+    def row_from_shared_data(shared_data):
+        """Create the column values of an event data row from the data JSON."""
+        return {
+            "hash": hash_shared_json(shared_data),
+            "shared_data": shared_data,
+        }
+
+    def to_native(self, validate_entity_id=True):
+        """Convert to an event data dictionary."""
+        try:
+            return json.loads(self.shared_data)
+        except ValueError:
+            # When json.loads fails
+            _LOGGER.exception("Error converting row to event data: %s", self)
+            return {}
+
 
 class States(Base):  # type: ignore
     """State change history."""
@@ -132,7 +223,9 @@ class States(Base):  # type: ignore
     __table_args__ = (
         # Used for fetching the state of entities at a specific time
         # (get_states in history.py)
-        Index("ix_states_entity_id_last_updated", "entity_id", "last_updated"),
+        Index(
+            "ix_states_metadata_id_last_updated_ts", "metadata_id", "last_updated_ts"
+        ),
         {"mysql_default_charset": "utf8mb4", "mysql_collate": "utf8mb4_unicode_ci"},
     )
     __tablename__ = TABLE_STATES
@@ -144,12 +237,23 @@ class States(Base):  # type: ignore
     event_id = Column(
         Integer, ForeignKey("events.event_id", ondelete="CASCADE"), index=True
     )
-    last_changed = Column(DATETIME_TYPE, default=dt_util.utcnow)
-    last_updated = Column(DATETIME_TYPE, default=dt_util.utcnow, index=True)
+    # Only filled for states recorded before schema version 22
+    last_changed = Column(DATETIME_TYPE)
+    last_updated = Column(DATETIME_TYPE)
+    last_changed_ts = Column(TIMESTAMP_TYPE, default=_timestamp_default("last_changed"))
+    last_updated_ts = Column(
+        TIMESTAMP_TYPE, default=_timestamp_default("last_updated"), index=True
+    )
     created = Column(DATETIME_TYPE, default=dt_util.utcnow)
     old_state_id = Column(Integer, ForeignKey("states.state_id"), index=True)
+    attributes_id = Column(
+        Integer, ForeignKey("state_attributes.attributes_id"), index=True
+    )
+    metadata_id = Column(Integer, ForeignKey(f"{TABLE_STATES_META}.metadata_id"))
     event = relationship("Events", uselist=False)
     old_state = relationship("States", remote_side=[state_id])
+    state_attributes = relationship("StateAttributes", uselist=False)
+    states_meta = relationship("StatesMeta", uselist=False)
 
     def __repr__(self) -> str:
         """Return string representation of instance for debugging."""
@@ -157,44 +261,61 @@ class States(Base):  # type: ignore
             f"<recorder.States("
             f"id={self.state_id}, domain='{self.domain}', entity_id='{self.entity_id}', "
             f"state='{self.state}', event_id='{self.event_id}', "
-            f"last_updated='{self.last_updated.isoformat(sep=' ', timespec='seconds')}', "
-            f"old_state_id={self.old_state_id}"
+            f"last_updated_ts='{self.last_updated_ts}', "
+            f"old_state_id={self.old_state_id}, attributes_id={self.attributes_id}, "
+            f"metadata_id={self.metadata_id}"
             f")>"
         )
 
     @staticmethod
     def from_event(event):
         """Create object from a state_changed event."""
-        entity_id = event.data["entity_id"]
-        state = event.data.get("new_state")
+        return States(
+            **States.row_from_event(event),
+            states_meta=StatesMeta(entity_id=event.data["entity_id"]),
+        )
 
-        dbstate = States(entity_id=entity_id)
+    @staticmethod
+    def row_from_event(event):
+        """Create the column values of a state row from a state_changed event.
+
+        Used for bulk inserts that bypass the ORM unit of work. The entity id
+        is not stored in the row, the states refer to it by metadata_id.
+        """
+        state = event.data.get("new_state")
 
         # State got deleted
         if state is None:
-            dbstate.state = ""
-            dbstate.domain = split_entity_id(entity_id)[0]
-            dbstate.attributes = "{}"
-            dbstate.last_changed = event.time_fired
-            dbstate.last_updated = event.time_fired
-        else:
-            dbstate.domain = state.domain
-            dbstate.state = state.state
-            dbstate.attributes = json.dumps(dict(state.attributes), cls=JSONEncoder)
-            dbstate.last_changed = state.last_changed
-            dbstate.last_updated = state.last_updated
-
-        return dbstate
+            time_fired_ts = event.time_fired.timestamp()
+            return {
+                "state": "",
+                "attributes": "{}",
+                "last_changed_ts": time_fired_ts,
+                "last_updated_ts": time_fired_ts,
+            }
+
+        last_updated_ts = state.last_updated.timestamp()
+        return {
+            "state": state.state,
+            "attributes": json_dumps(state.attributes),
+            "last_changed_ts": (
+                last_updated_ts
+                if state.last_changed == state.last_updated
+                else state.last_changed.timestamp()
+            ),
+            "last_updated_ts": last_updated_ts,
+        }
 
     def to_native(self, validate_entity_id=True):
         """Convert to an HA state object."""
         try:
             return State(
-                self.entity_id,
+                # States recorded before schema version 23 have the entity id
+                self.entity_id or self.states_meta.entity_id,
                 self.state,
-                json.loads(self.attributes),
-                process_timestamp(self.last_changed),
-                process_timestamp(self.last_updated),
+                json.loads(self.shared_attrs),
+                dt_util.utc_from_timestamp(self.last_changed_ts),
+                dt_util.utc_from_timestamp(self.last_updated_ts),
                 # Join the events table on event_id to get the context instead
                 # as it will always be there for state_changed events
                 context=Context(id=None),
@@ -205,6 +326,116 @@ class States(Base):  # type: ignore
             _LOGGER.exception("Error converting row to state: %s", self)
             return None
 
+    @property
+    def shared_attrs(self):
+        """Return the attributes JSON, stored inline or in the shared table."""
+        if self.attributes is not None:
+            return self.attributes
+        if self.state_attributes is not None:
+            return self.state_attributes.shared_attrs
+        return "{}"
+
+
+class StatesMeta(Base):  # type: ignore
+    """The entity ids of the states, so the states refer to them by integer."""
+
+    __table_args__ = (
+        {"mysql_default_charset": "utf8mb4", "mysql_collate": "utf8mb4_unicode_ci"},
+    )
+    __tablename__ = TABLE_STATES_META
+    metadata_id = Column(Integer, Identity(), primary_key=True)
+    entity_id = Column(String(MAX_LENGTH_STATE_ENTITY_ID), index=True, unique=True)
+
+    @staticmethod
+    def entity_id_in_domains(domains):
+        """Return the filter of the entity ids of the domains."""
+        return or_(
+            *(
+                StatesMeta.entity_id.startswith(f"{domain}.", autoescape=True)
+                for domain in domains
+            )
+        )
+
+    def __repr__(self) -> str:
+        """Return string representation of instance for debugging."""
+        return (
+            f"<recorder.StatesMeta("
+            f"id={self.metadata_id}, entity_id='{self.entity_id}'"
+            f")>"
+        )
+
+
+class StateAttributes(Base):  # type: ignore
+    """State attributes shared between state rows with the same attributes."""
+
+    __table_args__ = (
+        {"mysql_default_charset": "utf8mb4", "mysql_collate": "utf8mb4_unicode_ci"},
+    )
+    __tablename__ = TABLE_STATE_ATTRIBUTES
+    attributes_id = Column(Integer, Identity(), primary_key=True)
+    hash = Column(BigInteger, index=True)
+    # Note that this is not named attributes to avoid confusion with the states table
+    shared_attrs = Column(Text().with_variant(mysql.LONGTEXT, "mysql"))
+
+    def __repr__(self) -> str:
+        """Return string representation of instance for debugging."""
+        return (
+            f"<recorder.StateAttributes("
+            f"id={self.attributes_id}, hash='{self.hash}', attributes='{self.shared_attrs}'"
+            f")>"
+        )
+
+    @staticmethod
+    def row_from_shared_attrs(shared_attrs):
+        """Create the column values of an attributes row from the attributes JSON."""
+        return {
+            "hash": hash_shared_json(shared_attrs),
+            "shared_attrs": shared_attrs,
+        }
+
+    def to_native(self, validate_entity_id=True):
+        """Convert to a state attributes dictionary."""
+        try:
+            return json.loads(self.shared_attrs)
+        except ValueError:
+            # When json.loads fails
+            _LOGGER.exception("Error converting row to state attributes: %s", self)
+            return {}
+
+
+class LatestStates(Base):  # type: ignore
+    """The last state of each entity before the start of an hour.
+
+    Written by the recorder at the first state change of every hour, for
+    the entities that have a state in the current recorder run, so the
+    states at a point in time only need the states since the start of
+    its hour (get_states in history.py).
+    """
+
+    __table_args__ = (
+        {"mysql_default_charset": "utf8mb4", "mysql_collate": "utf8mb4_unicode_ci"},
+    )
+    __tablename__ = TABLE_LATEST_STATES
+    id = Column(Integer, Identity(), primary_key=True)
+    bucket_start = Column(DATETIME_TYPE, index=True)
+    entity_id = Column(String(MAX_LENGTH_STATE_ENTITY_ID))
+    # Not a foreign key, purging entities may delete the state first
+    state_id = Column(Integer)
+
+    def __repr__(self) -> str:
+        """Return string representation of instance for debugging."""
+        return (
+            f"<recorder.LatestStates("
+            f"id={self.id}, bucket_start='{self.bucket_start}', "
+            f"entity_id='{self.entity_id}', state_id={self.state_id}"
+            f")>"
+        )
+
+
+def latest_states_bucket(point_in_time):
+    """Return the start of the latest states bucket a point in time is in."""
+    return point_in_time.replace(minute=0, second=0, microsecond=0)
+
 
 class Statistics(Base):  # type: ignore
     """Statistics."""
@@ -296,14 +527,18 @@ class RecorderRuns(Base):  # type: ignore
 
         assert session is not None, "RecorderRuns need to be persisted"
 
-        query = session.query(distinct(States.entity_id)).filter(
-            States.last_updated >= self.start
+        query = (
+            session.query(distinct(StatesMeta.entity_id))
+            .join(States, States.metadata_id == StatesMeta.metadata_id)
+            .filter(States.last_updated_ts >= process_timestamp(self.start).timestamp())
         )
 
         if point_in_time is not None:
-            query = query.filter(States.last_updated < point_in_time)
+            query = query.filter(States.last_updated_ts < point_in_time.timestamp())
         elif self.end is not None:
-            query = query.filter(States.last_updated < self.end)
+            query = query.filter(
+                States.last_updated_ts < process_timestamp(self.end).timestamp()
+            )
 
         return [row[0] for row in query]
 
@@ -330,6 +565,15 @@ class SchemaChanges(Base):  # type: ignore
         )
 
 
+def hash_shared_json(shared_json):
+    """Return the hash of a JSON document stored in a shared table.
+
+    The hash is only used to narrow down lookups, rows with
+    the same hash are told apart by comparing the JSON.
+    """
+    return zlib.crc32(shared_json.encode("utf-8"))
+
+
 def process_timestamp(ts):
     """Process a timestamp into datetime object."""
     if ts is None:
@@ -340,6 +584,13 @@ def process_timestamp(ts):
     return dt_util.as_utc(ts)
 
 
+def timestamp_to_utc_isoformat(ts):
+    """Process an epoch timestamp into UTC isotime."""
+    if ts is None:
+        return None
+    return dt_util.utc_from_timestamp(ts).isoformat()
+
+
 def process_timestamp_to_utc_isoformat(ts):
     """Process a timestamp into UTC isotime."""
     if ts is None:
@@ -373,13 +624,16 @@ class LazyState(State):
         self._last_changed = None
         self._last_updated = None
         self._context = None
+        self._as_dict_json = None
 
     @property  # type: ignore
     def attributes(self):
         """State attributes."""
         if not self._attributes:
             try:
-                self._attributes = json.loads(self._row.attributes)
+                self._attributes = json.loads(
+                    self._row.shared_attrs or self._row.attributes
+                )
             except ValueError:
                 # When json.loads fails
                 _LOGGER.exception("Error converting row to state: %s", self._row)
@@ -390,6 +644,7 @@ class LazyState(State):
     def attributes(self, value):
         """Set attributes."""
         self._attributes = value
+        self._as_dict_json = None
 
     @property  # type: ignore
     def context(self):
@@ -402,30 +657,33 @@ class LazyState(State):
     def context(self, value):
         """Set context."""
         self._context = value
+        self._as_dict_json = None
 
     @property  # type: ignore
     def last_changed(self):
         """Last changed datetime."""
         if not self._last_changed:
-            self._last_changed = process_timestamp(self._row.last_changed)
+            self._last_changed = dt_util.utc_from_timestamp(self._row.last_changed_ts)
         return self._last_changed
 
     @last_changed.setter
     def last_changed(self, value):
         """Set last changed datetime."""
         self._last_changed = value
+        self._as_dict_json = None
 
     @property  # type: ignore
     def last_updated(self):
         """Last updated datetime."""
         if not self._last_updated:
-            self._last_updated = process_timestamp(self._row.last_updated)
+            self._last_updated = dt_util.utc_from_timestamp(self._row.last_updated_ts)
         return self._last_updated
 
     @last_updated.setter
     def last_updated(self, value):
         """Set last updated datetime."""
         self._last_updated = value
+        self._as_dict_json = None
 
     def as_dict(self):
         """Return a dict representation of the LazyState.
@@ -437,14 +695,19 @@ class LazyState(State):
         if self._last_changed:
             last_changed_isoformat = self._last_changed.isoformat()
         else:
-            last_changed_isoformat = process_timestamp_to_utc_isoformat(
-                self._row.last_changed
+            last_changed_isoformat = timestamp_to_utc_isoformat(
+                self._row.last_changed_ts
             )
         if self._last_updated:
             last_updated_isoformat = self._last_updated.isoformat()
+        elif (
+            not self._last_changed
+            and self._row.last_updated_ts == self._row.last_changed_ts
+        ):
+            last_updated_isoformat = last_changed_isoformat
         else:
-            last_updated_isoformat = process_timestamp_to_utc_isoformat(
-                self._row.last_updated
+            last_updated_isoformat = timestamp_to_utc_isoformat(
+                self._row.last_updated_ts
             )
         return {
             "entity_id": self.entity_id,
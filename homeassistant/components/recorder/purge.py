@@ -1,15 +1,28 @@
 """Purge old data helper."""
 from __future__ import annotations
 
+from dataclasses import dataclass, field
 from datetime import datetime
 import logging
-from typing import TYPE_CHECKING, Callable
+import time
+from typing import TYPE_CHECKING, Any, Callable
 
+from sqlalchemy import Column
 from sqlalchemy.orm.session import Session
 from sqlalchemy.sql.expression import distinct
 
-from .const import MAX_ROWS_TO_PURGE
-from .models import Events, RecorderRuns, States
+import homeassistant.util.dt as dt_util
+
+from .const import MAX_ROWS_TO_PURGE, PURGE_TIME_SLICE
+from .models import (
+    EventData,
+    Events,
+    LatestStates,
+    RecorderRuns,
+    StateAttributes,
+    States,
+    StatesMeta,
+)
 from .repack import repack_database
 from .util import retryable_database_job, session_scope
 
@@ -19,70 +32,232 @@ if TYPE_CHECKING:
 _LOGGER = logging.getLogger(__name__)
 
 
+@dataclass
+class PurgeProgress:
+    """Progress of purging the states and events before purge_before."""
+
+    purge_before: datetime
+    started: datetime = field(default_factory=dt_util.utcnow)
+    states_purged: int = 0
+    events_purged: int = 0
+    # Estimated from the ids, None until the first batch is purged
+    states_remaining: int | None = None
+    events_remaining: int | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the progress as a dictionary."""
+        return {
+            "purge_before": self.purge_before.isoformat(),
+            "started": self.started.isoformat(),
+            "states_purged": self.states_purged,
+            "events_purged": self.events_purged,
+            "states_remaining": self.states_remaining,
+            "events_remaining": self.events_remaining,
+        }
+
+
 @retryable_database_job("purge")
 def purge_old_data(
     instance: Recorder, purge_before: datetime, repack: bool, apply_filter: bool = False
 ) -> bool:
     """Purge events and states older than purge_before.
 
-    Cleans up an timeframe of an hour, based on the oldest record.
+    Purges batches of the oldest states, then events, for at most
+    PURGE_TIME_SLICE seconds, so the recorder writes the queued events
+    between the slices. Returns False while there is more to purge.
     """
     _LOGGER.debug(
         "Purging states and events before target %s",
         purge_before.isoformat(sep=" ", timespec="seconds"),
     )
+    progress = instance.purge_progress
+    if progress is None or progress.purge_before != purge_before:
+        progress = instance.purge_progress = PurgeProgress(purge_before)
+    purge_before_ts = purge_before.timestamp()
+    slice_end = time.monotonic() + PURGE_TIME_SLICE
 
     with session_scope(session=instance.get_session()) as session:  # type: ignore
-        # Purge a max of MAX_ROWS_TO_PURGE, based on the oldest states or events record
-        event_ids = _select_event_ids_to_purge(session, purge_before)
-        state_ids = _select_state_ids_to_purge(session, purge_before, event_ids)
-        if state_ids:
-            _purge_state_ids(session, state_ids)
-        if event_ids:
-            _purge_event_ids(session, event_ids)
-            # If states or events purging isn't processing the purge_before yet,
-            # return false, as we are not done yet.
+        purged_rows = False
+        # The states are purged first as they refer to the events
+        for purge_batch in (_purge_states_batch, _purge_events_batch):
+            while purge_batch(instance, session, purge_before_ts, progress):
+                purged_rows = True
+                if time.monotonic() >= slice_end:
+                    _LOGGER.debug("Purging hasn't fully completed yet")
+                    return False
+        if purged_rows:
+            # The cleanups run in a slice of their own
             _LOGGER.debug("Purging hasn't fully completed yet")
             return False
         if apply_filter and _purge_filtered_data(instance, session) is False:
             _LOGGER.debug("Cleanup filtered data hasn't fully completed yet")
             return False
+        _purge_old_latest_states(session, purge_before)
         _purge_old_recorder_runs(instance, session, purge_before)
     if repack:
         repack_database(instance)
     return True
 
 
-def _select_event_ids_to_purge(session: Session, purge_before: datetime) -> list[int]:
-    """Return a list of event ids to purge."""
-    events = (
-        session.query(Events.event_id)
-        .filter(Events.time_fired < purge_before)
-        .limit(MAX_ROWS_TO_PURGE)
+def _select_id_range_to_purge(
+    session: Session, id_column: Column, time_column: Column, purge_before_ts: float
+) -> tuple[int, int, int] | None:
+    """Return the first and last id of the next range to purge and the last id to purge.
+
+    The range starts at the oldest row before purge_before and holds at most
+    MAX_ROWS_TO_PURGE ids, up to the newest row before purge_before. Both
+    rows are found with the index on the time column.
+    """
+    first_id = (
+        session.query(id_column)
+        .filter(time_column < purge_before_ts)
+        .order_by(time_column, id_column)
+        .limit(1)
+        .scalar()
+    )
+    if first_id is None:
+        return None
+    end_id = (
+        session.query(id_column)
+        .filter(time_column < purge_before_ts)
+        .order_by(time_column.desc(), id_column.desc())
+        .limit(1)
+        .scalar()
+    )
+    # A row written out of time order is purged on its own
+    end_id = max(end_id, first_id)
+    return first_id, min(first_id + MAX_ROWS_TO_PURGE - 1, end_id), end_id
+
+
+def _purge_states_batch(
+    instance: Recorder,
+    session: Session,
+    purge_before_ts: float,
+    progress: PurgeProgress,
+) -> bool:
+    """Disconnect and delete the next range of states to purge.
+
+    Returns False if there are no states to purge.
+    """
+    id_range = _select_id_range_to_purge(
+        session, States.state_id, States.last_updated_ts, purge_before_ts
+    )
+    if id_range is None:
+        progress.states_remaining = 0
+        return False
+    first_id, last_id, end_id = id_range
+    in_range = States.state_id.between(first_id, last_id)
+    purged = in_range & (States.last_updated_ts < purge_before_ts)
+
+    # The states in the range that were written out of time order are kept
+    kept_state_ids = [
+        state_id
+        for (state_id,) in session.query(States.state_id).filter(
+            in_range & (States.last_updated_ts >= purge_before_ts)
+        )
+    ]
+    attributes_ids = [
+        attributes_id
+        for (attributes_id,) in session.query(distinct(States.attributes_id))
+        .filter(purged)
+        .filter(States.attributes_id.isnot(None))
         .all()
+    ]
+
+    # Update old_state_id to NULL before deleting to ensure
+    # the delete does not fail due to a foreign key constraint
+    # since some databases (MSSQL) cannot do the ON DELETE SET NULL
+    # for us.
+    disconnect_query = session.query(States).filter(
+        States.old_state_id.between(first_id, last_id)
+    )
+    if kept_state_ids:
+        disconnect_query = disconnect_query.filter(
+            States.old_state_id.notin_(kept_state_ids)
+        )
+    disconnected_rows = disconnect_query.update(
+        {"old_state_id": None}, synchronize_session=False
     )
-    _LOGGER.debug("Selected %s event ids to remove", len(events))
-    return [event.event_id for event in events]
+    _LOGGER.debug("Updated %s states to remove old_state_id", disconnected_rows)
 
+    deleted_rows = (
+        session.query(States).filter(purged).delete(synchronize_session=False)
+    )
+    _LOGGER.debug(
+        "Deleted %s states with ids from %s to %s", deleted_rows, first_id, last_id
+    )
+    progress.states_purged += deleted_rows
+    progress.states_remaining = end_id - last_id
+
+    # Evict any entries in the old_state_ids cache referring to a purged state
+    old_state_ids = instance._old_state_ids  # pylint: disable=protected-access
+    for entity_id, old_state_id in list(old_state_ids.items()):
+        if (
+            old_state_id is not None
+            and first_id <= old_state_id <= last_id
+            and old_state_id not in kept_state_ids
+        ):
+            del old_state_ids[entity_id]
+
+    if attributes_ids:
+        _purge_unused_attributes_ids(instance, session, attributes_ids)
+    return True
+
+
+def _purge_events_batch(
+    instance: Recorder,
+    session: Session,
+    purge_before_ts: float,
+    progress: PurgeProgress,
+) -> bool:
+    """Delete the next range of events to purge.
+
+    Returns False if there are no events to purge.
+    """
+    id_range = _select_id_range_to_purge(
+        session, Events.event_id, Events.time_fired_ts, purge_before_ts
+    )
+    if id_range is None:
+        progress.events_remaining = 0
+        return False
+    first_id, last_id, end_id = id_range
+    purged = Events.event_id.between(first_id, last_id) & (
+        Events.time_fired_ts < purge_before_ts
+    )
 
-def _select_state_ids_to_purge(
-    session: Session, purge_before: datetime, event_ids: list[int]
-) -> list[int]:
-    """Return a list of state ids to purge."""
-    if not event_ids:
-        return []
-    states = (
-        session.query(States.state_id)
-        .filter(States.last_updated < purge_before)
-        .filter(States.event_id.in_(event_ids))
+    data_ids = [
+        data_id
+        for (data_id,) in session.query(distinct(Events.data_id))
+        .filter(purged)
+        .filter(Events.data_id.isnot(None))
         .all()
+    ]
+
+    deleted_rows = (
+        session.query(Events).filter(purged).delete(synchronize_session=False)
+    )
+    _LOGGER.debug(
+        "Deleted %s events with ids from %s to %s", deleted_rows, first_id, last_id
     )
-    _LOGGER.debug("Selected %s state ids to remove", len(states))
-    return [state.state_id for state in states]
+    progress.events_purged += deleted_rows
+    progress.events_remaining = end_id - last_id
+
+    if data_ids:
+        _purge_unused_data_ids(instance, session, data_ids)
+    return True
 
 
-def _purge_state_ids(session: Session, state_ids: list[int]) -> None:
+def _purge_state_ids(
+    instance: Recorder, session: Session, state_ids: list[int]
+) -> None:
     """Disconnect states and delete by state id."""
+    attributes_ids = [
+        attributes_id
+        for (attributes_id,) in session.query(distinct(States.attributes_id))
+        .filter(States.state_id.in_(state_ids))
+        .filter(States.attributes_id.isnot(None))
+        .all()
+    ]
 
     # Update old_state_id to NULL before deleting to ensure
     # the delete does not fail due to a foreign key constraint
@@ -102,9 +277,68 @@ def _purge_state_ids(session: Session, state_ids: list[int]) -> None:
     )
     _LOGGER.debug("Deleted %s states", deleted_rows)
 
+    # Evict any entries in the old_state_ids cache referring to a purged state
+    _evict_purged_states_from_old_states_cache(instance, state_ids)
 
-def _purge_event_ids(session: Session, event_ids: list[int]) -> None:
+    if attributes_ids:
+        _purge_unused_attributes_ids(instance, session, attributes_ids)
+
+
+def _evict_purged_states_from_old_states_cache(
+    instance: Recorder, purged_state_ids: list[int]
+) -> None:
+    """Evict purged states from the old state ids cache."""
+    # Make a map from old_state_id to entity_id
+    old_state_ids = instance._old_state_ids  # pylint: disable=protected-access
+    old_state_reversed = {
+        old_state_id: entity_id for entity_id, old_state_id in old_state_ids.items()
+    }
+
+    # Evict any purged state from the old states cache
+    for purged_state_id in set(purged_state_ids).intersection(old_state_reversed):
+        old_state_ids.pop(old_state_reversed[purged_state_id], None)
+
+
+def _purge_unused_attributes_ids(
+    instance: Recorder, session: Session, attributes_ids: list[int]
+) -> None:
+    """Delete the attributes ids that are no longer used by any state."""
+    used_attributes_ids = {
+        attributes_id
+        for (attributes_id,) in session.query(distinct(States.attributes_id))
+        .filter(States.attributes_id.in_(attributes_ids))
+        .all()
+    }
+    unused_attributes_ids = set(attributes_ids) - used_attributes_ids
+    if not unused_attributes_ids:
+        return
+
+    deleted_rows = (
+        session.query(StateAttributes)
+        .filter(StateAttributes.attributes_id.in_(unused_attributes_ids))
+        .delete(synchronize_session=False)
+    )
+    _LOGGER.debug("Deleted %s attribute states", deleted_rows)
+
+    # Evict any entries in the state attributes ids cache referring to a purged row
+    state_attributes_ids = (
+        instance._state_attributes_ids  # pylint: disable=protected-access
+    )
+    state_attributes_ids.evict_values(unused_attributes_ids)
+
+
+def _purge_event_ids(
+    instance: Recorder, session: Session, event_ids: list[int]
+) -> None:
     """Delete by event id."""
+    data_ids = [
+        data_id
+        for (data_id,) in session.query(distinct(Events.data_id))
+        .filter(Events.event_id.in_(event_ids))
+        .filter(Events.data_id.isnot(None))
+        .all()
+    ]
+
     deleted_rows = (
         session.query(Events)
         .filter(Events.event_id.in_(event_ids))
@@ -112,6 +346,45 @@ def _purge_event_ids(session: Session, event_ids: list[int]) -> None:
     )
     _LOGGER.debug("Deleted %s events", deleted_rows)
 
+    if data_ids:
+        _purge_unused_data_ids(instance, session, data_ids)
+
+
+def _purge_unused_data_ids(
+    instance: Recorder, session: Session, data_ids: list[int]
+) -> None:
+    """Delete the event data ids that are no longer used by any event."""
+    used_data_ids = {
+        data_id
+        for (data_id,) in session.query(distinct(Events.data_id))
+        .filter(Events.data_id.in_(data_ids))
+        .all()
+    }
+    unused_data_ids = set(data_ids) - used_data_ids
+    if not unused_data_ids:
+        return
+
+    deleted_rows = (
+        session.query(EventData)
+        .filter(EventData.data_id.in_(unused_data_ids))
+        .delete(synchronize_session=False)
+    )
+    _LOGGER.debug("Deleted %s data events", deleted_rows)
+
+    # Evict any entries in the event data ids cache referring to a purged row
+    event_data_ids = instance._event_data_ids  # pylint: disable=protected-access
+    event_data_ids.evict_values(unused_data_ids)
+
+
+def _purge_old_latest_states(session: Session, purge_before: datetime) -> None:
+    """Purge the latest states of the buckets before purge_before."""
+    deleted_rows = (
+        session.query(LatestStates)
+        .filter(LatestStates.bucket_start < purge_before)
+        .delete(synchronize_session=False)
+    )
+    _LOGGER.debug("Deleted %s latest states", deleted_rows)
+
 
 def _purge_old_recorder_runs(
     instance: Recorder, session: Session, purge_before: datetime
@@ -132,13 +405,15 @@ def _purge_filtered_data(instance: Recorder, session: Session) -> bool:
     _LOGGER.debug("Cleanup filtered data")
 
     # Check if excluded entity_ids are in database
-    excluded_entity_ids: list[str] = [
-        entity_id
-        for (entity_id,) in session.query(distinct(States.entity_id)).all()
+    excluded_metadata_ids: list[int] = [
+        metadata_id
+        for (metadata_id, entity_id) in session.query(
+            StatesMeta.metadata_id, StatesMeta.entity_id
+        ).all()
         if not instance.entity_filter(entity_id)
     ]
-    if len(excluded_entity_ids) > 0:
-        _purge_filtered_states(session, excluded_entity_ids)
+    if len(excluded_metadata_ids) > 0:
+        _purge_filtered_states(instance, session, excluded_metadata_ids)
         return False
 
     # Check if excluded event_types are in database
@@ -148,33 +423,56 @@ def _purge_filtered_data(instance: Recorder, session: Session) -> bool:
         if event_type in instance.exclude_t
     ]
     if len(excluded_event_types) > 0:
-        _purge_filtered_events(session, excluded_event_types)
+        _purge_filtered_events(instance, session, excluded_event_types)
         return False
 
     return True
 
 
-def _purge_filtered_states(session: Session, excluded_entity_ids: list[str]) -> None:
-    """Remove filtered states and linked events."""
-    state_ids: list[int]
-    event_ids: list[int | None]
-    state_ids, event_ids = zip(
-        *(
-            session.query(States.state_id, States.event_id)
-            .filter(States.entity_id.in_(excluded_entity_ids))
-            .limit(MAX_ROWS_TO_PURGE)
-            .all()
-        )
+def _purge_filtered_states(
+    instance: Recorder, session: Session, excluded_metadata_ids: list[int]
+) -> None:
+    """Remove filtered states and linked events.
+
+    Once all their states are removed, the states meta rows are removed too.
+    """
+    rows = (
+        session.query(States.state_id, States.event_id)
+        .filter(States.metadata_id.in_(excluded_metadata_ids))
+        .limit(MAX_ROWS_TO_PURGE)
+        .all()
     )
-    event_ids = [id_ for id_ in event_ids if id_ is not None]
+    if not rows:
+        _purge_states_meta_ids(instance, session, excluded_metadata_ids)
+        return
+    state_ids: list[int] = [state_id for state_id, _ in rows]
+    event_ids: list[int] = [event_id for _, event_id in rows if event_id is not None]
     _LOGGER.debug(
         "Selected %s state_ids to remove that should be filtered", len(state_ids)
     )
-    _purge_state_ids(session, state_ids)
-    _purge_event_ids(session, event_ids)  # type: ignore  # type of event_ids already narrowed to 'list[int]'
+    _purge_state_ids(instance, session, state_ids)
+    _purge_event_ids(instance, session, event_ids)
+
+
+def _purge_states_meta_ids(
+    instance: Recorder, session: Session, metadata_ids: list[int]
+) -> None:
+    """Delete states meta rows, which must no longer be used by any state."""
+    deleted_rows = (
+        session.query(StatesMeta)
+        .filter(StatesMeta.metadata_id.in_(metadata_ids))
+        .delete(synchronize_session=False)
+    )
+    _LOGGER.debug("Deleted %s states meta", deleted_rows)
 
+    # Evict any entries in the states meta ids cache referring to a purged row
+    states_meta_ids = instance._states_meta_ids  # pylint: disable=protected-access
+    states_meta_ids.evict_values(metadata_ids)
 
-def _purge_filtered_events(session: Session, excluded_event_types: list[str]) -> None:
+
+def _purge_filtered_events(
+    instance: Recorder, session: Session, excluded_event_types: list[str]
+) -> None:
     """Remove filtered events and linked states."""
     events: list[Events] = (
         session.query(Events.event_id)
@@ -190,23 +488,27 @@ def _purge_filtered_events(session: Session, excluded_event_types: list[str]) ->
         session.query(States.state_id).filter(States.event_id.in_(event_ids)).all()
     )
     state_ids: list[int] = [state.state_id for state in states]
-    _purge_state_ids(session, state_ids)
-    _purge_event_ids(session, event_ids)
+    _purge_state_ids(instance, session, state_ids)
+    _purge_event_ids(instance, session, event_ids)
 
 
 @retryable_database_job("purge")
 def purge_entity_data(instance: Recorder, entity_filter: Callable[[str], bool]) -> bool:
     """Purge states and events of specified entities."""
     with session_scope(session=instance.get_session()) as session:  # type: ignore
-        selected_entity_ids: list[str] = [
-            entity_id
-            for (entity_id,) in session.query(distinct(States.entity_id)).all()
+        selected_metadata_ids: dict[int, str] = {
+            metadata_id: entity_id
+            for (metadata_id, entity_id) in session.query(
+                StatesMeta.metadata_id, StatesMeta.entity_id
+            ).all()
             if entity_filter(entity_id)
-        ]
-        _LOGGER.debug("Purging entity data for %s", selected_entity_ids)
-        if len(selected_entity_ids) > 0:
+        }
+        _LOGGER.debug(
+            "Purging entity data for %s", list(selected_metadata_ids.values())
+        )
+        if len(selected_metadata_ids) > 0:
             # Purge a max of MAX_ROWS_TO_PURGE, based on the oldest states or events record
-            _purge_filtered_states(session, selected_entity_ids)
+            _purge_filtered_states(instance, session, list(selected_metadata_ids))
             _LOGGER.debug("Purging entity data hasn't fully completed yet")
             return False
 
@@ -1,15 +1,17 @@
 """SQLAlchemy util functions."""
 from __future__ import annotations
 
-from collections.abc import Generator
+from collections import OrderedDict
+from collections.abc import Generator, Hashable, Iterable
 from contextlib import contextmanager
 from datetime import timedelta
 import functools
 import logging
 import os
 import time
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
+from sqlalchemy import Column, func, text
 from sqlalchemy.exc import OperationalError, SQLAlchemyError
 from sqlalchemy.orm.session import Session
 
@@ -36,6 +38,9 @@ RETRIES = 3
 QUERY_RETRY_WAIT = 0.1
 SQLITE3_POSTFIXES = ["", "-wal", "-shm"]
 
+# The number of primary keys reserved from a PostgreSQL sequence at a time
+PRIMARY_KEY_RESERVE = 10000
+
 # This is the maximum time after the recorder ends the session
 # before we no longer consider startup to be a "restart" and we
 # should do a check on the sqlite3 database.
@@ -91,6 +96,110 @@ def commit(session, work):
     return False
 
 
+class PrimaryKeyAllocator:
+    """Allocate the primary keys of the rows the recorder bulk inserts.
+
+    The last key is read once when the event session is opened and then
+    advanced in memory, so the keys of purged rows are never handed out
+    again. On PostgreSQL blocks of keys are reserved from the sequence of
+    the column, so it stays ahead of the keys handed out across restarts.
+    Only safe for tables where the recorder is the only writer.
+    """
+
+    def __init__(self, column: Column) -> None:
+        """Initialize the allocator of the keys of column."""
+        self.column = column
+        self._last_id = 0
+        self._reserved_id: int | None = None
+
+    def _sequence(self) -> str:
+        """Return the expression of the PostgreSQL sequence of the column."""
+        return (
+            f"pg_get_serial_sequence('{self.column.table.name}', '{self.column.key}')"
+        )
+
+    def seed(self, session: Session, dialect_name: str) -> None:
+        """Continue after the largest key in the database or handed out."""
+        max_id = session.query(func.max(self.column)).scalar() or 0
+        if dialect_name == "postgresql":
+            sequence_id = session.execute(
+                text(f"SELECT pg_sequence_last_value({self._sequence()})")
+            ).scalar()
+            max_id = max(max_id, sequence_id or 0)
+            self._reserved_id = max_id
+        self._last_id = max(self._last_id, max_id)
+
+    def allocate(self, session: Session, rows: list[dict[str, Any]]) -> None:
+        """Assign the next consecutive primary keys to rows."""
+        if not rows:
+            return
+        next_id = self._last_id
+        for row in rows:
+            next_id += 1
+            row[self.column.key] = next_id
+        self._last_id = next_id
+        if self._reserved_id is not None and next_id > self._reserved_id:
+            self._reserved_id = next_id + PRIMARY_KEY_RESERVE
+            session.execute(
+                text(f"SELECT setval({self._sequence()}, {self._reserved_id})")
+            )
+
+
+def insert_row(session: Session, column: Column, row: dict[str, Any]) -> None:
+    """Insert a single row and store the primary key the database assigned."""
+    row.pop(column.key, None)
+    result = session.execute(column.table.insert(), row)
+    row[column.key] = result.inserted_primary_key[0]
+
+
+class LRU:
+    """A bounded mapping that evicts the least recently used key.
+
+    Not thread safe, only used from the recorder thread.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        """Initialize the cache."""
+        self.maxsize = maxsize
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Return if key is in the cache without marking it as used."""
+        return key in self._data
+
+    def __len__(self) -> int:
+        """Return the number of cached keys."""
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the value of key and mark it as recently used."""
+        if key not in self._data:
+            return default
+        self._data.move_to_end(key)
+        return self._data[key]
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        """Set the value of key, evicting the least recently used key if full."""
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove key and return its value."""
+        return self._data.pop(key, default)
+
+    def evict_values(self, values: Iterable[Any]) -> None:
+        """Remove all keys that map to one of values."""
+        values = set(values)
+        for key in [key for key, value in self._data.items() if value in values]:
+            del self._data[key]
+
+    def clear(self) -> None:
+        """Remove all keys."""
+        self._data.clear()
+
+
 def execute(qry, to_native=False, validate_entity_ids=True):
     """Query the database and convert the objects to HA native form.
 
@@ -0,0 +1,38 @@
+"""The Recorder websocket API."""
+from __future__ import annotations
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DATA_INSTANCE
+
+
+@callback
+def async_setup(hass: HomeAssistant) -> None:
+    """Set up the recorder websocket API."""
+    websocket_api.async_register_command(hass, ws_purge_progress)
+    websocket_api.async_register_command(hass, ws_history_cache)
+
+
+@websocket_api.websocket_command({vol.Required("type"): "recorder/purge_progress"})
+@websocket_api.require_admin
+@callback
+def ws_purge_progress(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict
+) -> None:
+    """Return the progress of the running purge, None if there is none."""
+    progress = hass.data[DATA_INSTANCE].purge_progress
+    connection.send_result(msg["id"], progress and progress.as_dict())
+
+
+@websocket_api.websocket_command({vol.Required("type"): "recorder/history_cache"})
+@websocket_api.require_admin
+@callback
+def ws_history_cache(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict
+) -> None:
+    """Return the size, hits and misses of the history cache, None if disabled."""
+    history_cache = hass.data[DATA_INSTANCE].history_cache
+    connection.send_result(msg["id"], history_cache and history_cache.as_dict())
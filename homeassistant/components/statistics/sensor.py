@@ -5,7 +5,7 @@ import statistics
 
 import voluptuous as vol
 
-from homeassistant.components.recorder.models import States
+from homeassistant.components.recorder.models import States, StatesMeta
 from homeassistant.components.recorder.util import execute, session_scope
 from homeassistant.components.sensor import PLATFORM_SCHEMA, SensorEntity
 from homeassistant.const import (
@@ -370,8 +370,10 @@ class StatisticsSensor(SensorEntity):
         _LOGGER.debug("%s: initializing values from the database", self.entity_id)
 
         with session_scope(hass=self.hass) as session:
-            query = session.query(States).filter(
-                States.entity_id == self._entity_id.lower()
+            query = (
+                session.query(States)
+                .join(StatesMeta, States.metadata_id == StatesMeta.metadata_id)
+                .filter(StatesMeta.entity_id == self._entity_id.lower())
             )
 
             if self._max_age is not None:
@@ -381,11 +383,13 @@ class StatisticsSensor(SensorEntity):
                     self.entity_id,
                     records_older_then,
                 )
-                query = query.filter(States.last_updated >= records_older_then)
+                query = query.filter(
+                    States.last_updated_ts >= records_older_then.timestamp()
+                )
             else:
                 _LOGGER.debug("%s: retrieving all records", self.entity_id)
 
-            query = query.order_by(States.last_updated.desc()).limit(
+            query = query.order_by(States.last_updated_ts.desc()).limit(
                 self._sampling_size
             )
             states = execute(query, to_native=True, validate_entity_ids=False)
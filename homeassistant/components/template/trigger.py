@@ -102,6 +102,7 @@ async def async_attach_trigger(
             **trigger_data,
             "for": time_delta,
             "description": description,
+            "render_stats": info.render_stats[value_template].as_dict(),
         }
 
         @callback
@@ -53,8 +53,10 @@ def async_register_commands(
     async_reg(hass, handle_ping)
     async_reg(hass, handle_render_template)
     async_reg(hass, handle_subscribe_bootstrap_integrations)
+    async_reg(hass, handle_subscribe_entities)
     async_reg(hass, handle_subscribe_events)
     async_reg(hass, handle_subscribe_trigger)
+    async_reg(hass, handle_supported_features)
     async_reg(hass, handle_test_condition)
     async_reg(hass, handle_unsubscribe_events)
 
@@ -94,7 +96,11 @@ def handle_subscribe_events(
             ):
                 return
 
-            connection.send_message(messages.cached_event_message(msg["id"], event))
+            # A newer state of the entity supersedes a pending older one
+            connection.send_message(
+                messages.cached_event_message(msg["id"], event),
+                supersede_key=(msg["id"], event.data["entity_id"]),
+            )
 
     else:
 
@@ -113,6 +119,71 @@ def handle_subscribe_events(
     connection.send_message(messages.result_message(msg["id"]))
 
 
+@callback
+@decorators.websocket_command(
+    {
+        vol.Required("type"): "subscribe_entities",
+        vol.Optional("entity_ids"): cv.entity_ids,
+    }
+)
+def handle_subscribe_entities(
+    hass: HomeAssistant, connection: ActiveConnection, msg: dict[str, Any]
+) -> None:
+    """Handle subscribe entities command.
+
+    The current states are sent once, after that only the changes
+    between the old and new state of an entity are sent.
+    """
+    entity_ids = set(msg.get("entity_ids", []))
+
+    @callback
+    def forward_entity_changes(events: list[Event]) -> None:
+        """Forward a batch of entity state changes to websocket."""
+        check_entity = connection.user.permissions.check_entity
+        forward = tuple(
+            event
+            for event in events
+            if (not entity_ids or event.data["entity_id"] in entity_ids)
+            and check_entity(event.data["entity_id"], POLICY_READ)
+        )
+        if not forward:
+            return
+
+        if len(forward) == len({event.data["entity_id"] for event in forward}):
+            connection.send_message(
+                messages.cached_state_diff_message(msg["id"], forward)
+            )
+            return
+
+        # An entity written more than once in a batch needs every diff
+        for event in forward:
+            connection.send_message(
+                messages.cached_state_diff_message(msg["id"], (event,))
+            )
+
+    # There must be no await between listening for state changes and
+    # sending the current states, or changes could be missed.
+    connection.subscriptions[msg["id"]] = hass.states.async_listen_batched(
+        forward_entity_changes
+    )
+    connection.send_message(messages.result_message(msg["id"]))
+
+    entity_perm = connection.user.permissions.check_entity
+    connection.send_message(
+        messages.event_message(
+            msg["id"],
+            {
+                messages.ENTITY_EVENT_ADD: {
+                    state.entity_id: messages.compressed_state(state)
+                    for state in hass.states.async_all()
+                    if (not entity_ids or state.entity_id in entity_ids)
+                    and entity_perm(state.entity_id, POLICY_READ)
+                }
+            },
+        )
+    )
+
+
 @callback
 @decorators.websocket_command(
     {
@@ -238,7 +309,15 @@ def handle_get_states(
             if entity_perm(state.entity_id, "read")
         ]
 
-    connection.send_message(messages.result_message(msg["id"], states))
+    # Join the JSON cached on each state instead of serializing all states
+    try:
+        states_json = ", ".join([state.as_dict_json() for state in states])
+    except (ValueError, TypeError):
+        # Serialize the regular way to report which data is bad
+        connection.send_message(messages.result_message(msg["id"], states))
+        return
+
+    connection.send_message(messages.result_message_json(msg["id"], f"[{states_json}]"))
 
 
 @decorators.websocket_command({vol.Required("type"): "get_services"})
@@ -314,6 +393,21 @@ def handle_ping(
     connection.send_message(pong_message(msg["id"]))
 
 
+@callback
+@decorators.websocket_command(
+    {
+        vol.Required("type"): "supported_features",
+        vol.Required("features"): {str: vol.Coerce(float)},
+    }
+)
+def handle_supported_features(
+    hass: HomeAssistant, connection: ActiveConnection, msg: dict[str, Any]
+) -> None:
+    """Handle setting the features supported by the client."""
+    connection.supported_features = msg["features"]
+    connection.send_result(msg["id"])
+
+
 @decorators.websocket_command(
     {
         vol.Required("type"): "render_template",
@@ -24,7 +24,7 @@ class ActiveConnection:
         self,
         logger: WebSocketAdapter,
         hass: HomeAssistant,
-        send_message: Callable[[str | dict[str, Any]], None],
+        send_message: Callable[..., None],
         user: User,
         refresh_token: RefreshToken,
     ) -> None:
@@ -35,6 +35,7 @@ class ActiveConnection:
         self.user = user
         self.refresh_token_id = refresh_token.id
         self.subscriptions: dict[Hashable, Callable[[], Any]] = {}
+        self.supported_features: dict[str, float] = {}
         self.last_id = 0
 
     def context(self, msg: dict[str, Any]) -> Context:
@@ -4,11 +4,10 @@ from __future__ import annotations
 import asyncio
 from concurrent import futures
 from functools import partial
-import json
 from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Final
 
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.json import JSONEncoder
+from homeassistant.helpers.json import json_dumps
 
 if TYPE_CHECKING:
     from .connection import ActiveConnection
@@ -49,7 +48,10 @@ CANCELLATION_ERRORS: Final = (asyncio.CancelledError, futures.CancelledError)
 SIGNAL_WEBSOCKET_CONNECTED: Final = "websocket_connected"
 SIGNAL_WEBSOCKET_DISCONNECTED: Final = "websocket_disconnected"
 
+# Features a client can enable with the supported_features command
+FEATURE_COALESCE_MESSAGES: Final = "coalesce_messages"
+
 # Data used to store the current connection list
 DATA_CONNECTIONS: Final = f"{DOMAIN}.connections"
 
-JSON_DUMP: Final = partial(json.dumps, cls=JSONEncoder, allow_nan=False)
+JSON_DUMP: Final = partial(json_dumps, allow_nan=False)
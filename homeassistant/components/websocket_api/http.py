@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 import asyncio
-from collections.abc import Callable
+from collections.abc import Callable, Hashable
 from contextlib import suppress
 import datetime as dt
 import logging
@@ -17,9 +17,11 @@ from homeassistant.core import Event, HomeAssistant, callback
 from homeassistant.helpers.event import async_call_later
 
 from .auth import AuthPhase, auth_required_message
+from .connection import ActiveConnection
 from .const import (
     CANCELLATION_ERRORS,
     DATA_CONNECTIONS,
+    FEATURE_COALESCE_MESSAGES,
     MAX_PENDING_MSG,
     PENDING_MSG_PEAK,
     PENDING_MSG_PEAK_TIME,
@@ -66,19 +68,56 @@ class WebSocketHandler:
         self._writer_task: asyncio.Task | None = None
         self._logger = WebSocketAdapter(_WS_LOGGER, {"connid": id(self)})
         self._peak_checker_unsub: Callable[[], None] | None = None
+        self._connection: ActiveConnection | None = None
+        # Latest message for each supersede key queued in _to_write
+        self._superseding_messages: dict[Hashable, str] = {}
+
+    @property
+    def _coalesce_messages(self) -> bool:
+        """Return if the client accepts multiple messages in one frame."""
+        return self._connection is not None and bool(
+            self._connection.supported_features.get(FEATURE_COALESCE_MESSAGES)
+        )
+
+    def _queued_message(self, queued: str | Hashable | None) -> str | None:
+        """Return the message for a queue entry, None means the writer should stop."""
+        if queued is None or isinstance(queued, str):
+            return queued
+        return self._superseding_messages.pop(queued)
 
     async def _writer(self) -> None:
-        """Write outgoing messages."""
+        """Write outgoing messages.
+
+        If the client supports it, all queued messages are sent
+        together as a JSON array in a single frame.
+        """
         # Exceptions if Socket disconnected or cancelled by connection handler
         assert self.wsock is not None
         with suppress(RuntimeError, ConnectionResetError, *CANCELLATION_ERRORS):
             while not self.wsock.closed:
-                message = await self._to_write.get()
+                message = self._queued_message(await self._to_write.get())
                 if message is None:
                     break
 
-                self._logger.debug("Sending %s", message)
-                await self.wsock.send_str(message)
+                if self._to_write.empty() or not self._coalesce_messages:
+                    self._logger.debug("Sending %s", message)
+                    await self.wsock.send_str(message)
+                    continue
+
+                messages = [message]
+                stop = False
+                while not self._to_write.empty():
+                    message = self._queued_message(self._to_write.get_nowait())
+                    if message is None:
+                        stop = True
+                        break
+                    messages.append(message)
+
+                coalesced_message = "[" + ",".join(messages) + "]"
+                self._logger.debug("Sending %s", coalesced_message)
+                await self.wsock.send_str(coalesced_message)
+                if stop:
+                    break
 
         # Clean up the peaker checker when we shut down the writer
         if self._peak_checker_unsub is not None:
@@ -86,18 +125,31 @@ class WebSocketHandler:
             self._peak_checker_unsub = None
 
     @callback
-    def _send_message(self, message: str | dict[str, Any]) -> None:
+    def _send_message(
+        self, message: str | dict[str, Any], supersede_key: Hashable | None = None
+    ) -> None:
         """Send a message to the client.
 
         Closes connection if the client is not reading the messages.
 
+        A message with a supersede_key replaces a message with the same key that
+        is still waiting to be written, if the client coalesces messages.
+
         Async friendly.
         """
         if not isinstance(message, str):
             message = message_to_json(message)
 
+        queued: str | Hashable = message
+        if supersede_key is not None and self._coalesce_messages:
+            if supersede_key in self._superseding_messages:
+                self._superseding_messages[supersede_key] = message
+                return
+            self._superseding_messages[supersede_key] = message
+            queued = supersede_key
+
         try:
-            self._to_write.put_nowait(message)
+            self._to_write.put_nowait(queued)
         except asyncio.QueueFull:
             self._logger.error(
                 "Client exceeded max pending messages [2]: %s", MAX_PENDING_MSG
@@ -189,7 +241,7 @@ class WebSocketHandler:
                 raise Disconnect from err
 
             self._logger.debug("Received %s", msg_data)
-            connection = await auth.async_handle(msg_data)
+            connection = self._connection = await auth.async_handle(msg_data)
             self.hass.data[DATA_CONNECTIONS] = (
                 self.hass.data.get(DATA_CONNECTIONS, 0) + 1
             )
@@ -7,7 +7,7 @@ from typing import Any, Final
 
 import voluptuous as vol
 
-from homeassistant.core import Event
+from homeassistant.core import Event, State
 from homeassistant.helpers import config_validation as cv
 from homeassistant.util.json import (
     find_paths_unserializable_data,
@@ -31,12 +31,33 @@ BASE_COMMAND_MESSAGE_SCHEMA: Final = vol.Schema({vol.Required("id"): cv.positive
 IDEN_TEMPLATE: Final = "__IDEN__"
 IDEN_JSON_TEMPLATE: Final = '"__IDEN__"'
 
+# Keys of the compressed entity messages sent to subscribe_entities subscribers
+ENTITY_EVENT_ADD: Final = "a"
+ENTITY_EVENT_REMOVE: Final = "r"
+ENTITY_EVENT_CHANGE: Final = "c"
+STATE_DIFF_ADDITIONS: Final = "+"
+STATE_DIFF_REMOVALS: Final = "-"
+
+COMPRESSED_STATE_STATE: Final = "s"
+COMPRESSED_STATE_ATTRIBUTES: Final = "a"
+COMPRESSED_STATE_CONTEXT: Final = "c"
+COMPRESSED_STATE_LAST_CHANGED: Final = "lc"
+COMPRESSED_STATE_LAST_UPDATED: Final = "lu"
+
 
 def result_message(iden: int, result: Any = None) -> dict[str, Any]:
     """Return a success result message."""
     return {"id": iden, "type": const.TYPE_RESULT, "success": True, "result": result}
 
 
+def result_message_json(iden: int, result_json: str) -> str:
+    """Return a success result message with an already serialized result."""
+    return (
+        f'{{"id": {iden}, "type": "{const.TYPE_RESULT}", '
+        f'"success": true, "result": {result_json}}}'
+    )
+
+
 def error_message(iden: int | None, code: str, message: str) -> dict[str, Any]:
     """Return an error result message."""
     return {
@@ -74,6 +95,102 @@ def _cached_event_message(event: Event) -> str:
     return message_to_json(event_message(IDEN_TEMPLATE, event))
 
 
+def cached_state_diff_message(iden: int, events: tuple[Event, ...]) -> str:
+    """Return an event message with the changes of state changed events.
+
+    Serialize to json once per message, like cached_event_message.
+    Every entity must only be changed by one of the events.
+    """
+    return _cached_state_diff_message(events).replace(IDEN_JSON_TEMPLATE, str(iden), 1)
+
+
+@lru_cache(maxsize=128)
+def _cached_state_diff_message(events: tuple[Event, ...]) -> str:
+    """Cache and serialize the state diff of the events to json.
+
+    The IDEN_TEMPLATE is used which will be replaced
+    with the actual iden in cached_state_diff_message
+    """
+    return message_to_json(event_message(IDEN_TEMPLATE, _state_diff_events(events)))
+
+
+def _state_diff_events(events: tuple[Event, ...]) -> dict[str, Any]:
+    """Convert state changed events to one compressed entity event."""
+    removed: list[str] = []
+    added: dict[str, Any] = {}
+    changed: dict[str, Any] = {}
+
+    for event in events:
+        new_state: State | None = event.data["new_state"]
+        old_state: State | None = event.data["old_state"]
+        if new_state is None:
+            removed.append(event.data["entity_id"])
+        elif old_state is None:
+            added[new_state.entity_id] = compressed_state(new_state)
+        else:
+            changed[new_state.entity_id] = _state_diff(old_state, new_state)
+
+    compressed: dict[str, Any] = {}
+    if removed:
+        compressed[ENTITY_EVENT_REMOVE] = removed
+    if added:
+        compressed[ENTITY_EVENT_ADD] = added
+    if changed:
+        compressed[ENTITY_EVENT_CHANGE] = changed
+    return compressed
+
+
+def _state_diff(old_state: State, new_state: State) -> dict[str, Any]:
+    """Return the changed and removed keys between two states."""
+    additions: dict[str, Any] = {}
+    diff = {STATE_DIFF_ADDITIONS: additions}
+
+    if old_state.state != new_state.state:
+        additions[COMPRESSED_STATE_STATE] = new_state.state
+    if old_state.last_changed != new_state.last_changed:
+        additions[COMPRESSED_STATE_LAST_CHANGED] = new_state.last_changed.timestamp()
+    elif old_state.last_updated != new_state.last_updated:
+        additions[COMPRESSED_STATE_LAST_UPDATED] = new_state.last_updated.timestamp()
+    if old_state.context.id != new_state.context.id:
+        additions[COMPRESSED_STATE_CONTEXT] = new_state.context.id
+
+    old_attributes = old_state.attributes
+    new_attributes = new_state.attributes
+    if old_attributes != new_attributes:
+        changed_attributes = {
+            key: value
+            for key, value in new_attributes.items()
+            if key not in old_attributes or old_attributes[key] != value
+        }
+        if changed_attributes:
+            additions[COMPRESSED_STATE_ATTRIBUTES] = changed_attributes
+        removed_attributes = [
+            key for key in old_attributes if key not in new_attributes
+        ]
+        if removed_attributes:
+            diff[STATE_DIFF_REMOVALS] = {
+                COMPRESSED_STATE_ATTRIBUTES: removed_attributes
+            }
+
+    return diff
+
+
+def compressed_state(state: State) -> dict[str, Any]:
+    """Return a compressed representation of a state.
+
+    The last updated time is left out when it matches the last changed time.
+    """
+    compressed = {
+        COMPRESSED_STATE_STATE: state.state,
+        COMPRESSED_STATE_ATTRIBUTES: dict(state.attributes),
+        COMPRESSED_STATE_CONTEXT: state.context.id,
+        COMPRESSED_STATE_LAST_CHANGED: state.last_changed.timestamp(),
+    }
+    if state.last_changed != state.last_updated:
+        compressed[COMPRESSED_STATE_LAST_UPDATED] = state.last_updated.timestamp()
+    return compressed
+
+
 def message_to_json(message: dict[str, Any]) -> str:
     """Serialize a websocket message to json."""
     try:
@@ -7,6 +7,7 @@ of entities and react to changes.
 from __future__ import annotations
 
 import asyncio
+from bisect import bisect_left, insort
 from collections.abc import Awaitable, Collection, Coroutine, Iterable, Mapping
 import datetime
 import enum
@@ -18,7 +19,7 @@ import re
 import threading
 from time import monotonic
 from types import MappingProxyType
-from typing import TYPE_CHECKING, Any, Callable, Optional, TypeVar, cast
+from typing import TYPE_CHECKING, Any, Callable, Optional, Tuple, TypeVar, cast
 
 import attr
 import voluptuous as vol
@@ -27,6 +28,7 @@ import yarl
 from homeassistant import block_async_io, loader, util
 from homeassistant.const import (
     ATTR_DOMAIN,
+    ATTR_ENTITY_ID,
     ATTR_FRIENDLY_NAME,
     ATTR_NOW,
     ATTR_SECONDS,
@@ -59,6 +61,7 @@ from homeassistant.exceptions import (
     ServiceNotFound,
     Unauthorized,
 )
+from homeassistant.helpers.json import json_dumps
 from homeassistant.util import location
 from homeassistant.util.async_ import (
     fire_coroutine_threadsafe,
@@ -655,12 +658,23 @@ class Event:
         )
 
 
+_FilterableJob = Tuple[HassJob, Optional[Callable]]
+
+
 class EventBus:
     """Allow the firing of and listening for events."""
 
     def __init__(self, hass: HomeAssistant) -> None:
         """Initialize a new event bus."""
-        self._listeners: dict[str, list[tuple[HassJob, Callable | None]]] = {}
+        # Listeners are kept in insertion ordered dicts so they are added
+        # and removed in constant time
+        self._listeners: dict[str, dict[_FilterableJob, None]] = {}
+        self._entity_listeners: dict[str, dict[str, dict[_FilterableJob, None]]] = {}
+        # Dispatch index built by async_fire. Adding or removing a listener
+        # only drops the affected entries, so registering many listeners
+        # does not rebuild the index each time.
+        self._dispatch: dict[str, tuple[_FilterableJob, ...]] = {}
+        self._entity_dispatch: dict[str, dict[str, tuple[_FilterableJob, ...]]] = {}
         self._hass = hass
 
     @callback
@@ -669,7 +683,12 @@ class EventBus:
 
         This method must be run in the event loop.
         """
-        return {key: len(self._listeners[key]) for key in self._listeners}
+        listeners = {key: len(self._listeners[key]) for key in self._listeners}
+        for event_type, entity_listeners in self._entity_listeners.items():
+            listeners[event_type] = listeners.get(event_type, 0) + sum(
+                len(jobs) for jobs in entity_listeners.values()
+            )
+        return listeners
 
     @property
     def listeners(self) -> dict[str, int]:
@@ -696,8 +715,8 @@ class EventBus:
         origin: EventOrigin = EventOrigin.local,
         context: Context | None = None,
         time_fired: datetime.datetime | None = None,
-    ) -> None:
-        """Fire an event.
+    ) -> Event:
+        """Fire an event and return it.
 
         This method must be run in the event loop.
         """
@@ -706,21 +725,42 @@ class EventBus:
                 event_type, "event_type", MAX_LENGTH_EVENT_EVENT_TYPE
             )
 
-        listeners = self._listeners.get(event_type, [])
+        listeners = self._dispatch.get(event_type)
+        if listeners is None:
+            listeners = self._dispatch[event_type] = self._async_build_dispatch(
+                event_type
+            )
 
-        # EVENT_HOMEASSISTANT_CLOSE should go only to his listeners
-        match_all_listeners = self._listeners.get(MATCH_ALL)
-        if match_all_listeners is not None and event_type != EVENT_HOMEASSISTANT_CLOSE:
-            listeners = match_all_listeners + listeners
+        entity_listeners: tuple[_FilterableJob, ...] | None = None
+        entity_ids_listeners = self._entity_listeners.get(event_type)
+        if entity_ids_listeners is not None and event_data:
+            entity_id = event_data.get(ATTR_ENTITY_ID)
+            if isinstance(entity_id, str) and entity_id in entity_ids_listeners:
+                entity_dispatch = self._entity_dispatch.setdefault(event_type, {})
+                entity_listeners = entity_dispatch.get(entity_id)
+                if entity_listeners is None:
+                    entity_listeners = entity_dispatch[entity_id] = tuple(
+                        entity_ids_listeners[entity_id]
+                    )
 
         event = Event(event_type, event_data, origin, time_fired, context)
 
         if event_type != EVENT_TIME_CHANGED:
             _LOGGER.debug("Bus:Handling %s", event)
 
-        if not listeners:
-            return
+        if listeners:
+            self._async_dispatch(listeners, event)
+
+        if entity_listeners:
+            self._async_dispatch(entity_listeners, event)
+
+        return event
 
+    @callback
+    def _async_dispatch(
+        self, listeners: tuple[_FilterableJob, ...], event: Event
+    ) -> None:
+        """Schedule the jobs of listeners whose filter accepts the event."""
         for job, event_filter in listeners:
             if event_filter is not None:
                 try:
@@ -753,6 +793,7 @@ class EventBus:
         event_type: str,
         listener: Callable,
         event_filter: Callable | None = None,
+        entity_ids: str | Iterable[str] | None = None,
     ) -> CALLBACK_TYPE:
         """Listen for all events or events of a specific type.
 
@@ -763,19 +804,35 @@ class EventBus:
         @callback that returns a boolean value, determines if the
         listener callable should run.
 
+        An optional entity_ids restricts the listener to events whose
+        ``entity_id`` data matches one of the given entity ids. These
+        listeners are indexed by entity_id so events for other entities
+        never reach them or their event_filter.
+
         This method must be run in the event loop.
         """
         if event_filter is not None and not is_callback(event_filter):
             raise HomeAssistantError(f"Event filter {event_filter} is not a callback")
-        return self._async_listen_filterable_job(
-            event_type, (HassJob(listener), event_filter)
+        filterable_job: _FilterableJob = (HassJob(listener), event_filter)
+        if entity_ids is None:
+            return self._async_listen_filterable_job(event_type, filterable_job)
+
+        if event_type == MATCH_ALL:
+            raise HomeAssistantError(
+                "Listening by entity_ids requires a specific event_type"
+            )
+        if isinstance(entity_ids, str):
+            entity_ids = (entity_ids,)
+        return self._async_listen_entity_filterable_job(
+            event_type, {entity_id.lower() for entity_id in entity_ids}, filterable_job
         )
 
     @callback
     def _async_listen_filterable_job(
-        self, event_type: str, filterable_job: tuple[HassJob, Callable | None]
+        self, event_type: str, filterable_job: _FilterableJob
     ) -> CALLBACK_TYPE:
-        self._listeners.setdefault(event_type, []).append(filterable_job)
+        self._listeners.setdefault(event_type, {})[filterable_job] = None
+        self._async_invalidate_dispatch(event_type)
 
         def remove_listener() -> None:
             """Remove the listener."""
@@ -783,6 +840,21 @@ class EventBus:
 
         return remove_listener
 
+    @callback
+    def _async_listen_entity_filterable_job(
+        self, event_type: str, entity_ids: set[str], filterable_job: _FilterableJob
+    ) -> CALLBACK_TYPE:
+        entity_listeners = self._entity_listeners.setdefault(event_type, {})
+        for entity_id in entity_ids:
+            entity_listeners.setdefault(entity_id, {})[filterable_job] = None
+        self._async_invalidate_entity_dispatch(event_type, entity_ids)
+
+        def remove_listener() -> None:
+            """Remove the listener."""
+            self._async_remove_entity_listener(event_type, entity_ids, filterable_job)
+
+        return remove_listener
+
     def listen_once(
         self, event_type: str, listener: Callable[[Event], None]
     ) -> CALLBACK_TYPE:
@@ -814,7 +886,7 @@ class EventBus:
 
         This method must be run in the event loop.
         """
-        filterable_job: tuple[HassJob, Callable | None] | None = None
+        filterable_job: _FilterableJob | None = None
 
         @callback
         def _onetime_listener(event: Event) -> None:
@@ -838,24 +910,81 @@ class EventBus:
 
     @callback
     def _async_remove_listener(
-        self, event_type: str, filterable_job: tuple[HassJob, Callable | None]
+        self, event_type: str, filterable_job: _FilterableJob
     ) -> None:
         """Remove a listener of a specific event_type.
 
         This method must be run in the event loop.
         """
         try:
-            self._listeners[event_type].remove(filterable_job)
+            del self._listeners[event_type][filterable_job]
 
-            # delete event_type list if empty
+            # delete event_type dict if empty
             if not self._listeners[event_type]:
                 self._listeners.pop(event_type)
-        except (KeyError, ValueError):
-            # KeyError is key event_type listener did not exist
-            # ValueError if listener did not exist within event_type
+        except KeyError:
+            # KeyError if event_type or the listener within it did not exist
+            _LOGGER.exception(
+                "Unable to remove unknown job listener %s", filterable_job
+            )
+            return
+
+        self._async_invalidate_dispatch(event_type)
+
+    @callback
+    def _async_remove_entity_listener(
+        self, event_type: str, entity_ids: set[str], filterable_job: _FilterableJob
+    ) -> None:
+        """Remove a listener of a specific event_type indexed by entity_id.
+
+        This method must be run in the event loop.
+        """
+        try:
+            entity_listeners = self._entity_listeners[event_type]
+            for entity_id in entity_ids:
+                del entity_listeners[entity_id][filterable_job]
+                if not entity_listeners[entity_id]:
+                    entity_listeners.pop(entity_id)
+        except KeyError:
             _LOGGER.exception(
                 "Unable to remove unknown job listener %s", filterable_job
             )
+            return
+
+        if not entity_listeners:
+            self._entity_listeners.pop(event_type)
+        self._async_invalidate_entity_dispatch(event_type, entity_ids)
+
+    @callback
+    def _async_invalidate_dispatch(self, event_type: str) -> None:
+        """Drop the dispatch index entries the listeners of event_type are in.
+
+        This method must be run in the event loop.
+        """
+        if event_type == MATCH_ALL:
+            self._dispatch.clear()
+        else:
+            self._dispatch.pop(event_type, None)
+
+    @callback
+    def _async_build_dispatch(self, event_type: str) -> tuple[_FilterableJob, ...]:
+        """Return the listeners an event of event_type is dispatched to."""
+        listeners = self._listeners.get(event_type, {})
+        # EVENT_HOMEASSISTANT_CLOSE should go only to its listeners
+        if event_type == EVENT_HOMEASSISTANT_CLOSE:
+            return tuple(listeners)
+        return (*self._listeners.get(MATCH_ALL, {}), *listeners)
+
+    @callback
+    def _async_invalidate_entity_dispatch(
+        self, event_type: str, entity_ids: Iterable[str]
+    ) -> None:
+        """Drop the entity_id dispatch index entries of the given entity ids."""
+        entity_dispatch = self._entity_dispatch.get(event_type)
+        if entity_dispatch is None:
+            return
+        for entity_id in entity_ids:
+            entity_dispatch.pop(entity_id, None)
 
 
 class State:
@@ -881,6 +1010,7 @@ class State:
         "domain",
         "object_id",
         "_as_dict",
+        "_as_dict_json",
     ]
 
     def __init__(
@@ -916,6 +1046,7 @@ class State:
         self.context = context or Context()
         self.domain, self.object_id = split_entity_id(self.entity_id)
         self._as_dict: dict[str, Collection[Any]] | None = None
+        self._as_dict_json: str | None = None
 
     @property
     def name(self) -> str:
@@ -948,6 +1079,19 @@ class State:
             }
         return self._as_dict
 
+    def as_dict_json(self) -> str:
+        """Return a JSON string of the State.
+
+        Async friendly.
+
+        The JSON is created once and reused until the state is replaced, so
+        responses with many states can be built by joining the strings.
+        Raises ValueError or TypeError if the state can not be serialized.
+        """
+        if self._as_dict_json is None:
+            self._as_dict_json = json_dumps(self.as_dict(), allow_nan=False)
+        return self._as_dict_json
+
     @classmethod
     def from_dict(cls, json_dict: dict) -> Any:
         """Initialize a state from a dict.
@@ -1002,13 +1146,55 @@ class State:
         )
 
 
+def event_as_dict_json(event: Event) -> str:
+    """Return a JSON string of an Event.
+
+    Async friendly.
+
+    The states of a state_changed event are spliced in from the JSON cached
+    on them, the rest is serialized from Event.as_dict.
+    Raises ValueError or TypeError if the event can not be serialized.
+    """
+    data = event.data
+    if event.event_type != EVENT_STATE_CHANGED or data.keys() != {
+        "entity_id",
+        "old_state",
+        "new_state",
+    }:
+        return json_dumps(event)
+
+    try:
+        old_state_json, new_state_json = (
+            "null" if state is None else state.as_dict_json()
+            for state in (data["old_state"], data["new_state"])
+        )
+    except (ValueError, TypeError):
+        return json_dumps(event)
+
+    event_dict = event.as_dict()
+    event_dict["data"] = {
+        "entity_id": data["entity_id"],
+        "old_state": None,
+        "new_state": None,
+    }
+    # A valid entity_id can not contain the placeholders
+    return json_dumps(event_dict).replace(
+        '"old_state": null, "new_state": null',
+        f'"old_state": {old_state_json}, "new_state": {new_state_json}',
+        1,
+    )
+
+
 class StateMachine:
     """Helper class that tracks the state of different entities."""
 
     def __init__(self, bus: EventBus, loop: asyncio.events.AbstractEventLoop) -> None:
         """Initialize state machine."""
         self._states: dict[str, State] = {}
+        # Sorted entity ids of each domain, kept up to date on add and remove
+        self._domain_entity_ids: dict[str, list[str]] = {}
         self._reservations: set[str] = set()
+        self._batch_listeners: list[Callable[[list[Event]], None]] = []
         self._bus = bus
         self._loop = loop
 
@@ -1079,6 +1265,31 @@ class StateMachine:
             state for state in self._states.values() if state.domain in domain_filter
         ]
 
+    @callback
+    def async_all_sorted(self, domain: str | None = None) -> list[State]:
+        """Return the states of a domain, or all states, sorted by entity id.
+
+        The order is maintained when entities are added or removed, so
+        no sorting is needed.
+
+        This method must be run in the event loop.
+        """
+        states = self._states
+        domain_entity_ids = self._domain_entity_ids
+        if domain is not None:
+            return [
+                states[entity_id]
+                for entity_id in domain_entity_ids.get(domain.lower(), ())
+            ]
+
+        # Sorting the domains gives the order of sorting all entity ids
+        # because "." sorts before every character allowed in a domain.
+        return [
+            states[entity_id]
+            for domain in sorted(domain_entity_ids)
+            for entity_id in domain_entity_ids[domain]
+        ]
+
     def get(self, entity_id: str) -> State | None:
         """Retrieve state of entity_id or None if not found.
 
@@ -1120,12 +1331,19 @@ class StateMachine:
         if old_state is None:
             return False
 
-        self._bus.async_fire(
+        domain_entity_ids = self._domain_entity_ids[old_state.domain]
+        del domain_entity_ids[bisect_left(domain_entity_ids, entity_id)]
+        if not domain_entity_ids:
+            del self._domain_entity_ids[old_state.domain]
+
+        event = self._bus.async_fire(
             EVENT_STATE_CHANGED,
             {"entity_id": entity_id, "old_state": old_state, "new_state": None},
             EventOrigin.local,
             context=context,
         )
+        if self._batch_listeners:
+            self._async_dispatch_batch([event])
         return True
 
     def set(
@@ -1194,6 +1412,85 @@ class StateMachine:
 
         This method must be run in the event loop.
         """
+        now = dt_util.utcnow()
+        event_data = self._async_set_state(
+            entity_id, new_state, attributes, force_update, context, now
+        )
+        if event_data is None:
+            return
+
+        event = self._bus.async_fire(
+            EVENT_STATE_CHANGED,
+            event_data,
+            EventOrigin.local,
+            event_data["new_state"].context,
+            time_fired=now,
+        )
+        if self._batch_listeners:
+            self._async_dispatch_batch([event])
+
+    @callback
+    def async_set_many(
+        self,
+        states: Iterable[
+            tuple[str, str, Mapping[str, Any] | None, bool, Context | None]
+        ],
+        context: Context | None = None,
+    ) -> None:
+        """Set the state of multiple entities at once.
+
+        Each item of states is a tuple of entity_id, new_state, attributes,
+        force_update and context. Items without a context share the given
+        context, or a single new one. All written states share one timestamp.
+
+        A state_changed event is fired for every changed entity and listeners
+        registered with async_listen_batched receive all of them in one call.
+
+        This method must be run in the event loop.
+        """
+        if context is None:
+            context = Context()
+
+        now = dt_util.utcnow()
+        events: list[Event] = []
+
+        for entity_id, new_state, attributes, force_update, state_context in states:
+            event_data = self._async_set_state(
+                entity_id,
+                new_state,
+                attributes,
+                force_update,
+                state_context or context,
+                now,
+            )
+            if event_data is not None:
+                events.append(
+                    self._bus.async_fire(
+                        EVENT_STATE_CHANGED,
+                        event_data,
+                        EventOrigin.local,
+                        event_data["new_state"].context,
+                        time_fired=now,
+                    )
+                )
+
+        if events and self._batch_listeners:
+            self._async_dispatch_batch(events)
+
+    @callback
+    def _async_set_state(
+        self,
+        entity_id: str,
+        new_state: str,
+        attributes: Mapping[str, Any] | None,
+        force_update: bool,
+        context: Context | None,
+        now: datetime.datetime,
+    ) -> dict[str, Any] | None:
+        """Store a new state and return the state_changed event data.
+
+        Returns None if neither the state nor the attributes changed.
+        """
         entity_id = entity_id.lower()
         new_state = str(new_state)
         attributes = attributes or {}
@@ -1208,13 +1505,11 @@ class StateMachine:
             last_changed = old_state.last_changed if same_state else None
 
         if same_state and same_attr:
-            return
+            return None
 
         if context is None:
             context = Context()
 
-        now = dt_util.utcnow()
-
         state = State(
             entity_id,
             new_state,
@@ -1225,13 +1520,40 @@ class StateMachine:
             old_state is None,
         )
         self._states[entity_id] = state
-        self._bus.async_fire(
-            EVENT_STATE_CHANGED,
-            {"entity_id": entity_id, "old_state": old_state, "new_state": state},
-            EventOrigin.local,
-            context,
-            time_fired=now,
-        )
+        if old_state is None:
+            insort(self._domain_entity_ids.setdefault(state.domain, []), entity_id)
+        return {"entity_id": entity_id, "old_state": old_state, "new_state": state}
+
+    @callback
+    def async_listen_batched(
+        self, listener: Callable[[list[Event]], None]
+    ) -> CALLBACK_TYPE:
+        """Listen for state changes delivered in batches.
+
+        The listener, which must be a callable decorated with @callback,
+        is called with the list of state_changed events of every state
+        write. States written with async_set_many are delivered in a single
+        call instead of one call per entity.
+
+        This method must be run in the event loop.
+        """
+        if not is_callback(listener):
+            raise HomeAssistantError(f"Batch listener {listener} is not a callback")
+
+        self._batch_listeners.append(listener)
+
+        @callback
+        def remove_listener() -> None:
+            """Remove the listener."""
+            self._batch_listeners.remove(listener)
+
+        return remove_listener
+
+    @callback
+    def _async_dispatch_batch(self, events: list[Event]) -> None:
+        """Schedule the batch listeners with a list of state_changed events."""
+        for listener in self._batch_listeners:
+            self._loop.call_soon(listener, events)
 
 
 class Service:
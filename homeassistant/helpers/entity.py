@@ -93,6 +93,26 @@ def async_generate_entity_id(
     return test_string
 
 
+@callback
+def async_write_ha_states(hass: HomeAssistant, entities: Iterable[Entity]) -> None:
+    """Write the state of multiple entities to the state machine at once.
+
+    Integrations that update many entities from a single message or poll
+    can use this to write all states with one timestamp and have them
+    delivered to batched state listeners together.
+    """
+    # pylint: disable=protected-access
+    state_writes = []
+    for entity in entities:
+        entity._async_verify_write_ha_state()
+        state_write = entity._async_calculate_state()
+        if state_write is not None:
+            state_writes.append(state_write)
+
+    if state_writes:
+        hass.states.async_set_many(state_writes)
+
+
 def get_capability(hass: HomeAssistant, entity_id: str, capability: str) -> Any | None:
     """Get a capability attribute of an entity.
 
@@ -408,6 +428,12 @@ class Entity(ABC):
     @callback
     def async_write_ha_state(self) -> None:
         """Write the state to the state machine."""
+        self._async_verify_write_ha_state()
+        self._async_write_ha_state()
+
+    @callback
+    def _async_verify_write_ha_state(self) -> None:
+        """Verify the entity can write its state to the state machine."""
         if self.hass is None:
             raise RuntimeError(f"Attribute hass is None for {self}")
 
@@ -416,8 +442,6 @@ class Entity(ABC):
                 f"No entity id specified for entity {self.name}"
             )
 
-        self._async_write_ha_state()
-
     def _stringify_state(self) -> str:
         """Convert state to string."""
         if not self.available:
@@ -434,6 +458,18 @@ class Entity(ABC):
     @callback
     def _async_write_ha_state(self) -> None:
         """Write the state to the state machine."""
+        state_write = self._async_calculate_state()
+        if state_write is not None:
+            self.hass.states.async_set(*state_write)
+
+    @callback
+    def _async_calculate_state(
+        self,
+    ) -> tuple[str, str, dict[str, Any], bool, Context | None] | None:
+        """Calculate the state to write to the state machine.
+
+        Returns None if the entity is disabled.
+        """
         if self.registry_entry and self.registry_entry.disabled_by:
             if not self._disabled_reported:
                 self._disabled_reported = True
@@ -443,7 +479,7 @@ class Entity(ABC):
                     self.entity_id,
                     self.platform.platform_name,
                 )
-            return
+            return None
 
         start = timer()
 
@@ -542,9 +578,7 @@ class Entity(ABC):
             self._context = None
             self._context_set = None
 
-        self.hass.states.async_set(
-            self.entity_id, state, attr, self.force_update, self._context
-        )
+        return (self.entity_id, state, attr, self.force_update, self._context)
 
     def schedule_update_ha_state(self, force_refresh: bool = False) -> None:
         """Schedule an update ha state change task.
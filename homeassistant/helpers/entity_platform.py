@@ -4,11 +4,13 @@ from __future__ import annotations
 import asyncio
 from collections.abc import Coroutine, Iterable
 from contextvars import ContextVar
-from datetime import datetime, timedelta
+from dataclasses import dataclass
+from datetime import timedelta
 import logging
 from logging import Logger
 from types import ModuleType
 from typing import TYPE_CHECKING, Any, Callable
+import zlib
 
 from typing_extensions import Protocol
 import voluptuous as vol
@@ -44,7 +46,7 @@ from . import (
 )
 from .device_registry import DeviceRegistry
 from .entity_registry import DISABLED_INTEGRATION, EntityRegistry
-from .event import async_call_later, async_track_time_interval
+from .event import async_call_later
 from .typing import ConfigType, DiscoveryInfoType
 
 if TYPE_CHECKING:
@@ -72,6 +74,36 @@ class AddEntitiesCallback(Protocol):
         """Define add_entities type."""
 
 
+@dataclass
+class PollingStats:
+    """Class for the polling statistics of an entity platform.
+
+    updates: Polling updates of entities that were started
+    overruns: Polling updates skipped because the previous update of the
+        entity was still running
+    total_lag, max_lag: Seconds the updates started after they were due
+    """
+
+    updates: int = 0
+    overruns: int = 0
+    total_lag: float = 0.0
+    max_lag: float = 0.0
+
+    @property
+    def average_lag(self) -> float:
+        """Return the average seconds an update started after it was due."""
+        return self.total_lag / self.updates if self.updates else 0.0
+
+
+def _polling_phase(entity_id: str, interval: float) -> float:
+    """Return the offset of the updates of an entity, within the interval.
+
+    The offset is derived from the entity id, so the updates of the entities
+    of all platforms are spread over the interval the same way on every run.
+    """
+    return (zlib.crc32(entity_id.encode()) + 1) / 2 ** 32 * interval
+
+
 class EntityPlatform:
     """Manage the entities for a single platform."""
 
@@ -99,11 +131,15 @@ class EntityPlatform:
         self._tasks: list[asyncio.Future] = []
         # Stop tracking tasks after setup is completed
         self._setup_complete = False
-        # Method to cancel the state change listener
+        # Method to stop polling
         self._async_unsub_polling: CALLBACK_TYPE | None = None
         # Method to cancel the retry of setup
         self._async_cancel_retry_setup: CALLBACK_TYPE | None = None
-        self._process_updates: asyncio.Lock | None = None
+        # Timers of the next update of each polled entity
+        self._polling_timers: dict[str, asyncio.TimerHandle] = {}
+        # Polled entities with an update in progress
+        self._polling_updates: set[str] = set()
+        self.polling_stats = PollingStats()
 
         self.parallel_updates: asyncio.Semaphore | None = None
 
@@ -396,18 +432,23 @@ class EntityPlatform:
             )
             raise
 
-        if (
-            (self.config_entry and self.config_entry.pref_disable_polling)
-            or self._async_unsub_polling is not None
-            or not any(entity.should_poll for entity in self.entities.values())
+        if (self.config_entry and self.config_entry.pref_disable_polling) or (
+            self._async_unsub_polling is None
+            and not any(entity.should_poll for entity in self.entities.values())
         ):
             return
 
-        self._async_unsub_polling = async_track_time_interval(
-            self.hass,
-            self._update_entity_states,
-            self.scan_interval,
-        )
+        self._async_unsub_polling = self._async_cancel_polling
+        interval = self.scan_interval.total_seconds()
+        now = self.hass.loop.time()
+        # The phases are on a grid of the interval shared by all platforms
+        grid_start = now - now % interval
+        for entity_id, entity in self.entities.items():
+            if entity.should_poll and entity_id not in self._polling_timers:
+                when = grid_start + _polling_phase(entity_id, interval)
+                if when <= now:
+                    when += interval
+                self._async_schedule_poll(entity, when)
 
     async def _async_add_entity(  # noqa: C901
         self,
@@ -582,6 +623,9 @@ class EntityPlatform:
         def remove_entity_cb() -> None:
             """Remove entity from entities list."""
             self.entities.pop(entity_id)
+            timer = self._polling_timers.pop(entity_id, None)
+            if timer is not None:
+                timer.cancel()
 
         entity.async_on_remove(remove_entity_cb)
 
@@ -679,34 +723,65 @@ class EntityPlatform:
             self.platform_name, name, handle_service, schema
         )
 
-    async def _update_entity_states(self, now: datetime) -> None:
-        """Update the states of all the polling entities.
+    @callback
+    def _async_cancel_polling(self) -> None:
+        """Cancel the timers of the polled entities."""
+        for timer in self._polling_timers.values():
+            timer.cancel()
+        self._polling_timers.clear()
 
-        To protect from flooding the executor, we will update async entities
-        in parallel and other entities sequential.
+    @callback
+    def _async_schedule_poll(self, entity: Entity, when: float) -> None:
+        """Schedule the next update of a polled entity at a loop time."""
+        self._polling_timers[entity.entity_id] = self.hass.loop.call_at(
+            when, self._async_poll_entity, entity, when
+        )
 
-        This method must be run in the event loop.
+    @callback
+    def _async_poll_entity(self, entity: Entity, due: float) -> None:
+        """Start the update of a polled entity and schedule the next one.
+
+        The next update is due a scan interval after this one was due, so
+        each entity keeps its phase and the updates of the platforms are
+        spread over the interval. Updates missed while the loop lagged are
+        skipped. The updates still wait on the parallel updates semaphore
+        of the platform. Entities that stop polling keep their timer, so
+        they are updated again once they poll.
         """
-        if self._process_updates is None:
-            self._process_updates = asyncio.Lock()
-        if self._process_updates.locked():
+        now = self.hass.loop.time()
+        interval = self.scan_interval.total_seconds()
+        next_due = due + interval
+        if next_due <= now:
+            next_due += ((now - next_due) // interval + 1) * interval
+        self._async_schedule_poll(entity, next_due)
+
+        if not entity.should_poll:
+            return
+
+        stats = self.polling_stats
+        if entity.entity_id in self._polling_updates:
+            stats.overruns += 1
             self.logger.warning(
                 "Updating %s %s took longer than the scheduled update interval %s",
                 self.platform_name,
-                self.domain,
+                entity.entity_id,
                 self.scan_interval,
             )
             return
 
-        async with self._process_updates:
-            tasks = []
-            for entity in self.entities.values():
-                if not entity.should_poll:
-                    continue
-                tasks.append(entity.async_update_ha_state(True))
+        lag = max(now - due, 0.0)
+        stats.updates += 1
+        stats.total_lag += lag
+        stats.max_lag = max(stats.max_lag, lag)
+        self._polling_updates.add(entity.entity_id)
+        self.hass.async_create_task(self._async_update_polled_entity(entity))
 
-            if tasks:
-                await asyncio.gather(*tasks)
+    async def _async_update_polled_entity(self, entity: Entity) -> None:
+        """Update a polled entity."""
+        try:
+            await entity.async_update_ha_state(True)
+        finally:
+            self._polling_updates.discard(entity.entity_id)
 
 
 current_platform: ContextVar[EntityPlatform | None] = ContextVar(
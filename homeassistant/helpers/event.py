@@ -108,6 +108,31 @@ class TrackTemplateResult:
     result: Any
 
 
+@dataclass
+class TrackTemplateRenderStats:
+    """Class for the render statistics of a tracked template.
+
+    hits
+        The state changes that did not need a render because the states
+        read by the template were unchanged.
+    misses
+        The state changes that rendered the template.
+    """
+
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Return the fraction of state changes that did not need a render."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a dictionary version of the render statistics."""
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hit_rate}
+
+
 def threaded_listener_factory(
     async_factory: Callable[..., Any]
 ) -> Callable[..., CALLBACK_TYPE]:
@@ -251,51 +276,42 @@ def async_track_state_change_event(
         return _remove_empty_listener
 
     entity_callbacks = hass.data.setdefault(TRACK_STATE_CHANGE_CALLBACKS, {})
+    # The bus listener of each entity, which the bus indexes by entity_id
+    entity_listeners = hass.data.setdefault(TRACK_STATE_CHANGE_LISTENER, {})
 
-    if TRACK_STATE_CHANGE_LISTENER not in hass.data:
-
-        @callback
-        def _async_state_change_filter(event: Event) -> bool:
-            """Filter state changes by entity_id."""
-            return event.data.get("entity_id") in entity_callbacks
-
-        @callback
-        def _async_state_change_dispatcher(event: Event) -> None:
-            """Dispatch state changes by entity_id."""
-            entity_id = event.data.get("entity_id")
-
-            if entity_id not in entity_callbacks:
-                return
-
-            for job in entity_callbacks[entity_id][:]:
-                try:
-                    hass.async_run_hass_job(job, event)
-                except Exception:  # pylint: disable=broad-except
-                    _LOGGER.exception(
-                        "Error while processing state change for %s", entity_id
-                    )
-
-        hass.data[TRACK_STATE_CHANGE_LISTENER] = hass.bus.async_listen(
-            EVENT_STATE_CHANGED,
-            _async_state_change_dispatcher,
-            event_filter=_async_state_change_filter,
-        )
+    @callback
+    def _async_state_change_dispatcher(event: Event) -> None:
+        """Dispatch state changes by entity_id."""
+        entity_id = event.data["entity_id"]
+
+        for job in entity_callbacks.get(entity_id, [])[:]:
+            try:
+                hass.async_run_hass_job(job, event)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception(
+                    "Error while processing state change for %s", entity_id
+                )
 
     job = HassJob(action)
 
     for entity_id in entity_ids:
         entity_callbacks.setdefault(entity_id, []).append(job)
+        if entity_id not in entity_listeners:
+            entity_listeners[entity_id] = hass.bus.async_listen(
+                EVENT_STATE_CHANGED,
+                _async_state_change_dispatcher,
+                entity_ids=entity_id,
+            )
 
     @callback
     def remove_listener() -> None:
         """Remove state change listener."""
-        _async_remove_indexed_listeners(
-            hass,
-            TRACK_STATE_CHANGE_CALLBACKS,
-            TRACK_STATE_CHANGE_LISTENER,
-            entity_ids,
-            job,
-        )
+        for entity_id in entity_ids:
+            callbacks = entity_callbacks[entity_id]
+            callbacks.remove(job)
+            if not callbacks:
+                del entity_callbacks[entity_id]
+                entity_listeners.pop(entity_id)()
 
     return remove_listener
 
@@ -788,6 +804,9 @@ class _TrackTemplateResultInfo:
 
         self._rate_limit = KeyedRateLimit(hass)
         self._info: dict[Template, RenderInfo] = {}
+        # Keyed by id as equal templates can be tracked more than once
+        self._states_read: dict[int, tuple | None] = {}
+        self.render_stats: dict[Template, TrackTemplateRenderStats] = {}
         self._track_state_changes: _TrackStateChangeFiltered | None = None
         self._time_listeners: dict[Template, Callable] = {}
 
@@ -799,6 +818,10 @@ class _TrackTemplateResultInfo:
             self._info[template] = info = template.async_render_to_info(
                 variables, strict=strict
             )
+            self._states_read[id(track_template_)] = _render_info_states_read(
+                self.hass, info
+            )
+            self.render_stats[template] = TrackTemplateRenderStats()
 
             if info.exception:
                 if raise_on_template_error:
@@ -909,6 +932,21 @@ class _TrackTemplateResultInfo:
             ):
                 return not had_timer
 
+            stats = self.render_stats[template]
+            states_read = self._states_read[id(track_template_)]
+            if states_read is not None and states_read == _render_info_states_read(
+                self.hass, info
+            ):
+                stats.hits += 1
+                _LOGGER.debug(
+                    "Template %s not rendered for event, the states it read did not change (hit rate %.2f): %s",
+                    template.template,
+                    stats.hit_rate,
+                    event,
+                )
+                return False
+            stats.misses += 1
+
             _LOGGER.debug(
                 "Template update %s triggered by event: %s",
                 template.template,
@@ -919,6 +957,9 @@ class _TrackTemplateResultInfo:
         self._info[template] = info = template.async_render_to_info(
             track_template_.variables
         )
+        self._states_read[id(track_template_)] = _render_info_states_read(
+            self.hass, info
+        )
 
         try:
             result: str | TemplateError = info.result()
@@ -1534,6 +1575,37 @@ def _rate_limit_for_event(
     return rate_limit
 
 
+@callback
+def _render_info_states_read(hass: HomeAssistant, info: RenderInfo) -> tuple | None:
+    """Return the parts of the states read by a render.
+
+    Returns None if the render may depend on more than the states of the
+    entities it read, so a state change always needs a new render.
+    """
+    if (
+        info.exception
+        or info.all_states
+        or info.all_states_lifecycle
+        or info.domains
+        or info.domains_lifecycle
+        or info.has_time
+        or not info.cacheable
+        or not info.entities
+    ):
+        return None
+
+    states_read: list[Any] = []
+    for entity_id in info.entities:
+        state = hass.states.get(entity_id)
+        # Entities collected without a field, e.g. by expand, count as fully read
+        fields = info.state_fields.get(entity_id)
+        if state is None or fields is None:
+            states_read.append(state)
+        else:
+            states_read.append(tuple(getattr(state, field) for field in fields))
+    return tuple(states_read)
+
+
 def _suppress_domain_all_in_render_info(render_info: RenderInfo) -> RenderInfo:
     """Remove the domains and all_states from render info during a ratelimit."""
     rate_limited_render_info = copy.copy(render_info)
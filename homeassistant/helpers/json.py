@@ -1,7 +1,60 @@
 """Helpers to help with encoding Home Assistant objects in JSON."""
+from __future__ import annotations
+
 from datetime import datetime, timedelta
 import json
-from typing import Any
+from types import MappingProxyType
+from typing import Any, Callable
+
+# Conversion of each type handed to json_encoder_default, found once per type
+_TYPE_CONVERTERS: dict[type, Callable[[Any], Any] | None] = {}
+
+
+def _find_converter(obj_type: type) -> Callable[[Any], Any] | None:
+    """Return the function that makes an object of a type serializable."""
+    if issubclass(obj_type, datetime):
+        return obj_type.isoformat
+    if issubclass(obj_type, set):
+        return list
+    if issubclass(obj_type, MappingProxyType):
+        return dict
+    as_dict = getattr(obj_type, "as_dict", None)
+    if callable(as_dict):
+        return as_dict
+    return None
+
+
+def json_encoder_default(obj: Any) -> Any:
+    """Convert Home Assistant objects, like datetimes, sets, States and Events.
+
+    Raises TypeError for objects that can not be converted.
+    """
+    obj_type = type(obj)
+    try:
+        converter = _TYPE_CONVERTERS[obj_type]
+    except KeyError:
+        converter = _TYPE_CONVERTERS[obj_type] = _find_converter(obj_type)
+
+    if converter is not None:
+        return converter(obj)
+    if hasattr(obj, "as_dict"):
+        return obj.as_dict()
+    raise TypeError(f"Object of type {obj_type.__name__} is not JSON serializable")
+
+
+# Encoders are created once instead of for every serialized object
+_JSON_ENCODER = json.JSONEncoder(default=json_encoder_default)
+_JSON_ENCODER_NO_NAN = json.JSONEncoder(default=json_encoder_default, allow_nan=False)
+
+
+def json_dumps(data: Any, allow_nan: bool = True) -> str:
+    """Serialize data to JSON, supporting Home Assistant objects.
+
+    Raises ValueError or TypeError if the data can not be serialized.
+    """
+    if allow_nan:
+        return _JSON_ENCODER.encode(data)
+    return _JSON_ENCODER_NO_NAN.encode(data)
 
 
 class JSONEncoder(json.JSONEncoder):
@@ -12,14 +65,10 @@ class JSONEncoder(json.JSONEncoder):
 
         Hand other objects to the original method.
         """
-        if isinstance(o, datetime):
-            return o.isoformat()
-        if isinstance(o, set):
-            return list(o)
-        if hasattr(o, "as_dict"):
-            return o.as_dict()
-
-        return json.JSONEncoder.default(self, o)
+        try:
+            return json_encoder_default(o)
+        except TypeError:
+            return json.JSONEncoder.default(self, o)
 
 
 class ExtendedJSONEncoder(JSONEncoder):
@@ -9,22 +9,22 @@ from collections.abc import Generator, Iterable
 from contextlib import suppress
 from contextvars import ContextVar
 from datetime import datetime, timedelta
-from functools import partial, wraps
+from functools import lru_cache, partial, wraps
 import json
 import logging
 import math
-from operator import attrgetter
+import operator
 import random
 import re
 import sys
-from typing import Any, Callable, cast
+from typing import Any, Callable, Dict, cast
 from urllib.parse import urlencode as urllib_urlencode
 import weakref
 
 import jinja2
-from jinja2 import contextfunction, pass_context
+from jinja2 import contextfunction, nodes, pass_context
 from jinja2.sandbox import ImmutableSandboxedEnvironment
-from jinja2.utils import Namespace
+from jinja2.utils import Namespace, generate_lorem_ipsum
 import voluptuous as vol
 
 from homeassistant.const import (
@@ -60,6 +60,7 @@ _RENDER_INFO = "template.render_info"
 _ENVIRONMENT = "template.environment"
 _ENVIRONMENT_LIMITED = "template.environment_limited"
 _ENVIRONMENT_STRICT = "template.environment_strict"
+_TEMPLATE_STATES = "template.states"
 
 _RE_JINJA_DELIMITERS = re.compile(r"\{%|\{\{|\{#")
 # Match "simple" ints and floats. -1.0, 1, +5, 5.0
@@ -80,7 +81,10 @@ _COLLECTABLE_STATE_ATTRIBUTES = {
     "name",
 }
 
-ALL_STATES_RATE_LIMIT = timedelta(minutes=1)
+# Bound of the caches of compiled patterns and parsed arguments of filters
+FILTER_CACHE_SIZE = 512
+
+ALL_STATES_RATE_LIMIT = timedelta(seconds=10)
 DOMAIN_STATES_RATE_LIMIT = timedelta(seconds=1)
 
 template_cv: ContextVar[str | None] = ContextVar("template_cv", default=None)
@@ -219,8 +223,13 @@ class RenderInfo:
         self.domains: collections.abc.Set[str] = set()
         self.domains_lifecycle: collections.abc.Set[str] = set()
         self.entities: collections.abc.Set[str] = set()
+        # The state fields read for each entity, None if the whole state was used
+        self.state_fields: dict[str, set[str] | None] = {}
         self.rate_limit: timedelta | None = None
         self.has_time = False
+        # False when the result depends on more than the states read,
+        # like random values or the registries
+        self.cacheable = True
 
     def __repr__(self) -> str:
         """Representation of RenderInfo."""
@@ -240,6 +249,16 @@ class RenderInfo:
         """Template should re-render if the entity is added or removed with domains watched."""
         return split_entity_id(entity_id)[0] in self.domains_lifecycle
 
+    def collect_state_field(self, entity_id: str, field: str | None) -> None:
+        """Collect an entity and the field of its state read by the template."""
+        self.entities.add(entity_id)
+        if field is None:
+            self.state_fields[entity_id] = None
+            return
+        fields = self.state_fields.setdefault(entity_id, set())
+        if fields is not None:
+            fields.add(field)
+
     def result(self) -> str:
         """Results of the template computation."""
         if self.exception is not None:
@@ -295,6 +314,7 @@ class Template:
         "is_static",
         "_compiled_code",
         "_compiled",
+        "_fast_render",
         "_exc_info",
         "_limited",
         "_strict",
@@ -308,6 +328,7 @@ class Template:
         self.template: str = template.strip()
         self._compiled_code = None
         self._compiled: jinja2.Template | None = None
+        self._fast_render: _FastRender | None = None
         self.hass = hass
         self.is_static = not is_template_string(template)
         self._exc_info = None
@@ -339,6 +360,8 @@ class Template:
         except jinja2.TemplateError as err:
             raise TemplateError(err) from err
 
+        self._fast_render = _fast_render_for_template(self.template)
+
     def render(
         self,
         variables: TemplateVarsType = None,
@@ -386,7 +409,7 @@ class Template:
             kwargs.update(variables)
 
         try:
-            render_result = _render_with_context(self.template, compiled, **kwargs)
+            render_result = self._render(compiled, kwargs)
         except Exception as err:
             raise TemplateError(err) from err
 
@@ -528,11 +551,13 @@ class Template:
 
     @callback
     def async_render_with_possible_json_value(
-        self, value, error_value=_SENTINEL, variables=None
+        self, value, error_value=_SENTINEL, variables=None, parse_json=None
     ):
         """Render template with value exposed.
 
-        If valid JSON will expose value_json too.
+        If valid JSON will expose value_json too. A parse_json callable that
+        returns the value parsed as JSON, or raises ValueError, can be passed
+        to reuse a parse result that is shared with other renders.
 
         This method must be run in the event loop.
         """
@@ -546,12 +571,12 @@ class Template:
         variables["value"] = value
 
         with suppress(ValueError, TypeError):
-            variables["value_json"] = json.loads(value)
+            variables["value_json"] = (
+                json.loads(value) if parse_json is None else parse_json()
+            )
 
         try:
-            return _render_with_context(
-                self.template, self._compiled, **variables
-            ).strip()
+            return self._render(self._compiled, variables).strip()
         except jinja2.TemplateError as ex:
             if error_value is _SENTINEL:
                 _LOGGER.error(
@@ -562,6 +587,15 @@ class Template:
                 )
             return value if error_value is _SENTINEL else error_value
 
+    def _render(self, compiled: jinja2.Template, variables: dict[str, Any]) -> str:
+        """Render with the fast path if the template is simple, otherwise with Jinja."""
+        fast_render = self._fast_render
+        if fast_render is None or not fast_render.called_globals.isdisjoint(variables):
+            return _render_with_context(self.template, compiled, **variables)
+
+        template_cv.set(self.template)
+        return fast_render.render(self._env, variables)
+
     def _ensure_compiled(
         self, limited: bool = False, strict: bool = False
     ) -> jinja2.Template:
@@ -712,9 +746,11 @@ class TemplateState(State):
         self._state = state
         self._collect = collect
 
-    def _collect_state(self) -> None:
+    def _collect_state(self, field: str | None) -> None:
         if self._collect and _RENDER_INFO in self._hass.data:
-            self._hass.data[_RENDER_INFO].entities.add(self._state.entity_id)
+            self._hass.data[_RENDER_INFO].collect_state_field(
+                self._state.entity_id, field
+            )
 
     # Jinja will try __getitem__ first and it avoids the need
     # to call is_safe_attribute
@@ -723,7 +759,9 @@ class TemplateState(State):
         if item in _COLLECTABLE_STATE_ATTRIBUTES:
             # _collect_state inlined here for performance
             if self._collect and _RENDER_INFO in self._hass.data:
-                self._hass.data[_RENDER_INFO].entities.add(self._state.entity_id)
+                self._hass.data[_RENDER_INFO].collect_state_field(
+                    self._state.entity_id, item
+                )
             return getattr(self._state, item)
         if item == "entity_id":
             return self._state.entity_id
@@ -742,61 +780,62 @@ class TemplateState(State):
     @property
     def state(self):
         """Wrap State.state."""
-        self._collect_state()
+        self._collect_state("state")
         return self._state.state
 
     @property
     def attributes(self):
         """Wrap State.attributes."""
-        self._collect_state()
+        self._collect_state("attributes")
         return self._state.attributes
 
     @property
     def last_changed(self):
         """Wrap State.last_changed."""
-        self._collect_state()
+        self._collect_state("last_changed")
         return self._state.last_changed
 
     @property
     def last_updated(self):
         """Wrap State.last_updated."""
-        self._collect_state()
+        self._collect_state("last_updated")
         return self._state.last_updated
 
     @property
     def context(self):
         """Wrap State.context."""
-        self._collect_state()
+        self._collect_state("context")
         return self._state.context
 
     @property
     def domain(self):
         """Wrap State.domain."""
-        self._collect_state()
+        self._collect_state("domain")
         return self._state.domain
 
     @property
     def object_id(self):
         """Wrap State.object_id."""
-        self._collect_state()
+        self._collect_state("object_id")
         return self._state.object_id
 
     @property
     def name(self):
         """Wrap State.name."""
-        self._collect_state()
+        self._collect_state("name")
         return self._state.name
 
     @property
     def state_with_unit(self) -> str:
         """Return the state concatenated with the unit if available."""
-        self._collect_state()
+        self._collect_state("state")
+        self._collect_state("attributes")
         unit = self._state.attributes.get(ATTR_UNIT_OF_MEASUREMENT)
         return f"{self._state.state} {unit}" if unit else self._state.state
 
     def __eq__(self, other: Any) -> bool:
         """Ensure we collect on equality check."""
-        self._collect_state()
+        self._collect_state(None)
         return self._state.__eq__(other)
 
     def __repr__(self) -> str:
@@ -812,8 +851,22 @@ def _collect_state(hass: HomeAssistant, entity_id: str) -> None:
 
 def _state_generator(hass: HomeAssistant, domain: str | None) -> Generator:
     """State generator for a domain or all states."""
-    for state in sorted(hass.states.async_all(domain), key=attrgetter("entity_id")):
-        yield TemplateState(hass, state, collect=False)
+    states = hass.states.async_all_sorted(domain)
+    wrappers: dict[str, TemplateState] = hass.data.setdefault(_TEMPLATE_STATES, {})
+    if len(wrappers) > 2 * hass.states.async_entity_ids_count():
+        # Drop the wrappers of removed entities
+        wrappers = hass.data[_TEMPLATE_STATES] = {}
+
+    for state in states:
+        wrapper = wrappers.get(state.entity_id)
+        if (
+            wrapper is None
+            or wrapper._state is not state  # pylint: disable=protected-access
+        ):
+            wrapper = wrappers[state.entity_id] = TemplateState(
+                hass, state, collect=False
+            )
+        yield wrapper
 
 
 def _get_state_if_valid(hass: HomeAssistant, entity_id: str) -> TemplateState | None:
@@ -904,6 +957,7 @@ def expand(hass: HomeAssistant, *args: Any) -> Iterable[State]:
 
 def device_entities(hass: HomeAssistant, device_id: str) -> Iterable[str]:
     """Get entity ids for entities tied to a device."""
+    _mark_uncacheable(hass)
     entity_reg = entity_registry.async_get(hass)
     entries = entity_registry.async_entries_for_device(entity_reg, device_id)
     return [entry.entity_id for entry in entries]
@@ -1056,6 +1110,13 @@ def state_attr(hass: HomeAssistant, entity_id: str, name: str) -> Any:
     return None
 
 
+def _mark_uncacheable(hass: HomeAssistant) -> None:
+    """Record the render depends on more than the states it read."""
+    render_info = hass.data.get(_RENDER_INFO)
+    if render_info is not None:
+        render_info.cacheable = False
+
+
 def now(hass: HomeAssistant) -> datetime:
     """Record fetching now."""
     render_info = hass.data.get(_RENDER_INFO)
@@ -1220,10 +1281,30 @@ def forgiving_as_timestamp(value):
         return None
 
 
+@lru_cache(maxsize=FILTER_CACHE_SIZE)
+def _compile_regex(find: str, flags: int) -> re.Pattern:
+    """Compile a regex used by a filter."""
+    return re.compile(find, flags)
+
+
+@lru_cache(maxsize=FILTER_CACHE_SIZE)
+def _parse_time(string: str, fmt: str) -> datetime:
+    """Parse a time string, datetimes are immutable so the result is shared."""
+    return datetime.strptime(string, fmt)
+
+
+def filter_cache_info() -> dict[str, dict[str, int]]:
+    """Return the hits, misses and size of the caches used by filters."""
+    return {
+        name: cache.cache_info()._asdict()
+        for name, cache in (("regex", _compile_regex), ("strptime", _parse_time))
+    }
+
+
 def strptime(string, fmt):
     """Parse a time string to datetime."""
     try:
-        return datetime.strptime(string, fmt)
+        return _parse_time(string, fmt)
     except (ValueError, AttributeError, TypeError):
         return string
 
@@ -1248,7 +1329,7 @@ def regex_match(value, find="", ignorecase=False):
     if not isinstance(value, str):
         value = str(value)
     flags = re.I if ignorecase else 0
-    return bool(re.match(find, value, flags))
+    return bool(_compile_regex(find, flags).match(value))
 
 
 def regex_replace(value="", find="", replace="", ignorecase=False):
@@ -1256,8 +1337,7 @@ def regex_replace(value="", find="", replace="", ignorecase=False):
     if not isinstance(value, str):
         value = str(value)
     flags = re.I if ignorecase else 0
-    regex = re.compile(find, flags)
-    return regex.sub(replace, value)
+    return _compile_regex(find, flags).sub(replace, value)
 
 
 def regex_search(value, find="", ignorecase=False):
@@ -1265,7 +1345,7 @@ def regex_search(value, find="", ignorecase=False):
     if not isinstance(value, str):
         value = str(value)
     flags = re.I if ignorecase else 0
-    return bool(re.search(find, value, flags))
+    return bool(_compile_regex(find, flags).search(value))
 
 
 def regex_findall_index(value, find="", index=0, ignorecase=False):
@@ -1273,7 +1353,7 @@ def regex_findall_index(value, find="", index=0, ignorecase=False):
     if not isinstance(value, str):
         value = str(value)
     flags = re.I if ignorecase else 0
-    return re.findall(find, value, flags)[index]
+    return _compile_regex(find, flags).findall(value)[index]
 
 
 def bitwise_and(first_value, second_value):
@@ -1322,9 +1402,18 @@ def random_every_time(context, values):
     Unlike Jinja's random filter,
     this is context-dependent to avoid caching the chosen value.
     """
+    hass = context.environment.hass
+    if hass is not None:
+        _mark_uncacheable(hass)
     return random.choice(values)
 
 
+def lipsum(hass: HomeAssistant, *args: Any, **kwargs: Any) -> str:
+    """Generate lorem ipsum, a random text on every render."""
+    _mark_uncacheable(hass)
+    return generate_lorem_ipsum(*args, **kwargs)
+
+
 def relative_time(value):
     """
     Take a datetime and return its "age" as a string.
@@ -1358,6 +1447,308 @@ def _render_with_context(
     return template.render(**kwargs)
 
 
+class _NotFastRenderable(Exception):
+    """Raised for template nodes the fast render path does not support."""
+
+
+class _FastRender:
+    """Render a simple template with plain Python instead of Jinja.
+
+    Templates that are a single output of state lookups, arithmetic,
+    comparisons and common filters are compiled to nested closures
+    when the template is validated. Rendering calls the same functions
+    and filters as Jinja, but skips setting up a Jinja context.
+    """
+
+    __slots__ = ("render", "called_globals")
+
+    def __init__(self, render: _FastRenderFunc, called_globals: frozenset[str]):
+        """Initialize the fast render."""
+        self.render = render
+        # Globals that are called, variables with the same name shadow them
+        self.called_globals = called_globals
+
+
+_FastRenderFunc = Callable[[Any, Dict[str, Any]], Any]
+
+# Filters and globals that do not need the Jinja context or environment
+_FAST_RENDER_FILTERS = {
+    "abs",
+    "as_timestamp",
+    "bitwise_and",
+    "bitwise_or",
+    "capitalize",
+    "count",
+    "default",
+    "float",
+    "int",
+    "length",
+    "log",
+    "lower",
+    "multiply",
+    "regex_match",
+    "regex_replace",
+    "regex_search",
+    "round",
+    "sqrt",
+    "string",
+    "timestamp_custom",
+    "timestamp_local",
+    "timestamp_utc",
+    "title",
+    "trim",
+    "upper",
+}
+_FAST_RENDER_GLOBALS = {
+    "acos",
+    "as_timestamp",
+    "asin",
+    "atan",
+    "atan2",
+    "cos",
+    "float",
+    "is_state",
+    "is_state_attr",
+    "log",
+    "max",
+    "min",
+    "sin",
+    "sqrt",
+    "state_attr",
+    "states",
+    "tan",
+}
+# Globals wrapped with hassfunction, which ignore the context they are passed
+_FAST_RENDER_HASS_GLOBALS = {"is_state", "is_state_attr", "state_attr"}
+
+_FAST_RENDER_BINARY_OPERATORS: dict[type[nodes.BinExpr], Callable] = {
+    nodes.Add: operator.add,
+    nodes.Sub: operator.sub,
+    nodes.Mul: operator.mul,
+    nodes.Div: operator.truediv,
+    nodes.FloorDiv: operator.floordiv,
+    nodes.Mod: operator.mod,
+    nodes.Pow: operator.pow,
+}
+_FAST_RENDER_UNARY_OPERATORS: dict[type[nodes.UnaryExpr], Callable] = {
+    nodes.Neg: operator.neg,
+    nodes.Pos: operator.pos,
+    nodes.Not: operator.not_,
+}
+_FAST_RENDER_COMPARE_OPERATORS: dict[str, Callable] = {
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "gt": operator.gt,
+    "gteq": operator.ge,
+    "lt": operator.lt,
+    "lteq": operator.le,
+    "in": lambda left, right: left in right,
+    "notin": lambda left, right: left not in right,
+}
+
+
+@lru_cache(maxsize=FILTER_CACHE_SIZE)
+def _fast_render_for_template(template_str: str) -> _FastRender | None:
+    """Compile a template for the fast render path, None if it is not simple."""
+    try:
+        body = _NO_HASS_ENV.parse(template_str).body
+    except jinja2.TemplateSyntaxError:
+        return None
+
+    if len(body) != 1 or not isinstance(body[0], nodes.Output):
+        return None
+
+    called_globals: set[str] = set()
+    try:
+        parts = [_fast_render_output(node, called_globals) for node in body[0].nodes]
+    except _NotFastRenderable:
+        return None
+
+    if len(parts) == 1:
+        return _FastRender(parts[0], frozenset(called_globals))
+
+    def _render(env: Any, variables: dict[str, Any]) -> str:
+        return "".join([part(env, variables) for part in parts])
+
+    return _FastRender(_render, frozenset(called_globals))
+
+
+def _fast_render_output(node: nodes.Node, called_globals: set[str]) -> _FastRenderFunc:
+    """Compile a part of the output of a template."""
+    if isinstance(node, nodes.TemplateData):
+        data = node.data
+        return lambda env, variables: data
+
+    expr = _fast_render_expr(node, called_globals)
+    return lambda env, variables: str(expr(env, variables))
+
+
+def _fast_render_args(
+    node: nodes.Filter | nodes.Call, called_globals: set[str]
+) -> tuple[list[_FastRenderFunc], list[tuple[str, _FastRenderFunc]]]:
+    """Compile the arguments of a filter or function call."""
+    if node.dyn_args is not None or node.dyn_kwargs is not None:
+        raise _NotFastRenderable
+    return (
+        [_fast_render_expr(arg, called_globals) for arg in node.args],
+        [
+            (keyword.key, _fast_render_expr(keyword.value, called_globals))
+            for keyword in node.kwargs
+        ],
+    )
+
+
+def _fast_render_expr(node: nodes.Node, called_globals: set[str]) -> _FastRenderFunc:
+    """Compile an expression, following the semantics of the Jinja compiler."""
+    if isinstance(node, nodes.Const):
+        value = node.value
+        return lambda env, variables: value
+
+    if isinstance(node, nodes.Name):
+        name = node.name
+
+        def _name(env: Any, variables: dict[str, Any]) -> Any:
+            if name in variables:
+                return variables[name]
+            if name in env.globals:
+                return env.globals[name]
+            return env.undefined(name=name)
+
+        return _name
+
+    if isinstance(node, (nodes.List, nodes.Tuple)):
+        items = [_fast_render_expr(item, called_globals) for item in node.items]
+        container = list if isinstance(node, nodes.List) else tuple
+        return lambda env, variables: container(
+            [item(env, variables) for item in items]
+        )
+
+    if type(node) in _FAST_RENDER_BINARY_OPERATORS:
+        binary_operator = _FAST_RENDER_BINARY_OPERATORS[type(node)]
+        left = _fast_render_expr(node.left, called_globals)
+        right = _fast_render_expr(node.right, called_globals)
+        return lambda env, variables: binary_operator(
+            left(env, variables), right(env, variables)
+        )
+
+    if type(node) in _FAST_RENDER_UNARY_OPERATORS:
+        unary_operator = _FAST_RENDER_UNARY_OPERATORS[type(node)]
+        operand = _fast_render_expr(node.node, called_globals)
+        return lambda env, variables: unary_operator(operand(env, variables))
+
+    if isinstance(node, nodes.And):
+        left = _fast_render_expr(node.left, called_globals)
+        right = _fast_render_expr(node.right, called_globals)
+        return lambda env, variables: left(env, variables) and right(env, variables)
+
+    if isinstance(node, nodes.Or):
+        left = _fast_render_expr(node.left, called_globals)
+        right = _fast_render_expr(node.right, called_globals)
+        return lambda env, variables: left(env, variables) or right(env, variables)
+
+    if isinstance(node, nodes.Concat):
+        parts = [_fast_render_expr(part, called_globals) for part in node.nodes]
+        return lambda env, variables: "".join(
+            [str(part(env, variables)) for part in parts]
+        )
+
+    if isinstance(node, nodes.CondExpr) and node.expr2 is not None:
+        test = _fast_render_expr(node.test, called_globals)
+        expr1 = _fast_render_expr(node.expr1, called_globals)
+        expr2 = _fast_render_expr(node.expr2, called_globals)
+        return lambda env, variables: (
+            expr1(env, variables) if test(env, variables) else expr2(env, variables)
+        )
+
+    if isinstance(node, nodes.Compare):
+        return _fast_render_compare(node, called_globals)
+
+    if isinstance(node, nodes.Filter):
+        return _fast_render_filter(node, called_globals)
+
+    if isinstance(node, nodes.Call):
+        return _fast_render_call(node, called_globals)
+
+    raise _NotFastRenderable
+
+
+def _fast_render_compare(
+    node: nodes.Compare, called_globals: set[str]
+) -> _FastRenderFunc:
+    """Compile a, possibly chained, comparison."""
+    first = _fast_render_expr(node.expr, called_globals)
+    operands = []
+    for operand in node.ops:
+        if operand.op not in _FAST_RENDER_COMPARE_OPERATORS:
+            raise _NotFastRenderable
+        operands.append(
+            (
+                _FAST_RENDER_COMPARE_OPERATORS[operand.op],
+                _fast_render_expr(operand.expr, called_globals),
+            )
+        )
+
+    def _compare(env: Any, variables: dict[str, Any]) -> Any:
+        left = first(env, variables)
+        for compare, operand in operands:
+            right = operand(env, variables)
+            result = compare(left, right)
+            if not result:
+                return result
+            left = right
+        return result
+
+    return _compare
+
+
+def _fast_render_filter(
+    node: nodes.Filter, called_globals: set[str]
+) -> _FastRenderFunc:
+    """Compile a filter that does not need the Jinja context."""
+    if node.node is None or node.name not in _FAST_RENDER_FILTERS:
+        raise _NotFastRenderable
+
+    name = node.name
+    value = _fast_render_expr(node.node, called_globals)
+    args, kwargs = _fast_render_args(node, called_globals)
+
+    def _filter(env: Any, variables: dict[str, Any]) -> Any:
+        return env.filters[name](
+            value(env, variables),
+            *[arg(env, variables) for arg in args],
+            **{key: kwarg(env, variables) for key, kwarg in kwargs},
+        )
+
+    return _filter
+
+
+def _fast_render_call(node: nodes.Call, called_globals: set[str]) -> _FastRenderFunc:
+    """Compile a call of a global function that does not need the Jinja context."""
+    if (
+        not isinstance(node.node, nodes.Name)
+        or node.node.name not in _FAST_RENDER_GLOBALS
+    ):
+        raise _NotFastRenderable
+
+    name = node.node.name
+    called_globals.add(name)
+    args, kwargs = _fast_render_args(node, called_globals)
+    # The context is discarded by hassfunction, so None is passed instead
+    prefix = (None,) if name in _FAST_RENDER_HASS_GLOBALS else ()
+
+    def _call(env: Any, variables: dict[str, Any]) -> Any:
+        func = env.globals.get(name)
+        if func is None:
+            func = env.undefined(name=name)
+        return func(
+            *prefix,
+            *[arg(env, variables) for arg in args],
+            **{key: kwarg(env, variables) for key, kwarg in kwargs},
+        )
+
+    return _call
+
+
 class LoggingUndefined(jinja2.Undefined):
     """Log on undefined variables."""
 
@@ -1483,6 +1874,7 @@ class TemplateEnvironment(ImmutableSandboxedEnvironment):
 
             return contextfunction(wrapper)
 
+        self.globals["lipsum"] = hassfunction(lipsum)
         self.globals["device_entities"] = hassfunction(device_entities)
         self.filters["device_entities"] = pass_context(self.globals["device_entities"])
 
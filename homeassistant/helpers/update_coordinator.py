@@ -2,11 +2,13 @@
 from __future__ import annotations
 
 import asyncio
+from bisect import bisect_left
 from collections.abc import Awaitable
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 import logging
 from time import monotonic
-from typing import Callable, Generic, TypeVar
+from typing import Any, Callable, Generic, TypeVar
 import urllib.error
 
 import aiohttp
@@ -23,6 +25,11 @@ from .debounce import Debouncer
 REQUEST_REFRESH_DEFAULT_COOLDOWN = 10
 REQUEST_REFRESH_DEFAULT_IMMEDIATE = True
 
+# Failed refreshes back off up to this interval, or the update interval if longer
+REFRESH_BACKOFF_MAX_INTERVAL = timedelta(minutes=15)
+# Upper bounds in seconds of the buckets of the fetch duration histogram
+FETCH_DURATION_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
 T = TypeVar("T")
 
 
@@ -30,6 +37,44 @@ class UpdateFailed(Exception):
     """Raised when an update has failed."""
 
 
+@dataclass
+class DataUpdateCoordinatorStats:
+    """Statistics of the refreshes of a DataUpdateCoordinator."""
+
+    fetches: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    # Refreshes that awaited a fetch which was already in flight
+    shared: int = 0
+    # Scheduled refreshes dropped because a fetch was in flight or hass stopping
+    skipped: int = 0
+    # Fetch count per bucket of FETCH_DURATION_BUCKETS, plus one for longer fetches
+    fetch_durations: list[int] = field(
+        default_factory=lambda: [0] * (len(FETCH_DURATION_BUCKETS) + 1)
+    )
+
+    def record_fetch(self, duration: float) -> None:
+        """Record the duration of a fetch in the histogram."""
+        self.fetches += 1
+        self.fetch_durations[bisect_left(FETCH_DURATION_BUCKETS, duration)] += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the statistics as a dictionary."""
+        return {
+            "fetches": self.fetches,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "shared": self.shared,
+            "skipped": self.skipped,
+            "fetch_durations": dict(
+                zip(
+                    [str(bound) for bound in FETCH_DURATION_BUCKETS] + ["+Inf"],
+                    self.fetch_durations,
+                )
+            ),
+        }
+
+
 class DataUpdateCoordinator(Generic[T]):
     """Class to manage fetching data from single endpoint."""
 
@@ -62,8 +107,11 @@ class DataUpdateCoordinator(Generic[T]):
         self._job = HassJob(self._handle_refresh_interval)
         self._unsub_refresh: CALLBACK_TYPE | None = None
         self._request_refresh_task: asyncio.TimerHandle | None = None
+        # Resolved with the exception to re-raise, if any, when the fetch is done
+        self._fetch_in_flight: asyncio.Future[Exception | None] | None = None
         self.last_update_success = True
         self.last_exception: Exception | None = None
+        self.stats = DataUpdateCoordinatorStats()
 
         if request_refresh_debouncer is None:
             request_refresh_debouncer = Debouncer(
@@ -105,6 +153,20 @@ class DataUpdateCoordinator(Generic[T]):
             self._unsub_refresh()
             self._unsub_refresh = None
 
+    @property
+    def refresh_interval(self) -> timedelta | None:
+        """Return the interval until the next scheduled refresh.
+
+        The update interval is doubled for every consecutive failed refresh
+        after the first one, so a struggling source is polled less often.
+        """
+        if self.update_interval is None or self.stats.consecutive_failures < 2:
+            return self.update_interval
+        max_interval = max(self.update_interval, REFRESH_BACKOFF_MAX_INTERVAL)
+        # Limit the exponent, the interval is capped long before this anyway
+        factor = 2 ** min(self.stats.consecutive_failures - 1, 16)
+        return min(self.update_interval * factor, max_interval)
+
     @callback
     def _schedule_refresh(self) -> None:
         """Schedule a refresh."""
@@ -125,7 +187,7 @@ class DataUpdateCoordinator(Generic[T]):
         self._unsub_refresh = event.async_track_point_in_utc_time(
             self.hass,
             self._job,
-            utcnow().replace(microsecond=0) + self.update_interval,
+            utcnow().replace(microsecond=0) + self.refresh_interval,
         )
 
     async def _handle_refresh_interval(self, _now: datetime) -> None:
@@ -170,18 +232,34 @@ class DataUpdateCoordinator(Generic[T]):
         raise_on_auth_failed: bool = False,
         scheduled: bool = False,
     ) -> None:
-        """Refresh data."""
+        """Refresh data.
+
+        Callers refreshing while a fetch is in flight share its result,
+        scheduled refreshes are skipped then.
+        """
         if self._unsub_refresh:
             self._unsub_refresh()
             self._unsub_refresh = None
 
         self._debounced_refresh.async_cancel()
 
-        if scheduled and self.hass.is_stopping:
+        if scheduled and (self.hass.is_stopping or self._fetch_in_flight):
+            self.stats.skipped += 1
             return
 
+        if self._fetch_in_flight:
+            self.stats.shared += 1
+            err = await asyncio.shield(self._fetch_in_flight)
+            if isinstance(err, NotImplementedError) or (
+                raise_on_auth_failed and isinstance(err, ConfigEntryAuthFailed)
+            ):
+                raise err
+            return
+
+        fetch_in_flight = self._fetch_in_flight = self.hass.loop.create_future()
         start = monotonic()
         auth_failed = False
+        raise_err: Exception | None = None
 
         try:
             self.data = await self._async_update_data()
@@ -230,13 +308,14 @@ class DataUpdateCoordinator(Generic[T]):
                         err,
                     )
                 self.last_update_success = False
+            raise_err = err
             if raise_on_auth_failed:
                 raise
 
             if self.config_entry:
                 self.config_entry.async_start_reauth(self.hass)
         except NotImplementedError as err:
-            self.last_exception = err
+            self.last_exception = raise_err = err
             raise err
 
         except Exception as err:  # pylint: disable=broad-except
@@ -248,15 +327,23 @@ class DataUpdateCoordinator(Generic[T]):
                 )
 
         else:
+            self.stats.consecutive_failures = 0
             if not self.last_update_success:
                 self.last_update_success = True
                 self.logger.info("Fetching %s data recovered", self.name)
 
         finally:
+            duration = monotonic() - start
+            self.stats.record_fetch(duration)
+            if not self.last_update_success and raise_err is None:
+                self.stats.failures += 1
+                self.stats.consecutive_failures += 1
+            self._fetch_in_flight = None
+            fetch_in_flight.set_result(raise_err)
             self.logger.debug(
                 "Finished fetching %s data in %.3f seconds",
                 self.name,
-                monotonic() - start,
+                duration,
             )
             if not auth_failed and self._listeners and not self.hass.is_stopping:
                 self._schedule_refresh()
@@ -275,6 +362,7 @@ class DataUpdateCoordinator(Generic[T]):
 
         self.data = data
         self.last_update_success = True
+        self.stats.consecutive_failures = 0
         self.logger.debug(
             "Manually updated %s data",
             self.name,
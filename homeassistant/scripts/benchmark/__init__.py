@@ -15,7 +15,8 @@ from homeassistant import core
 from homeassistant.components.websocket_api.const import JSON_DUMP
 from homeassistant.const import ATTR_NOW, EVENT_STATE_CHANGED, EVENT_TIME_CHANGED
 from homeassistant.helpers.entityfilter import convert_include_exclude_filter
-from homeassistant.helpers.json import JSONEncoder
+from homeassistant.helpers.json import JSONEncoder, json_dumps
+from homeassistant.helpers.template import Template
 from homeassistant.util import dt as dt_util
 
 # mypy: allow-untyped-calls, allow-untyped-defs, no-check-untyped-defs
@@ -118,6 +119,35 @@ async def fire_events_with_filter(hass):
     return timer() - start
 
 
+@benchmark
+async def fire_events_with_entity_ids(hass):
+    """Fire a million events to a thousand listeners indexed by entity_id."""
+    count = 0
+    event_name = "benchmark_event"
+    events_to_fire = 10 ** 6
+
+    @core.callback
+    def listener(_):
+        """Handle event."""
+        nonlocal count
+        count += 1
+
+    for idx in range(1000):
+        hass.bus.async_listen(event_name, listener, entity_ids=f"light.kitchen_{idx}")
+
+    event_data = {"entity_id": "light.kitchen_0"}
+    for _ in range(events_to_fire):
+        hass.bus.async_fire(event_name, event_data)
+
+    start = timer()
+
+    await hass.async_block_till_done()
+
+    assert count == events_to_fire
+
+    return timer() - start
+
+
 @benchmark
 async def time_changed_helper(hass):
     """Run a million events through time changed helper."""
@@ -390,6 +420,211 @@ async def json_serialize_states(hass):
     return timer() - start
 
 
+def _state_changed_events(count):
+    """Create state changed events of lights with a few attributes."""
+    old_state = core.State(
+        "light.kitchen",
+        "off",
+        {"friendly_name": "Kitchen Lights", "supported_features": 44},
+    )
+    return [
+        core.Event(
+            EVENT_STATE_CHANGED,
+            {
+                "entity_id": "light.kitchen",
+                "old_state": old_state,
+                "new_state": core.State(
+                    "light.kitchen",
+                    "on",
+                    {
+                        "friendly_name": "Kitchen Lights",
+                        "brightness": idx % 255,
+                        "hs_color": (30.0, 50.0),
+                        "supported_features": 44,
+                    },
+                ),
+            },
+        )
+        for idx in range(count)
+    ]
+
+
+@benchmark
+async def json_serialize_events(hass):
+    """Serialize 100k state changed events with json_dumps."""
+    events = _state_changed_events(10 ** 5)
+
+    start = timer()
+    for event in events:
+        json_dumps(event)
+    return timer() - start
+
+
+@benchmark
+async def json_serialize_events_json_encoder(hass):
+    """Serialize 100k state changed events with json.dumps and JSONEncoder."""
+    events = _state_changed_events(10 ** 5)
+
+    start = timer()
+    for event in events:
+        json.dumps(event, cls=JSONEncoder)
+    return timer() - start
+
+
+@benchmark
+async def json_serialize_states_json_encoder(hass):
+    """Serialize million states with json.dumps and JSONEncoder."""
+    states = [
+        core.State("light.kitchen", "on", {"friendly_name": "Kitchen Lights"})
+        for _ in range(10 ** 6)
+    ]
+
+    start = timer()
+    json.dumps(states, cls=JSONEncoder, allow_nan=False)
+    return timer() - start
+
+
+@benchmark
+async def template_render_simple(hass):
+    """Render a simple template 100k times, it does not need Jinja."""
+    return _template_render(hass, "{{ states('sensor.power') | float * 2 }}")
+
+
+@benchmark
+async def template_render_jinja(hass):
+    """Render a template 100k times that Jinja has to render."""
+    return _template_render(hass, "{{ states.sensor.power.state | float * 2 }}")
+
+
+def _template_render(hass, template_str):
+    """Render a template 100k times."""
+    hass.states.async_set("sensor.power", "21.5")
+    template = Template(template_str, hass)
+    template.ensure_valid()
+
+    start = timer()
+    for _ in range(10 ** 5):
+        assert template.async_render() == 43.0
+    return timer() - start
+
+
+@benchmark
+async def recorder_get_states(hass):
+    """Get the states at 100 points in time from 2 million states."""
+    return _recorder_get_states(hass, with_latest_states=True)
+
+
+@benchmark
+async def recorder_get_states_without_latest_states(hass):
+    """Get the states at 100 points in time scanning 2 million states."""
+    return _recorder_get_states(hass, with_latest_states=False)
+
+
+def _recorder_get_states(hass, with_latest_states):
+    """Get the states at points in time from a synthetic database.
+
+    The database has the states of 1000 entities changing every 90 seconds
+    during a recorder run of 48 hours.
+    """
+    # pylint: disable=import-outside-toplevel,protected-access
+    from datetime import timedelta
+    import tempfile
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from homeassistant.components.recorder import history
+    from homeassistant.components.recorder.models import (
+        Base,
+        LatestStates,
+        RecorderRuns,
+        States,
+        StatesMeta,
+    )
+
+    entities = 1000
+    hours = 48
+    changes_per_hour = 40
+    run_start = dt_util.utcnow().replace(minute=0, second=0, microsecond=0)
+    run_start -= timedelta(hours=hours)
+    entity_ids = [f"sensor.benchmark_{idx}" for idx in range(entities)]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        engine = create_engine(f"sqlite:///{tmpdir}/benchmark.db")
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        run = RecorderRuns(start=run_start, created=run_start)
+        session.add(run)
+        metadata_ids = {
+            entity_id: metadata_id
+            for metadata_id, entity_id in enumerate(entity_ids, 1)
+        }
+        session.execute(
+            StatesMeta.__table__.insert(),
+            [
+                {"metadata_id": metadata_id, "entity_id": entity_id}
+                for entity_id, metadata_id in metadata_ids.items()
+            ],
+        )
+
+        state_id = 0
+        last_state_ids = {}
+        for hour in range(hours):
+            bucket_start = run_start + timedelta(hours=hour)
+            if with_latest_states and last_state_ids:
+                session.execute(
+                    LatestStates.__table__.insert(),
+                    [
+                        {
+                            "bucket_start": bucket_start,
+                            "entity_id": entity_id,
+                            "state_id": last_state_id,
+                        }
+                        for entity_id, last_state_id in last_state_ids.items()
+                    ],
+                )
+            rows = []
+            for change in range(changes_per_hour):
+                last_updated = bucket_start + timedelta(seconds=change * 90)
+                last_updated_ts = last_updated.timestamp()
+                for entity_id in entity_ids:
+                    state_id += 1
+                    last_state_ids[entity_id] = state_id
+                    rows.append(
+                        {
+                            "state_id": state_id,
+                            "domain": "sensor",
+                            "entity_id": entity_id,
+                            "metadata_id": metadata_ids[entity_id],
+                            "state": str(change),
+                            "attributes": "{}",
+                            "last_changed": last_updated,
+                            "last_updated": last_updated,
+                            "last_changed_ts": last_updated_ts,
+                            "last_updated_ts": last_updated_ts,
+                            "created": last_updated,
+                        }
+                    )
+            session.execute(States.__table__.insert(), rows)
+        session.commit()
+
+        points = [
+            run_start + timedelta(hours=hours * idx / 100, seconds=45)
+            for idx in range(100)
+        ]
+
+        start = timer()
+        for point in points:
+            states = history._get_states_with_session(hass, session, point, run=run)
+            assert len(states) == entities
+        runtime = timer() - start
+
+        session.close()
+        engine.dispose()
+
+    return runtime
+
+
 def _create_state_changed_event_from_old_new(
     entity_id, event_time_fired, old_state, new_state
 ):
@@ -405,7 +640,7 @@ def _create_state_changed_event_from_old_new(
         [
             "event_type"
             "event_data"
-            "time_fired"
+            "time_fired_ts"
             "context_id"
             "context_user_id"
             "state"
@@ -420,7 +655,7 @@ def _create_state_changed_event_from_old_new(
     row.event_type = EVENT_STATE_CHANGED
     row.event_data = "{}"
     row.attributes = attributes_json
-    row.time_fired = event_time_fired
+    row.time_fired_ts = event_time_fired.timestamp()
     row.state = new_state and new_state.get("state")
     row.entity_id = entity_id
     row.domain = entity_id and core.split_entity_id(entity_id)[0]
@@ -337,6 +337,34 @@ async def test_stream(hass, mock_api_client):
     assert data["event_type"] == "test_event"
 
 
+async def test_stream_state_changed(hass, mock_api_client):
+    """Test the stream of state changed events."""
+    resp = await mock_api_client.get(const.URL_API_STREAM)
+    assert resp.status == 200
+
+    hass.states.async_set("light.kitchen", "on", {"brightness": 100})
+    data = await _stream_next_event(resp.content)
+    assert data["event_type"] == "state_changed"
+    assert data["data"] == {
+        "entity_id": "light.kitchen",
+        "old_state": None,
+        "new_state": hass.states.get("light.kitchen").as_dict(),
+    }
+
+    old_state = hass.states.get("light.kitchen")
+    context = ha.Context()
+    hass.states.async_set("light.kitchen", "off", context=context)
+    data = await _stream_next_event(resp.content)
+    assert data["data"] == {
+        "entity_id": "light.kitchen",
+        "old_state": old_state.as_dict(),
+        "new_state": hass.states.get("light.kitchen").as_dict(),
+    }
+    assert data["origin"] == "LOCAL"
+    assert data["context"] == context.as_dict()
+    assert "time_fired" in data
+
+
 async def test_stream_with_restricted(hass, mock_api_client):
     """Test the stream with restrictions."""
     listen_count = _listen_count(hass)
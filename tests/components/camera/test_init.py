@@ -1,6 +1,7 @@
 """The tests for the camera component."""
 import asyncio
 import base64
+from datetime import timedelta
 import io
 from unittest.mock import Mock, PropertyMock, mock_open, patch
 
@@ -17,9 +18,12 @@ from homeassistant.const import (
     HTTP_BAD_GATEWAY,
     HTTP_OK,
 )
+from homeassistant.core import callback
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.setup import async_setup_component
+import homeassistant.util.dt as dt_util
 
+from tests.common import async_fire_time_changed
 from tests.components.camera import common
 
 
@@ -375,3 +379,26 @@ async def test_camera_proxy_stream(hass, mock_camera, hass_client):
     ):
         response = await client.get("/api/camera_proxy_stream/camera.demo_camera")
         assert response.status == HTTP_BAD_GATEWAY
+
+
+async def test_update_tokens(hass, mock_camera):
+    """Test the access tokens of all cameras are updated together."""
+    batches = []
+
+    @callback
+    def batch_listener(batch):
+        """Mock batch listener."""
+        batches.append(batch)
+
+    hass.states.async_listen_batched(batch_listener)
+    old_token = hass.states.get("camera.demo_camera").attributes["access_token"]
+
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + camera.TOKEN_CHANGE_INTERVAL + timedelta(seconds=1)
+    )
+    await hass.async_block_till_done()
+
+    state = hass.states.get("camera.demo_camera")
+    assert state.attributes["access_token"] != old_token
+    assert len(batches) == 1
+    assert batches[0][0].data["new_state"] is state
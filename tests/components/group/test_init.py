@@ -439,7 +439,10 @@ async def test_reloading_groups(hass):
         "group.second_group",
         "group.test_group",
     ]
-    assert hass.bus.async_listeners()["state_changed"] == 1
+    # One bus listener indexed by entity_id for each tracked entity
+    assert hass.bus.async_listeners()["state_changed"] == len(
+        hass.data[TRACK_STATE_CHANGE_CALLBACKS]
+    )
     assert len(hass.data[TRACK_STATE_CHANGE_CALLBACKS]["hello.world"]) == 1
     assert len(hass.data[TRACK_STATE_CHANGE_CALLBACKS]["light.bowl"]) == 1
     assert len(hass.data[TRACK_STATE_CHANGE_CALLBACKS]["test.one"]) == 1
@@ -458,7 +461,10 @@ async def test_reloading_groups(hass):
         "group.all_tests",
         "group.hello",
     ]
-    assert hass.bus.async_listeners()["state_changed"] == 1
+    # One bus listener indexed by entity_id for each tracked entity
+    assert hass.bus.async_listeners()["state_changed"] == len(
+        hass.data[TRACK_STATE_CHANGE_CALLBACKS]
+    )
     assert len(hass.data[TRACK_STATE_CHANGE_CALLBACKS]["light.bowl"]) == 1
     assert len(hass.data[TRACK_STATE_CHANGE_CALLBACKS]["test.one"]) == 1
     assert len(hass.data[TRACK_STATE_CHANGE_CALLBACKS]["test.two"]) == 1
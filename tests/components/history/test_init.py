@@ -2,8 +2,10 @@
 # pylint: disable=protected-access,invalid-name
 from datetime import timedelta
 import json
+import logging
 from unittest.mock import patch, sentinel
 
+from aiohttp import web
 import pytest
 from pytest import approx
 
@@ -613,6 +615,132 @@ async def test_fetch_period_api_with_minimal_response(hass, hass_client):
     assert response.status == 200
 
 
+async def test_fetch_period_api_with_stream(hass, hass_client):
+    """Test the fetch period view for history streams the same states."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(hass, "history", {})
+    await hass.async_add_executor_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+    start = dt_util.utcnow()
+    hass.states.async_set("light.kitchen", "on", {"brightness": 10})
+    hass.states.async_set("light.cow", "on")
+    hass.states.async_set("light.kitchen", "off")
+
+    await hass.async_block_till_done()
+
+    await hass.async_add_executor_job(trigger_db_commit, hass)
+    await hass.async_block_till_done()
+    await hass.async_add_executor_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    client = await hass_client()
+    response = await client.get(f"/api/history/period/{start.isoformat()}")
+    assert response.status == 200
+    expected = await response.json()
+
+    response = await client.get(
+        f"/api/history/period/{start.isoformat()}", params={"stream": ""}
+    )
+    assert response.status == 200
+    assert response.content_type == "application/json"
+    response_json = await response.json()
+    assert len(response_json) == 2
+    assert sorted(response_json, key=lambda states: states[0]["entity_id"]) == sorted(
+        expected, key=lambda states: states[0]["entity_id"]
+    )
+
+    response = await client.get(
+        f"/api/history/period/{start.isoformat()}",
+        params={"stream": "", "filter_entity_id": "non.existing"},
+    )
+    assert response.status == 200
+    assert await response.json() == []
+
+
+async def test_fetch_period_api_with_stream_errors(hass, hass_client, caplog):
+    """Test the history stream stops when the client goes away or encoding fails."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(hass, "history", {})
+    await hass.async_add_executor_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+    start = dt_util.utcnow()
+    hass.states.async_set("light.kitchen", "on")
+    hass.states.async_set("light.cow", "on")
+
+    await hass.async_block_till_done()
+
+    await hass.async_add_executor_job(trigger_db_commit, hass)
+    await hass.async_block_till_done()
+    await hass.async_add_executor_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    caplog.set_level(logging.DEBUG)
+    client = await hass_client()
+    with patch.object(
+        web.StreamResponse, "write", side_effect=ConnectionResetError
+    ) as write:
+        response = await client.get(
+            f"/api/history/period/{start.isoformat()}", params={"stream": ""}
+        )
+        await response.read()
+    assert write.call_count == 1
+    assert "Client closed the history stream" in caplog.text
+    await hass.async_block_till_done()
+    assert "Stopped streaming after" in caplog.text
+
+    with patch("homeassistant.components.history.json_dumps", side_effect=ValueError):
+        response = await client.get(
+            f"/api/history/period/{start.isoformat()}", params={"stream": ""}
+        )
+        await response.read()
+    assert "Error encoding the history stream" in caplog.text
+
+
+async def test_fetch_period_api_with_compressed_state_format(hass, hass_client):
+    """Test the fetch period view for history with the compressed format."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(hass, "history", {})
+    await hass.async_add_executor_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+    start = dt_util.utcnow()
+    hass.states.async_set("light.kitchen", "on", {"brightness": 10})
+    hass.states.async_set("light.kitchen", "on", {"brightness": 20})
+    hass.states.async_set("light.kitchen", "off", {"brightness": 20})
+    hass.states.async_set("light.cow", "on")
+
+    await hass.async_block_till_done()
+
+    await hass.async_add_executor_job(trigger_db_commit, hass)
+    await hass.async_block_till_done()
+    await hass.async_add_executor_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    client = await hass_client()
+    response = await client.get(
+        f"/api/history/period/{start.isoformat()}",
+        params={"compressed_state_format": "", "significant_changes_only": "0"},
+    )
+    assert response.status == 200
+    response_json = await response.json()
+    assert sorted(response_json) == ["light.cow", "light.kitchen"]
+    kitchen = response_json["light.kitchen"]
+    assert kitchen["s"] == ["on", "on", "off"]
+    assert kitchen["a"] == [[0, {"brightness": 10}], [1, {"brightness": 20}]]
+    assert len(kitchen["t"]) == 3
+    assert kitchen["t"][0] == approx(
+        hass.states.get("light.kitchen").last_updated.timestamp(), abs=60
+    )
+    assert all(delta >= 0 for delta in kitchen["t"][1:])
+    # Only the attributes changed in the second state
+    assert kitchen["lc"] == [[1, kitchen["t"][1]]]
+    assert response_json["light.cow"]["lc"] == []
+
+    response = await client.get(
+        f"/api/history/period/{start.isoformat()}",
+        params={
+            "compressed_state_format": "",
+            "significant_changes_only": "0",
+            "stream": "",
+        },
+    )
+    assert response.status == 200
+    assert await response.json() == response_json
+
+
 async def test_fetch_period_api_with_no_timestamp(hass, hass_client):
     """Test the fetch period view for history with no timestamp."""
     await hass.async_add_executor_job(init_recorder_component, hass)
@@ -993,6 +1121,7 @@ async def test_list_statistic_ids(hass, hass_ws_client, units, attributes, unit)
 
     await hass.async_add_executor_job(trigger_db_commit, hass)
     await hass.async_block_till_done()
+    await hass.async_add_executor_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
 
     client = await hass_ws_client()
     await client.send_json({"id": 1, "type": "history/list_statistic_ids"})
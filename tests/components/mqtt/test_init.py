@@ -11,6 +11,7 @@ import voluptuous as vol
 from homeassistant.components import mqtt, websocket_api
 from homeassistant.components.mqtt import debug_info
 from homeassistant.components.mqtt.mixins import MQTT_ENTITY_DEVICE_INFO_SCHEMA
+from homeassistant.components.mqtt.models import Message
 from homeassistant.const import (
     ATTR_DOMAIN,
     ATTR_SERVICE,
@@ -569,6 +570,107 @@ async def test_subscribe_topic_sys_root_and_wildcard_subtree_topic(
     assert calls[0][0].payload == "test-payload"
 
 
+async def test_messages_handed_to_loop_in_batches(hass, mqtt_mock, calls, record_calls):
+    """Test messages received by paho are handled in batches."""
+    await mqtt.async_subscribe(hass, "test-topic/#", record_calls)
+    mqtt_client = mqtt_mock()
+
+    for idx in range(3):
+        mqtt_client._mqtt_on_message(
+            None, None, Message(f"test-topic/{idx}", b"test-payload", 0, False)
+        )
+    assert len(calls) == 0
+
+    await hass.async_block_till_done()
+    assert [args[0].topic for args in calls] == [
+        "test-topic/0",
+        "test-topic/1",
+        "test-topic/2",
+    ]
+
+    mqtt_client._mqtt_on_message(
+        None, None, Message("test-topic/3", b"test-payload", 0, False)
+    )
+    await hass.async_block_till_done()
+    assert len(calls) == 4
+
+    stats = mqtt_client.message_batch_stats
+    assert stats.batches == 2
+    assert stats.messages == 4
+    assert stats.last_batch_size == 1
+    assert stats.max_batch_size == 3
+    assert stats.average_batch_size == 2
+
+
+async def test_subscribers_share_payload(hass, mqtt_mock):
+    """Test the decoded and parsed payload is shared by the subscribers."""
+    calls = []
+
+    @callback
+    def record_calls(msg):
+        """Record calls."""
+        calls.append(msg)
+
+    await mqtt.async_subscribe(hass, "test-topic", record_calls)
+    await mqtt.async_subscribe(hass, "test-topic/#", record_calls)
+    await mqtt.async_subscribe(hass, "test-topic", record_calls, encoding=None)
+
+    with patch(
+        "homeassistant.components.mqtt.models.json.loads", wraps=json.loads
+    ) as mock_loads:
+        async_fire_mqtt_message(hass, "test-topic", '{"hello": "world"}')
+        await hass.async_block_till_done()
+
+        assert len(calls) == 3
+        assert calls[0].payload == '{"hello": "world"}'
+        assert calls[0].payload is calls[1].payload
+        assert calls[2].payload == b'{"hello": "world"}'
+
+        assert calls[0].payload_json() == {"hello": "world"}
+        assert calls[1].payload_json() is calls[0].payload_json()
+        assert calls[2].payload_json() == {"hello": "world"}
+        # One parse per encoding
+        assert len(mock_loads.mock_calls) == 2
+
+        assert calls[0].copy_payload_json() == {"hello": "world"}
+        assert calls[0].copy_payload_json() is not calls[0].payload_json()
+
+    calls.clear()
+    async_fire_mqtt_message(hass, "test-topic", "not json")
+    await hass.async_block_till_done()
+
+    assert len(calls) == 3
+    for msg in calls:
+        with pytest.raises(ValueError):
+            msg.payload_json()
+        with pytest.raises(ValueError):
+            msg.copy_payload_json()
+
+
+async def test_message_batch_latency(hass, mqtt_mock, calls, record_calls):
+    """Test messages are held back for the configured batch latency."""
+    await mqtt.async_subscribe(hass, "test-topic", record_calls)
+    mqtt_client = mqtt_mock()
+    mqtt_client.conf[mqtt.CONF_MESSAGE_BATCH_LATENCY] = 0.1
+
+    with patch.object(hass.loop, "call_later") as mock_call_later:
+        for _ in range(2):
+            mqtt_client._mqtt_on_message(
+                None, None, Message("test-topic", b"test-payload", 0, False)
+            )
+        await hass.async_block_till_done()
+
+    assert len(calls) == 0
+    assert len(mock_call_later.mock_calls) == 1
+    latency, flush = mock_call_later.mock_calls[0][1]
+    assert latency == 0.1
+
+    flush()
+    await hass.async_block_till_done()
+    assert len(calls) == 2
+    assert mqtt_client.message_batch_stats.max_batch_size == 2
+
+
 async def test_subscribe_special_characters(hass, mqtt_mock, calls, record_calls):
     """Test the subscription to topics with special characters."""
     topic = "/test-topic/$(.)[^]{-}"
@@ -945,6 +1047,32 @@ async def test_mqtt_ws_subscription(hass, hass_ws_client, mqtt_mock):
     assert response["success"]
 
 
+async def test_mqtt_ws_message_batch_stats(
+    hass, hass_ws_client, mqtt_mock, calls, record_calls
+):
+    """Test the MQTT websocket message batch statistics command."""
+    await mqtt.async_subscribe(hass, "test-topic", record_calls)
+    mqtt_client = mqtt_mock()
+    for _ in range(2):
+        mqtt_client._mqtt_on_message(
+            None, None, Message("test-topic", b"test-payload", 0, False)
+        )
+    await hass.async_block_till_done()
+    assert len(calls) == 2
+
+    client = await hass_ws_client(hass)
+    await client.send_json({"id": 5, "type": "mqtt/message_batch_stats"})
+    response = await client.receive_json()
+    assert response["success"]
+    assert response["result"] == {
+        "batches": 1,
+        "messages": 2,
+        "last_batch_size": 2,
+        "max_batch_size": 2,
+        "average_batch_size": 2,
+    }
+
+
 async def test_dump_service(hass, mqtt_mock):
     """Test that we can dump a topic."""
     mopen = mock_open()
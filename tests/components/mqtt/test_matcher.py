@@ -0,0 +1,69 @@
+"""The tests for the MQTT topic matcher."""
+import pytest
+
+from homeassistant.components.mqtt.matcher import TopicMatcher
+
+
+@pytest.mark.parametrize(
+    "topic_filter,topic,matches",
+    [
+        ("test/state", "test/state", True),
+        ("test/state", "test/other", False),
+        ("test/+/on", "test/bier/on", True),
+        ("test/+/on", "test/bier/off", False),
+        ("test/+/on", "test/bier/on/more", False),
+        ("test/+", "test", False),
+        ("test/#", "test", True),
+        ("test/#", "test/bier/on", True),
+        ("test/#", "other/bier", False),
+        ("+/+/#", "hi/test/state", True),
+        ("#", "test/state", True),
+        ("+/state", "/state", True),
+        ("#", "$SYS/broker", False),
+        ("+/broker", "$SYS/broker", False),
+        ("$SYS/#", "$SYS/broker", True),
+        ("$SYS/+", "$SYS/broker", True),
+    ],
+)
+def test_match(topic_filter, topic, matches):
+    """Test matching topics against topic filters."""
+    matcher = TopicMatcher()
+    matcher.add(topic_filter, "value")
+
+    assert matcher.match(topic) == (["value"] if matches else [])
+
+
+def test_match_order():
+    """Test matches are returned in the order they were added."""
+    matcher = TopicMatcher()
+    matcher.add("test/#", 1)
+    matcher.add("test/+/on", 2)
+    matcher.add("test/bier/on", 3)
+    matcher.add("#", 4)
+    matcher.add("test/bier/on", 5)
+
+    assert matcher.match("test/bier/on") == [1, 2, 3, 4, 5]
+
+
+def test_remove():
+    """Test removing values from the matcher."""
+    matcher = TopicMatcher()
+    first = object()
+    second = object()
+    matcher.add("test/+/on", first)
+    matcher.add("test/+/on", second)
+    matcher.add("test/#", first)
+
+    matcher.remove("test/+/on", first)
+    assert matcher.match("test/bier/on") == [second, first]
+
+    matcher.remove("test/+/on", second)
+    matcher.remove("test/#", first)
+    assert matcher.match("test/bier/on") == []
+    # Empty levels are pruned from the trie
+    assert matcher._root.children == {}
+
+    with pytest.raises(KeyError):
+        matcher.remove("test/+/on", first)
+    with pytest.raises(KeyError):
+        matcher.remove("unknown/topic", first)
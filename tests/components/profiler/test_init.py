@@ -1,5 +1,6 @@
 """Test the Profiler config flow."""
 from datetime import timedelta
+import logging
 import os
 from unittest.mock import patch
 
@@ -8,6 +9,8 @@ from homeassistant.components.profiler import (
     CONF_SECONDS,
     SERVICE_DUMP_LOG_OBJECTS,
     SERVICE_LOG_EVENT_LOOP_SCHEDULED,
+    SERVICE_LOG_POLLING_STATS,
+    SERVICE_LOG_TEMPLATE_CACHE_STATS,
     SERVICE_LOG_THREAD_FRAMES,
     SERVICE_MEMORY,
     SERVICE_START,
@@ -16,9 +19,10 @@ from homeassistant.components.profiler import (
 )
 from homeassistant.components.profiler.const import DOMAIN
 from homeassistant.const import CONF_SCAN_INTERVAL, CONF_TYPE
+from homeassistant.helpers.entity_component import EntityComponent
 import homeassistant.util.dt as dt_util
 
-from tests.common import MockConfigEntry, async_fire_time_changed
+from tests.common import MockConfigEntry, MockEntity, async_fire_time_changed
 
 
 async def test_basic_usage(hass, tmpdir):
@@ -192,3 +196,53 @@ async def test_log_scheduled(hass, caplog):
 
     assert await hass.config_entries.async_unload(entry.entry_id)
     await hass.async_block_till_done()
+
+
+async def test_log_template_cache_stats(hass, caplog):
+    """Test we can log the template filter cache stats."""
+
+    entry = MockConfigEntry(domain=DOMAIN)
+    entry.add_to_hass(hass)
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert hass.services.has_service(DOMAIN, SERVICE_LOG_TEMPLATE_CACHE_STATS)
+
+    await hass.services.async_call(DOMAIN, SERVICE_LOG_TEMPLATE_CACHE_STATS, {})
+    await hass.async_block_till_done()
+
+    assert "Template regex cache" in caplog.text
+    assert "Template strptime cache" in caplog.text
+    caplog.clear()
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_log_polling_stats(hass, caplog):
+    """Test we can log the polling stats of the entity platforms."""
+
+    entry = MockConfigEntry(domain=DOMAIN)
+    entry.add_to_hass(hass)
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert hass.services.has_service(DOMAIN, SERVICE_LOG_POLLING_STATS)
+
+    component = EntityComponent(
+        logging.getLogger(__name__), "test_domain", hass, timedelta(seconds=20)
+    )
+    await component.async_add_entities([MockEntity(should_poll=True)])
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=20))
+    await hass.async_block_till_done()
+
+    await hass.services.async_call(DOMAIN, SERVICE_LOG_POLLING_STATS, {})
+    await hass.async_block_till_done()
+
+    assert "Polling test_domain.test_domain: updates=1 overruns=0" in caplog.text
+    caplog.clear()
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
@@ -5,8 +5,16 @@ from datetime import timedelta
 import json
 from unittest.mock import patch, sentinel
 
+import pytest
+
 from homeassistant.components.recorder import history
-from homeassistant.components.recorder.models import process_timestamp
+from homeassistant.components.recorder.const import DATA_INSTANCE
+from homeassistant.components.recorder.models import (
+    LatestStates,
+    latest_states_bucket,
+    process_timestamp,
+)
+from homeassistant.components.recorder.util import session_scope
 import homeassistant.core as ha
 from homeassistant.helpers.json import JSONEncoder
 import homeassistant.util.dt as dt_util
@@ -64,6 +72,57 @@ def test_get_states(hass_recorder):
     assert history.get_state(hass, time_before_recorder_ran, "demo.id") is None
 
 
+def test_get_states_with_latest_states(hass_recorder):
+    """Test getting states at a point in time from the latest states."""
+    hass = hass_recorder()
+    now = dt_util.utcnow()
+    next_hour = latest_states_bucket(now) + timedelta(hours=1)
+
+    def set_states(point, entity_states):
+        """Set the states at a point in time."""
+        with patch(
+            "homeassistant.components.recorder.dt_util.utcnow", return_value=point
+        ):
+            for entity_id, state in entity_states:
+                if state is None:
+                    hass.states.remove(entity_id)
+                else:
+                    hass.states.set(entity_id, state)
+            wait_recording_done(hass)
+
+    def get_states(point):
+        """Get the states at a point in time sorted by entity_id."""
+        return sorted(
+            (
+                (state.entity_id, state.state)
+                for state in history.get_states(hass, point)
+            ),
+        )
+
+    set_states(now, [("test.a", "1"), ("test.b", "1"), ("test.c", "1")])
+    set_states(next_hour + timedelta(minutes=1), [("test.a", "2")])
+    set_states(next_hour + timedelta(minutes=2), [("test.c", None)])
+
+    with session_scope(hass=hass) as session:
+        latest_states = session.query(LatestStates).all()
+        assert len(latest_states) == 3
+        assert {process_timestamp(row.bucket_start) for row in latest_states} == {
+            next_hour
+        }
+
+    expected_before = [("test.a", "1"), ("test.b", "1"), ("test.c", "1")]
+    expected_after = [("test.a", "2"), ("test.b", "1"), ("test.c", "")]
+    assert get_states(now + timedelta(seconds=1)) == expected_before
+    assert get_states(next_hour) == expected_before
+    assert get_states(next_hour + timedelta(minutes=3)) == expected_after
+
+    # Scanning all states of the run gives the same states
+    with session_scope(hass=hass) as session:
+        session.query(LatestStates).delete()
+    assert get_states(next_hour) == expected_before
+    assert get_states(next_hour + timedelta(minutes=3)) == expected_after
+
+
 def test_state_changes_during_period(hass_recorder):
     """Test state change during period."""
     hass = hass_recorder()
@@ -259,6 +318,143 @@ def test_get_significant_states_without_initial(hass_recorder):
     assert states == hist
 
 
+def test_iter_significant_states(hass_recorder):
+    """Test streaming the significant states yields the same states per entity."""
+    hass = hass_recorder()
+    zero, four, _ = record_states(hass)
+    one_and_half = zero + timedelta(seconds=1.5)
+
+    for minimal_response in (False, True):
+        hist = history.get_significant_states(
+            hass, one_and_half, four, minimal_response=minimal_response
+        )
+        with session_scope(hass=hass) as session:
+            streamed = [
+                entity_states
+                for _, entity_states in history._iter_significant_states(
+                    hass,
+                    session,
+                    one_and_half,
+                    four,
+                    minimal_response=minimal_response,
+                )
+            ]
+            streamed_json = json.dumps(streamed, cls=JSONEncoder)
+
+        assert sorted(
+            json.loads(streamed_json), key=lambda states: states[0]["entity_id"]
+        ) == sorted(
+            json.loads(json.dumps(list(hist.values()), cls=JSONEncoder)),
+            key=lambda states: states[0]["entity_id"],
+        )
+
+
+def test_get_significant_states_compressed_state_format(hass_recorder):
+    """Test the compressed state format holds the same states as columns."""
+    hass = hass_recorder()
+    zero, four, states = record_states(hass)
+    hist = history.get_significant_states(
+        hass, zero, four, compressed_state_format=True
+    )
+
+    assert sorted(hist) == sorted(states)
+    for entity_id, entity_states in states.items():
+        compressed = hist[entity_id]
+        timestamp = 0
+        timestamps = []
+        for delta in compressed[history.COMPRESSED_STATE_TIMES]:
+            timestamp += delta
+            timestamps.append(timestamp)
+        assert timestamps == pytest.approx(
+            [state.last_updated.timestamp() for state in entity_states]
+        )
+        assert compressed[history.COMPRESSED_STATE_STATES] == [
+            state.state for state in entity_states
+        ]
+
+        attributes = []
+        for idx, entity_state in enumerate(entity_states):
+            if idx == 0 or entity_state.attributes != entity_states[idx - 1].attributes:
+                attributes.append([idx, dict(entity_state.attributes)])
+        assert compressed[history.COMPRESSED_STATE_ATTRIBUTES] == attributes
+
+        last_changed = []
+        for idx, entity_state in enumerate(entity_states):
+            if entity_state.last_changed != entity_state.last_updated:
+                last_changed.append([idx, timestamps[idx]])
+        for expected, (idx, delta) in zip(
+            last_changed, compressed[history.COMPRESSED_STATE_LAST_CHANGED]
+        ):
+            assert expected[0] == idx
+            assert expected[1] - delta == pytest.approx(
+                entity_states[idx].last_changed.timestamp()
+            )
+        assert len(compressed[history.COMPRESSED_STATE_LAST_CHANGED]) == len(
+            last_changed
+        )
+
+    # States of the therm entity that only change attributes are left out
+    hist = history.get_significant_states(
+        hass, zero, four, minimal_response=True, compressed_state_format=True
+    )
+    assert hist["media_player.test"][history.COMPRESSED_STATE_STATES] == [
+        "idle",
+        "YouTube",
+        "Netflix",
+    ]
+    assert hist["thermostat.test"][history.COMPRESSED_STATE_STATES] == [
+        "20",
+        "21",
+        "21",
+    ]
+
+
+def test_get_significant_states_from_history_cache(hass_recorder):
+    """Test the significant states from the history cache match the database."""
+    hass = hass_recorder()
+    zero, four, states = record_states(hass)
+    instance = hass.data[DATA_INSTANCE]
+    history_cache = instance.history_cache
+    entity_ids = list(states)
+
+    def get_significant_states(start_time, **kwargs):
+        return json.loads(
+            json.dumps(
+                history.get_significant_states(
+                    hass, start_time, four, entity_ids, **kwargs
+                ),
+                cls=JSONEncoder,
+            )
+        )
+
+    two_and_half = zero + timedelta(seconds=2.5)
+    for kwargs in (
+        {},
+        {"significant_changes_only": False},
+        {"minimal_response": True},
+        {"compressed_state_format": True},
+        {"include_start_time_state": False},
+    ):
+        hits = history_cache.hits
+        cached = get_significant_states(two_and_half, **kwargs)
+        assert history_cache.hits == hits + 1
+        with patch.object(instance, "history_cache", None):
+            assert cached == get_significant_states(two_and_half, **kwargs)
+
+    # Some entities had no state yet, the database is queried for older states
+    one_and_half = zero + timedelta(seconds=1.5)
+    misses = history_cache.misses
+    hist = get_significant_states(one_and_half)
+    assert history_cache.misses == misses + 1
+    with patch.object(instance, "history_cache", None):
+        assert hist == get_significant_states(one_and_half)
+
+    # The states of all entities are read from the database
+    misses = history_cache.misses
+    history.get_significant_states(hass, two_and_half, four)
+    assert history_cache.misses == misses + 1
+
+
 def test_get_significant_states_entity_id(hass_recorder):
     """Test that only significant states are returned for one entity."""
     hass = hass_recorder()
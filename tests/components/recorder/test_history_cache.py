@@ -0,0 +1,131 @@
+"""The tests for the recorder history cache."""
+from homeassistant.components.recorder.history_cache import (
+    ROW_OVERHEAD,
+    CachedStateRow,
+    HistoryCache,
+)
+
+STARTED = 1000.0
+
+
+def _add_state(cache, entity_id, state, last_updated_ts):
+    """Add a state row like the recorder does."""
+    cache.add_state_row(
+        entity_id,
+        {
+            "state": state,
+            "last_changed_ts": last_updated_ts,
+            "last_updated_ts": last_updated_ts,
+        },
+        "{}",
+    )
+    return CachedStateRow(
+        entity_id,
+        state,
+        None,
+        "{}",
+        last_updated_ts,
+        last_updated_ts,
+    )
+
+
+def test_states_during_period():
+    """Test the states before and during a period."""
+    cache = HistoryCache(1024 * 1024, STARTED)
+    on_1 = _add_state(cache, "light.kitchen", "on", 1001.0)
+    off_1 = _add_state(cache, "light.kitchen", "off", 1002.0)
+    on_2 = _add_state(cache, "light.hallway", "on", 1003.0)
+    # Written out of time order
+    on_3 = _add_state(cache, "light.kitchen", "on", 1004.0)
+    off_2 = _add_state(cache, "light.kitchen", "off", 1003.5)
+
+    assert cache.states_during_period(
+        1001.5, None, ["light.kitchen", "light.hallway"], False
+    ) == {
+        "light.kitchen": (on_1, [off_1, off_2, on_3]),
+        "light.hallway": (None, [on_2]),
+    }
+    assert cache.states_during_period(1003.5, 1004.0, ["light.kitchen"], True) == {
+        "light.kitchen": (off_1, [])
+    }
+    assert cache.states_during_period(1002.5, None, ["light.kitchen"], True) == {
+        "light.kitchen": (off_1, [off_2, on_3])
+    }
+    # Entities without states have none since the cache started
+    assert cache.states_during_period(1001.0, None, ["light.unknown"], False) == {
+        "light.unknown": (None, [])
+    }
+    assert cache.hits == 4
+    assert cache.misses == 0
+
+    # The state before the period is not cached
+    assert cache.states_during_period(1002.5, None, ["light.hallway"], True) is None
+    # The period starts before the cache
+    assert cache.states_during_period(999.0, None, ["light.kitchen"], False) is None
+    # The states of all entities are not served from the cache
+    assert cache.states_during_period(1002.5, None, None, False) is None
+    assert cache.hits == 4
+    assert cache.misses == 3
+
+
+def test_states_before_started_are_not_cached():
+    """Test the states from before the recorder run are not cached."""
+    cache = HistoryCache(1024 * 1024, STARTED)
+    _add_state(cache, "light.kitchen", "on", 999.0)
+
+    assert cache.as_dict()["states"] == 0
+    assert cache.states_during_period(1001.0, None, ["light.kitchen"], True) is None
+
+
+def test_memory_budget():
+    """Test the oldest states are dropped when the memory budget is exceeded."""
+    row_size = ROW_OVERHEAD + len("on".encode()) + 49 + len("{}".encode()) + 49
+    cache = HistoryCache(row_size * 2, STARTED)
+    _add_state(cache, "light.kitchen", "on", 1001.0)
+    on_2 = _add_state(cache, "light.hallway", "on", 1002.0)
+    on_3 = _add_state(cache, "light.kitchen", "on", 1003.0)
+
+    assert cache.as_dict() == {
+        "hits": 0,
+        "misses": 0,
+        "states": 2,
+        "size": row_size * 2,
+        "max_size": row_size * 2,
+    }
+    # The kitchen light is only complete since its dropped state
+    assert cache.states_during_period(1000.5, None, ["light.kitchen"], False) is None
+    assert cache.states_during_period(
+        1001.0, None, ["light.kitchen", "light.hallway"], False
+    ) == {"light.kitchen": (None, [on_3]), "light.hallway": (None, [on_2])}
+
+
+def test_evict():
+    """Test evicting the purged states."""
+    cache = HistoryCache(1024 * 1024, STARTED)
+    _add_state(cache, "light.kitchen", "on", 1001.0)
+    on_2 = _add_state(cache, "light.hallway", "on", 1002.0)
+    on_3 = _add_state(cache, "light.kitchen", "on", 1003.0)
+
+    cache.evict_before(1002.0)
+    assert cache.as_dict()["states"] == 2
+    assert cache.states_during_period(1001.5, None, ["light.kitchen"], True) is None
+    assert cache.states_during_period(
+        1002.5, None, ["light.kitchen", "light.hallway"], False
+    ) == {"light.kitchen": (None, [on_3]), "light.hallway": (on_2, [])}
+    # The state of the kitchen light before the period was evicted
+    assert cache.states_during_period(1002.5, None, ["light.kitchen"], True) is None
+
+    cache.evict_entities(lambda entity_id: entity_id == "light.kitchen")
+    assert cache.as_dict()["states"] == 1
+    assert cache.as_dict()["size"] == ROW_OVERHEAD + len("on") + 49 + len("{}") + 49
+    assert cache.states_during_period(1002.5, None, ["light.kitchen"], False) is None
+    assert cache.states_during_period(1002.5, None, ["light.hallway"], True) == {
+        "light.hallway": (on_2, [])
+    }
+    # States recorded after the eviction do not complete the purged period
+    _add_state(cache, "light.kitchen", "off", 1004.0)
+    assert cache.states_during_period(1003.5, None, ["light.kitchen"], False) is None
+
+    cache.clear()
+    assert cache.as_dict()["states"] == 0
+    assert cache.states_during_period(1002.5, None, ["light.hallway"], False) is None
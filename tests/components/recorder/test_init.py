@@ -25,12 +25,22 @@ from homeassistant.components.recorder import (
     run_information_with_session,
 )
 from homeassistant.components.recorder.const import DATA_INSTANCE
-from homeassistant.components.recorder.models import Events, RecorderRuns, States
+from homeassistant.components.recorder.models import (
+    EventData,
+    Events,
+    LatestStates,
+    RecorderRuns,
+    StateAttributes,
+    States,
+    StatesMeta,
+    latest_states_bucket,
+)
 from homeassistant.components.recorder.util import session_scope
 from homeassistant.const import (
     EVENT_HOMEASSISTANT_FINAL_WRITE,
     EVENT_HOMEASSISTANT_STARTED,
     EVENT_HOMEASSISTANT_STOP,
+    EVENT_STATE_CHANGED,
     MATCH_ALL,
     STATE_LOCKED,
     STATE_UNLOCKED,
@@ -40,6 +50,7 @@ from homeassistant.setup import async_setup_component, setup_component
 from homeassistant.util import dt as dt_util
 
 from .common import (
+    async_wait_purge_done,
     async_wait_recording_done,
     async_wait_recording_done_without_instance,
     corrupt_db_file,
@@ -65,6 +76,7 @@ def _default_recorder(hass):
         uri="sqlite://",
         db_max_retries=10,
         db_retry_wait=3,
+        history_cache_size=16,
         entity_filter=CONFIG_SCHEMA({DOMAIN: {}}),
         exclude_t=[],
     )
@@ -167,6 +179,227 @@ async def test_saving_many_states(
         assert db_states[0].event_id > 0
 
 
+async def test_saving_states_in_one_commit_links_old_states(
+    hass: HomeAssistant, async_setup_recorder_instance: SetupRecorderInstanceT
+):
+    """Test states written in one commit are linked to their events and old states."""
+    instance = await async_setup_recorder_instance(hass)
+
+    hass.states.async_set("test.one", "on", {})
+    hass.states.async_set("test.two", "on", {})
+    hass.states.async_set("test.one", "off", {})
+    hass.states.async_remove("test.two")
+    hass.states.async_set("test.two", "on", {})
+    await async_wait_recording_done(hass, instance)
+
+    hass.states.async_set("test.one", "on", {})
+    await async_wait_recording_done(hass, instance)
+
+    with session_scope(hass=hass) as session:
+        db_states = list(session.query(States).order_by(States.state_id))
+        db_event_ids = {
+            event_id
+            for (event_id,) in session.query(Events.event_id).filter(
+                Events.event_type == EVENT_STATE_CHANGED
+            )
+        }
+        # The entity id is only stored in states_meta
+        assert all(
+            state.entity_id is None and state.domain is None for state in db_states
+        )
+        assert [(state.states_meta.entity_id, state.state) for state in db_states] == [
+            ("test.one", "on"),
+            ("test.two", "on"),
+            ("test.one", "off"),
+            ("test.two", None),
+            ("test.two", "on"),
+            ("test.one", "on"),
+        ]
+        assert [state.old_state_id for state in db_states] == [
+            None,
+            None,
+            db_states[0].state_id,
+            db_states[1].state_id,
+            None,
+            db_states[2].state_id,
+        ]
+        assert {state.event_id for state in db_states} == db_event_ids
+
+
+async def test_saving_states_shares_attributes(
+    hass: HomeAssistant, async_setup_recorder_instance: SetupRecorderInstanceT
+):
+    """Test states with the same attributes share one state attributes row."""
+    instance = await async_setup_recorder_instance(hass)
+
+    hass.states.async_set("test.one", "on", {"unit": "W"})
+    hass.states.async_set("test.two", "on", {"unit": "W"})
+    hass.states.async_set("test.one", "off", {"unit": "kW"})
+    await async_wait_recording_done(hass, instance)
+
+    # Attributes that are no longer cached are found in the database
+    instance._state_attributes_ids.clear()
+    hass.states.async_set("test.two", "off", {"unit": "W"})
+    await async_wait_recording_done(hass, instance)
+
+    with session_scope(hass=hass) as session:
+        db_states = list(session.query(States).order_by(States.state_id))
+        db_attributes = {
+            attributes.attributes_id: attributes.to_native()
+            for attributes in session.query(StateAttributes)
+        }
+        assert len(db_attributes) == 2
+        assert [state.attributes for state in db_states] == [None] * 4
+        assert [db_attributes[state.attributes_id] for state in db_states] == [
+            {"unit": "W"},
+            {"unit": "W"},
+            {"unit": "kW"},
+            {"unit": "W"},
+        ]
+        assert [state.to_native().attributes for state in db_states] == [
+            {"unit": "W"},
+            {"unit": "W"},
+            {"unit": "kW"},
+            {"unit": "W"},
+        ]
+
+
+async def test_saving_states_shares_states_meta(
+    hass: HomeAssistant, async_setup_recorder_instance: SetupRecorderInstanceT
+):
+    """Test the states of an entity share one states meta row."""
+    instance = await async_setup_recorder_instance(hass)
+
+    hass.states.async_set("test.one", "on")
+    hass.states.async_set("test.two", "on")
+    hass.states.async_set("test.one", "off")
+    await async_wait_recording_done(hass, instance)
+
+    # States meta that is no longer cached is found in the database
+    instance._states_meta_ids.clear()
+    hass.states.async_set("test.two", "off")
+    await async_wait_recording_done(hass, instance)
+
+    with session_scope(hass=hass) as session:
+        metadata_ids = dict(session.query(StatesMeta.entity_id, StatesMeta.metadata_id))
+        assert sorted(metadata_ids) == ["test.one", "test.two"]
+        db_states = list(session.query(States).order_by(States.state_id))
+        assert [state.metadata_id for state in db_states] == [
+            metadata_ids["test.one"],
+            metadata_ids["test.two"],
+            metadata_ids["test.one"],
+            metadata_ids["test.two"],
+        ]
+
+
+async def test_primary_keys_of_purged_states_are_not_reused(
+    hass: HomeAssistant, async_setup_recorder_instance: SetupRecorderInstanceT
+):
+    """Test the primary keys of the newest states are not reused once purged."""
+    instance = await async_setup_recorder_instance(hass)
+
+    hass.states.async_set("test.one", "on")
+    hass.states.async_set("test.one", "off")
+    await async_wait_recording_done(hass, instance)
+    with session_scope(hass=hass) as session:
+        purged_state_ids = [state.state_id for state in session.query(States)]
+
+    await hass.services.async_call(
+        DOMAIN, SERVICE_PURGE_ENTITIES, {"entity_id": "test.one"}, blocking=True
+    )
+    await async_wait_purge_done(hass, instance)
+    with session_scope(hass=hass) as session:
+        assert session.query(States).count() == 0
+
+    hass.states.async_set("test.one", "on")
+    await async_wait_recording_done(hass, instance)
+    with session_scope(hass=hass) as session:
+        state_ids = [state.state_id for state in session.query(States)]
+    assert state_ids == [max(purged_state_ids) + 1]
+
+
+async def test_primary_keys_continue_after_conflict(
+    hass: HomeAssistant, async_setup_recorder_instance: SetupRecorderInstanceT, caplog
+):
+    """Test the primary keys continue after rows written by another writer."""
+    instance = await async_setup_recorder_instance(hass)
+
+    hass.bus.async_fire("test_event")
+    await async_wait_recording_done(hass, instance)
+    with session_scope(hass=hass) as session:
+        session.add(
+            Events(
+                event_type="other_writer",
+                origin="LOCAL",
+                time_fired=dt_util.utcnow(),
+            )
+        )
+
+    hass.bus.async_fire("test_event")
+    await async_wait_recording_done(hass, instance)
+
+    assert "Primary key conflict" in caplog.text
+    with session_scope(hass=hass) as session:
+        event_types = [
+            event.event_type
+            for event in session.query(Events).order_by(Events.event_id)
+        ]
+    assert event_types.count("test_event") == 2
+    assert event_types[-1] == "test_event"
+
+
+async def test_saving_events_shares_event_data(
+    hass: HomeAssistant, async_setup_recorder_instance: SetupRecorderInstanceT
+):
+    """Test events with the same data share one event data row."""
+    instance = await async_setup_recorder_instance(hass)
+
+    hass.bus.async_fire("test_event", {"button": 1})
+    hass.bus.async_fire("test_event", {"button": 1})
+    hass.bus.async_fire("test_event", {"button": 2})
+    await async_wait_recording_done(hass, instance)
+
+    # Event data that is no longer cached is found in the database
+    instance._event_data_ids.clear()
+    hass.bus.async_fire("test_event", {"button": 1})
+    hass.states.async_set("test.one", "on", {})
+    await async_wait_recording_done(hass, instance)
+
+    with session_scope(hass=hass) as session:
+        db_events = list(
+            session.query(Events)
+            .filter(Events.event_type == "test_event")
+            .order_by(Events.event_id)
+        )
+        db_event_data = {
+            event_data.data_id: event_data.to_native()
+            for event_data in session.query(EventData).filter(
+                EventData.data_id.in_([event.data_id for event in db_events])
+            )
+        }
+        assert len(db_event_data) == 2
+        assert [event.event_data for event in db_events] == [None] * 4
+        assert [event.to_native().data for event in db_events] == [
+            {"button": 1},
+            {"button": 1},
+            {"button": 2},
+            {"button": 1},
+        ]
+        assert [db_event_data[event.data_id] for event in db_events] == [
+            {"button": 1},
+            {"button": 1},
+            {"button": 2},
+            {"button": 1},
+        ]
+
+        # State changed events keep their empty data inline
+        state_changed = (
+            session.query(Events).filter(Events.event_type == EVENT_STATE_CHANGED).one()
+        )
+        assert state_changed.event_data == "{}"
+        assert state_changed.data_id is None
+
+
 async def test_saving_state_with_intermixed_time_changes(
     hass: HomeAssistant, async_setup_recorder_instance: SetupRecorderInstanceT
 ):
@@ -201,17 +434,12 @@ def test_saving_state_with_exception(hass, hass_recorder, caplog):
     state = "restoring_from_db"
     attributes = {"test_attr": 5, "test_attr_10": "nice"}
 
-    def _throw_if_state_in_session(*args, **kwargs):
-        for obj in hass.data[DATA_INSTANCE].event_session:
-            if isinstance(obj, States):
-                raise OperationalError(
-                    "insert the state", "fake params", "forced to fail"
-                )
-
     with patch("time.sleep"), patch.object(
         hass.data[DATA_INSTANCE].event_session,
-        "flush",
-        side_effect=_throw_if_state_in_session,
+        "execute",
+        side_effect=OperationalError(
+            "insert the state", "fake params", "forced to fail"
+        ),
     ):
         hass.states.set(entity_id, "fail", attributes)
         wait_recording_done(hass)
@@ -239,17 +467,12 @@ def test_saving_state_with_sqlalchemy_exception(hass, hass_recorder, caplog):
     state = "restoring_from_db"
     attributes = {"test_attr": 5, "test_attr_10": "nice"}
 
-    def _throw_if_state_in_session(*args, **kwargs):
-        for obj in hass.data[DATA_INSTANCE].event_session:
-            if isinstance(obj, States):
-                raise SQLAlchemyError(
-                    "insert the state", "fake params", "forced to fail"
-                )
-
     with patch("time.sleep"), patch.object(
         hass.data[DATA_INSTANCE].event_session,
-        "flush",
-        side_effect=_throw_if_state_in_session,
+        "execute",
+        side_effect=SQLAlchemyError(
+            "insert the state", "fake params", "forced to fail"
+        ),
     ):
         hass.states.set(entity_id, "fail", attributes)
         wait_recording_done(hass)
@@ -269,6 +492,52 @@ def test_saving_state_with_sqlalchemy_exception(hass, hass_recorder, caplog):
     assert "SQLAlchemyError error processing event" not in caplog.text
 
 
+def test_latest_states_resume_after_sqlalchemy_exception(hass_recorder, caplog):
+    """Test the latest states are written again after the session is reopened."""
+    hass = hass_recorder()
+    instance = hass.data[DATA_INSTANCE]
+    next_hour = latest_states_bucket(dt_util.utcnow()) + timedelta(hours=1)
+
+    hass.states.set("test.one", "on")
+    hass.states.set("test.two", "on")
+    hass.states.remove("test.two")
+    wait_recording_done(hass)
+
+    with patch("time.sleep"), patch.object(
+        instance.event_session,
+        "execute",
+        side_effect=SQLAlchemyError(
+            "insert the state", "fake params", "forced to fail"
+        ),
+    ):
+        hass.states.set("test.three", "fail")
+        wait_recording_done(hass)
+
+    assert "SQLAlchemyError error processing event" in caplog.text
+    assert instance._latest_states_bucket is None
+    with session_scope(hass=hass) as session:
+        state_id = (
+            session.query(States.state_id)
+            .join(StatesMeta, States.metadata_id == StatesMeta.metadata_id)
+            .filter(StatesMeta.entity_id == "test.one")
+            .scalar()
+        )
+
+    with patch(
+        "homeassistant.components.recorder.dt_util.utcnow",
+        return_value=next_hour + timedelta(minutes=1),
+    ):
+        hass.states.set("test.four", "on")
+        wait_recording_done(hass)
+
+    with session_scope(hass=hass) as session:
+        latest_states = [
+            (row.bucket_start, row.entity_id, row.state_id)
+            for row in session.query(LatestStates)
+        ]
+    assert latest_states == [(next_hour.replace(tzinfo=None), "test.one", state_id)]
+
+
 async def test_force_shutdown_with_queue_of_writes_that_generate_exceptions(
     hass, async_setup_recorder_instance, caplog
 ):
@@ -282,7 +551,7 @@ async def test_force_shutdown_with_queue_of_writes_that_generate_exceptions(
 
     with patch.object(instance, "db_retry_wait", 0.2), patch.object(
         instance.event_session,
-        "flush",
+        "execute",
         side_effect=OperationalError(
             "insert the state", "fake params", "forced to fail"
         ),
@@ -531,11 +800,11 @@ def test_saving_state_and_removing_entity(hass, hass_recorder):
     with session_scope(hass=hass) as session:
         states = list(session.query(States))
         assert len(states) == 3
-        assert states[0].entity_id == entity_id
+        assert states[0].states_meta.entity_id == entity_id
         assert states[0].state == STATE_LOCKED
-        assert states[1].entity_id == entity_id
+        assert states[1].states_meta.entity_id == entity_id
         assert states[1].state == STATE_UNLOCKED
-        assert states[2].entity_id == entity_id
+        assert states[2].states_meta.entity_id == entity_id
         assert states[2].state is None
 
 
@@ -750,10 +1019,10 @@ def test_saving_sets_old_state(hass_recorder):
         states = list(session.query(States))
         assert len(states) == 4
 
-        assert states[0].entity_id == "test.one"
-        assert states[1].entity_id == "test.two"
-        assert states[2].entity_id == "test.one"
-        assert states[3].entity_id == "test.two"
+        assert states[0].states_meta.entity_id == "test.one"
+        assert states[1].states_meta.entity_id == "test.two"
+        assert states[2].states_meta.entity_id == "test.one"
+        assert states[3].states_meta.entity_id == "test.two"
 
         assert states[0].old_state_id is None
         assert states[1].old_state_id is None
@@ -777,8 +1046,8 @@ def test_saving_state_with_serializable_data(hass_recorder, caplog):
         states = list(session.query(States))
         assert len(states) == 2
 
-        assert states[0].entity_id == "test.two"
-        assert states[1].entity_id == "test.two"
+        assert states[0].states_meta.entity_id == "test.two"
+        assert states[1].states_meta.entity_id == "test.two"
         assert states[0].old_state_id is None
         assert states[1].old_state_id == states[0].state_id
 
@@ -5,7 +5,7 @@ import sqlite3
 from unittest.mock import ANY, Mock, PropertyMock, call, patch
 
 import pytest
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event as sqlalchemy_event, text
 from sqlalchemy.exc import (
     DatabaseError,
     InternalError,
@@ -19,7 +19,7 @@ from homeassistant.bootstrap import async_setup_component
 from homeassistant.components import recorder
 from homeassistant.components.recorder import RecorderRuns, migration, models
 from homeassistant.components.recorder.const import DATA_INSTANCE
-from homeassistant.components.recorder.models import States
+from homeassistant.components.recorder.models import States, StatesMeta
 from homeassistant.components.recorder.util import session_scope
 import homeassistant.util.dt as dt_util
 
@@ -33,7 +33,9 @@ def _get_native_states(hass, entity_id):
     with session_scope(hass=hass) as session:
         return [
             state.to_native()
-            for state in session.query(States).filter(States.entity_id == entity_id)
+            for state in session.query(States)
+            .join(StatesMeta, States.metadata_id == StatesMeta.metadata_id)
+            .filter(StatesMeta.entity_id == entity_id)
         ]
 
 
@@ -284,6 +286,90 @@ def test_modify_column(engine_type, substr):
         assert not connection.execute.called
 
 
+def test_migrate_columns_to_timestamp():
+    """Test filling in the timestamp columns from the datetime columns."""
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    models.Base.metadata.create_all(engine)
+    last_changed = datetime.datetime(2021, 7, 1, 12, 30, 15, 123456, dt_util.UTC)
+    with Session(engine) as session:
+        for idx in range(5):
+            last_updated = last_changed + datetime.timedelta(seconds=idx)
+            session.execute(
+                text(
+                    "INSERT INTO states (entity_id, last_changed, last_updated) "
+                    "VALUES ('sensor.test', :last_changed, :last_updated)"
+                ),
+                # Stored the way SQLite stores naive UTC datetimes
+                {
+                    "last_changed": last_changed.replace(tzinfo=None).isoformat(" "),
+                    "last_updated": last_updated.replace(tzinfo=None).isoformat(" "),
+                },
+            )
+
+        # A state without times is skipped
+        session.execute(text("INSERT INTO states (entity_id) VALUES ('sensor.test')"))
+
+        id_ranges = []
+
+        @sqlalchemy_event.listens_for(engine, "before_cursor_execute")
+        def _before_cursor_execute(conn, cursor, statement, parameters, *args):
+            if statement.startswith("UPDATE states"):
+                id_ranges.append(tuple(parameters[-2:]))
+
+        with patch.object(migration, "TIMESTAMP_MIGRATION_BATCH_SIZE", 2):
+            migration._migrate_columns_to_timestamp(
+                session.connection(),
+                States.state_id,
+                {
+                    States.last_updated: States.last_updated_ts,
+                    States.last_changed: States.last_changed_ts,
+                },
+            )
+
+        # The database converts the states one range of ids at a time
+        assert id_ranges == [(1, 2), (3, 4), (5, 6)]
+        rows = session.query(States.last_changed_ts, States.last_updated_ts).order_by(
+            States.state_id
+        )
+        assert [tuple(row) for row in rows] == [
+            *(
+                (last_changed.timestamp(), last_changed.timestamp() + idx)
+                for idx in range(5)
+            ),
+            (None, None),
+        ]
+
+
+def test_migrate_entity_ids_to_states_meta():
+    """Test linking the states to the states meta rows of their entity ids."""
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    models.Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(models.StatesMeta(entity_id="sensor.known"))
+        for entity_id in ("sensor.known", "sensor.new", "sensor.new", None):
+            session.execute(
+                text("INSERT INTO states (entity_id) VALUES (:entity_id)"),
+                {"entity_id": entity_id},
+            )
+        session.flush()
+
+        migration._migrate_entity_ids_to_states_meta(session.connection())
+
+        metadata_ids = dict(
+            session.query(models.StatesMeta.entity_id, models.StatesMeta.metadata_id)
+        )
+        assert list(metadata_ids) == ["sensor.known", "sensor.new"]
+        rows = session.query(States.entity_id, States.metadata_id).order_by(
+            States.state_id
+        )
+        assert [tuple(row) for row in rows] == [
+            ("sensor.known", metadata_ids["sensor.known"]),
+            ("sensor.new", metadata_ids["sensor.new"]),
+            ("sensor.new", metadata_ids["sensor.new"]),
+            (None, None),
+        ]
+
+
 def test_forgiving_add_column():
     """Test that add column will continue if column exists."""
     engine = create_engine("sqlite://", poolclass=StaticPool)
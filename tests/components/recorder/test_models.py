@@ -1,15 +1,19 @@
 """The tests for the Recorder component."""
 from datetime import datetime
+import json
 
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import scoped_session, sessionmaker
 
+from homeassistant.components.recorder.history_cache import CachedStateRow
 from homeassistant.components.recorder.models import (
     Base,
     Events,
+    LazyState,
     RecorderRuns,
     States,
+    StatesMeta,
     process_timestamp,
     process_timestamp_to_utc_isoformat,
 )
@@ -52,11 +56,39 @@ def test_from_event_to_delete_state():
     )
     db_state = States.from_event(event)
 
-    assert db_state.entity_id == "sensor.temperature"
-    assert db_state.domain == "sensor"
+    # The entity id is only stored in states_meta
+    assert db_state.entity_id is None
+    assert db_state.domain is None
+    assert db_state.states_meta.entity_id == "sensor.temperature"
     assert db_state.state == ""
-    assert db_state.last_changed == event.time_fired
-    assert db_state.last_updated == event.time_fired
+    # The datetime columns are no longer written
+    assert db_state.last_changed is None
+    assert db_state.last_updated is None
+    assert db_state.last_changed_ts == event.time_fired.timestamp()
+    assert db_state.last_updated_ts == event.time_fired.timestamp()
+
+
+def test_row_from_event_timestamps():
+    """Test the epoch timestamps of the rows of an event and state."""
+    last_changed = datetime(2021, 7, 1, 12, 30, 15, 123456, dt.UTC)
+    state = ha.State(
+        "sensor.temperature",
+        "18",
+        last_changed=last_changed,
+        last_updated=last_changed.replace(second=20),
+    )
+    event = ha.Event(
+        EVENT_STATE_CHANGED,
+        {"entity_id": "sensor.temperature", "old_state": None, "new_state": state},
+    )
+
+    assert Events.row_from_event(event)["time_fired_ts"] == (
+        event.time_fired.timestamp()
+    )
+    state_row = States.row_from_event(event)
+    assert state_row["last_changed_ts"] == last_changed.timestamp()
+    assert state_row["last_updated_ts"] == last_changed.timestamp() + 5
+    assert dt.utc_from_timestamp(state_row["last_changed_ts"]) == last_changed
 
 
 def test_entity_ids():
@@ -91,7 +123,7 @@ def test_entity_ids():
 
     session.add(
         States(
-            entity_id="sensor.temperature",
+            states_meta=StatesMeta(entity_id="sensor.temperature"),
             state="20",
             last_changed=before_run,
             last_updated=before_run,
@@ -99,7 +131,7 @@ def test_entity_ids():
     )
     session.add(
         States(
-            entity_id="sensor.sound",
+            states_meta=StatesMeta(entity_id="sensor.sound"),
             state="10",
             last_changed=after_run,
             last_updated=after_run,
@@ -108,7 +140,7 @@ def test_entity_ids():
 
     session.add(
         States(
-            entity_id="sensor.humidity",
+            states_meta=StatesMeta(entity_id="sensor.humidity"),
             state="76",
             last_changed=in_run,
             last_updated=in_run,
@@ -116,7 +148,7 @@ def test_entity_ids():
     )
     session.add(
         States(
-            entity_id="sensor.lux",
+            states_meta=StatesMeta(entity_id="sensor.lux"),
             state="5",
             last_changed=in_run3,
             last_updated=in_run3,
@@ -132,6 +164,7 @@ def test_states_from_native_invalid_entity_id():
     state = States()
     state.entity_id = "test.invalid__id"
     state.attributes = "{}"
+    state.last_changed_ts = state.last_updated_ts = 1000.0
     with pytest.raises(InvalidEntityFormatError):
         state = state.to_native()
 
@@ -215,3 +248,18 @@ async def test_event_to_db_model():
     native = Events.from_event(event, event_data="{}").to_native()
     event.data = {}
     assert native == event
+
+
+def test_lazy_state_as_dict_json():
+    """Test a LazyState as JSON."""
+    row = CachedStateRow(
+        "light.kitchen", "on", None, '{"brightness": 10}', 1000.0, 1001.0
+    )
+    state = LazyState(row)
+    assert json.loads(state.as_dict_json()) == state.as_dict()
+    assert state.as_dict_json() is state.as_dict_json()
+
+    start_time = dt_util.utc_from_timestamp(1005.0)
+    state.last_changed = start_time
+    state.last_updated = start_time
+    assert json.loads(state.as_dict_json())["last_changed"] == start_time.isoformat()
@@ -10,7 +10,15 @@ from sqlalchemy.orm.session import Session
 from homeassistant.components import recorder
 from homeassistant.components.recorder import PurgeTask
 from homeassistant.components.recorder.const import MAX_ROWS_TO_PURGE
-from homeassistant.components.recorder.models import Events, RecorderRuns, States
+from homeassistant.components.recorder.models import (
+    EventData,
+    Events,
+    LatestStates,
+    RecorderRuns,
+    StateAttributes,
+    States,
+    StatesMeta,
+)
 from homeassistant.components.recorder.purge import purge_old_data
 from homeassistant.components.recorder.util import session_scope
 from homeassistant.const import EVENT_STATE_CHANGED
@@ -61,6 +69,190 @@ async def test_purge_old_states(
         assert states.count() == 2
 
 
+async def test_purge_old_state_attributes(
+    hass: HomeAssistant, async_setup_recorder_instance: SetupRecorderInstanceT
+):
+    """Test deleting state attributes no longer used by any state."""
+    instance = await async_setup_recorder_instance(hass)
+    await async_wait_recording_done(hass, instance)
+
+    utcnow = dt_util.utcnow()
+    five_days_ago = utcnow - timedelta(days=5)
+    purged_attrs = json.dumps({"test_attr": 5})
+    kept_attrs = json.dumps({"test_attr": 10})
+
+    with recorder.session_scope(hass=hass) as session:
+        purged_attributes = StateAttributes(
+            **StateAttributes.row_from_shared_attrs(purged_attrs)
+        )
+        kept_attributes = StateAttributes(
+            **StateAttributes.row_from_shared_attrs(kept_attrs)
+        )
+        session.add_all([purged_attributes, kept_attributes])
+        session.flush()
+        for timestamp, attributes in (
+            (five_days_ago, purged_attributes),
+            (five_days_ago, kept_attributes),
+            (utcnow, kept_attributes),
+        ):
+            event = Events(
+                event_type="state_changed",
+                event_data="{}",
+                origin="LOCAL",
+                created=timestamp,
+                time_fired=timestamp,
+            )
+            session.add(event)
+            session.flush()
+            session.add(
+                States(
+                    entity_id="test.recorder",
+                    domain="test",
+                    state="on",
+                    last_changed=timestamp,
+                    last_updated=timestamp,
+                    created=timestamp,
+                    event_id=event.event_id,
+                    attributes_id=attributes.attributes_id,
+                )
+            )
+        purged_attributes_id = purged_attributes.attributes_id
+        kept_attributes_id = kept_attributes.attributes_id
+
+    instance._state_attributes_ids[purged_attrs] = purged_attributes_id
+    instance._state_attributes_ids[kept_attrs] = kept_attributes_id
+
+    with session_scope(hass=hass) as session:
+        purge_before = utcnow - timedelta(days=4)
+        finished = purge_old_data(instance, purge_before, repack=False)
+        assert not finished
+
+        assert session.query(States).count() == 1
+        assert [
+            attributes_id
+            for (attributes_id,) in session.query(StateAttributes.attributes_id)
+        ] == [kept_attributes_id]
+
+    assert purged_attrs not in instance._state_attributes_ids
+    assert instance._state_attributes_ids.get(kept_attrs) == kept_attributes_id
+
+
+async def test_purge_old_event_data(
+    hass: HomeAssistant, async_setup_recorder_instance: SetupRecorderInstanceT
+):
+    """Test deleting event data no longer used by any event."""
+    instance = await async_setup_recorder_instance(hass)
+    await async_wait_recording_done(hass, instance)
+
+    utcnow = dt_util.utcnow()
+    five_days_ago = utcnow - timedelta(days=5)
+    purged_data = json.dumps({"button": 1})
+    kept_data = json.dumps({"button": 2})
+
+    with recorder.session_scope(hass=hass) as session:
+        purged_event_data = EventData(**EventData.row_from_shared_data(purged_data))
+        kept_event_data = EventData(**EventData.row_from_shared_data(kept_data))
+        session.add_all([purged_event_data, kept_event_data])
+        session.flush()
+        for timestamp, event_data in (
+            (five_days_ago, purged_event_data),
+            (five_days_ago, kept_event_data),
+            (utcnow, kept_event_data),
+        ):
+            session.add(
+                Events(
+                    event_type="test_event",
+                    origin="LOCAL",
+                    created=timestamp,
+                    time_fired=timestamp,
+                    data_id=event_data.data_id,
+                )
+            )
+        purged_data_id = purged_event_data.data_id
+        kept_data_id = kept_event_data.data_id
+
+    instance._event_data_ids[purged_data] = purged_data_id
+    instance._event_data_ids[kept_data] = kept_data_id
+
+    with session_scope(hass=hass) as session:
+        purge_before = utcnow - timedelta(days=4)
+        finished = purge_old_data(instance, purge_before, repack=False)
+        assert not finished
+
+        assert (
+            session.query(Events).filter(Events.event_type == "test_event").count() == 1
+        )
+        remaining_data_ids = {
+            data_id for (data_id,) in session.query(EventData.data_id)
+        }
+        assert purged_data_id not in remaining_data_ids
+        assert kept_data_id in remaining_data_ids
+
+    assert purged_data not in instance._event_data_ids
+    assert instance._event_data_ids.get(kept_data) == kept_data_id
+
+
+async def test_purge_old_data_in_time_slices(
+    hass: HomeAssistant, async_setup_recorder_instance: SetupRecorderInstanceT
+):
+    """Test purging the ranges of old states and events one slice at a time."""
+    instance = await async_setup_recorder_instance(hass)
+    await async_wait_recording_done(hass, instance)
+
+    utcnow = dt_util.utcnow()
+    five_days_ago = utcnow - timedelta(days=5)
+    with recorder.session_scope(hass=hass) as session:
+        # The second state and event were written out of time order
+        for event_id, timestamp in enumerate(
+            (five_days_ago, utcnow, five_days_ago, five_days_ago, five_days_ago),
+            1000,
+        ):
+            _add_state_and_state_changed_event(
+                session, "sensor.test", "on", timestamp, event_id
+            )
+        session.flush()
+        state_ids = []
+        for state in session.query(States).order_by(States.state_id):
+            state.old_state_id = state_ids[-1] if state_ids else None
+            state_ids.append(state.state_id)
+
+    instance._old_state_ids["sensor.test"] = state_ids[-1]
+    purge_before = utcnow - timedelta(days=4)
+    progress = []
+
+    # Every slice purges one range of at most 2 rows
+    with patch("homeassistant.components.recorder.purge.MAX_ROWS_TO_PURGE", 2), patch(
+        "homeassistant.components.recorder.purge.PURGE_TIME_SLICE", 0
+    ):
+        while not purge_old_data(instance, purge_before, repack=False):
+            progress.append(
+                (
+                    instance.purge_progress.states_purged,
+                    instance.purge_progress.states_remaining,
+                    instance.purge_progress.events_purged,
+                    instance.purge_progress.events_remaining,
+                )
+            )
+
+    assert progress == [
+        (1, 3, 0, None),
+        (3, 1, 0, None),
+        (4, 0, 0, None),
+        (4, 0, 1, 3),
+        (4, 0, 3, 1),
+        (4, 0, 4, 0),
+    ]
+    assert "sensor.test" not in instance._old_state_ids
+
+    with session_scope(hass=hass) as session:
+        states = session.query(States).filter(States.entity_id == "sensor.test")
+        assert [(state.state_id, state.old_state_id) for state in states] == [
+            (state_ids[1], None)
+        ]
+        events = session.query(Events).filter(Events.event_id >= 1000)
+        assert [event.event_id for event in events] == [1001]
+
+
 async def test_purge_old_states_encouters_database_corruption(
     hass: HomeAssistant, async_setup_recorder_instance: SetupRecorderInstanceT
 ):
@@ -203,6 +395,32 @@ async def test_purge_old_recorder_runs(
         assert recorder_runs.count() == 1
 
 
+async def test_purge_old_latest_states(
+    hass: HomeAssistant, async_setup_recorder_instance: SetupRecorderInstanceT
+):
+    """Test deleting the latest states of old buckets."""
+    instance = await async_setup_recorder_instance(hass)
+    await async_wait_recording_done(hass, instance)
+
+    utcnow = dt_util.utcnow()
+    with recorder.session_scope(hass=hass) as session:
+        for bucket_start in (utcnow - timedelta(days=11), utcnow):
+            session.add(
+                LatestStates(
+                    bucket_start=bucket_start, entity_id="sensor.test", state_id=1
+                )
+            )
+
+    with session_scope(hass=hass) as session:
+        latest_states = session.query(LatestStates)
+        assert latest_states.count() == 2
+
+        purge_before = utcnow - timedelta(days=4)
+        finished = purge_old_data(instance, purge_before, repack=False)
+        assert finished
+        assert latest_states.count() == 1
+
+
 async def test_purge_method(
     hass: HomeAssistant,
     async_setup_recorder_instance: SetupRecorderInstanceT,
@@ -417,6 +635,9 @@ async def test_purge_cutoff_date(
         assert events.filter(Events.event_type == "PURGE").count() == 0
         assert events.filter(Events.event_type == "KEEP").count() == 1
 
+    # The progress is only reported while purging
+    assert instance.purge_progress is None
+
 
 async def test_purge_filtered_states(
     hass: HomeAssistant,
@@ -445,6 +666,7 @@ async def test_purge_filtered_states(
             session.add(
                 States(
                     entity_id="sensor.excluded",
+                    metadata_id=_get_or_add_states_meta_id(session, "sensor.excluded"),
                     domain="sensor",
                     state="purgeme",
                     attributes="{}",
@@ -557,6 +779,10 @@ async def test_purge_filtered_states(
             States.entity_id == "sensor.excluded"
         )
         assert states_sensor_excluded.count() == 0
+        states_meta_excluded = session.query(StatesMeta).filter(
+            StatesMeta.entity_id == "sensor.excluded"
+        )
+        assert states_meta_excluded.count() == 0
 
         assert session.query(States).get(72).old_state_id is None
         assert session.query(States).get(73).old_state_id is None
@@ -911,6 +1137,7 @@ async def _add_test_states(hass: HomeAssistant, instance: recorder.Recorder):
             session.add(state)
             session.flush()
             old_state_id = state.state_id
+        instance.seed_primary_keys(session)
 
 
 async def _add_test_events(hass: HomeAssistant, instance: recorder.Recorder):
@@ -944,6 +1171,8 @@ async def _add_test_events(hass: HomeAssistant, instance: recorder.Recorder):
                     time_fired=timestamp,
                 )
             )
+        session.flush()
+        instance.seed_primary_keys(session)
 
 
 async def _add_test_recorder_runs(hass: HomeAssistant, instance: recorder.Recorder):
@@ -973,6 +1202,18 @@ async def _add_test_recorder_runs(hass: HomeAssistant, instance: recorder.Record
             )
 
 
+def _get_or_add_states_meta_id(session: Session, entity_id: str) -> int:
+    """Return the states meta id of an entity id, adding it if needed."""
+    states_meta = (
+        session.query(StatesMeta).filter(StatesMeta.entity_id == entity_id).first()
+    )
+    if states_meta is None:
+        states_meta = StatesMeta(entity_id=entity_id)
+        session.add(states_meta)
+        session.flush()
+    return states_meta.metadata_id
+
+
 def _add_state_and_state_changed_event(
     session: Session,
     entity_id: str,
@@ -984,6 +1225,7 @@ def _add_state_and_state_changed_event(
     session.add(
         States(
             entity_id=entity_id,
+            metadata_id=_get_or_add_states_meta_id(session, entity_id),
             domain="sensor",
             state=state,
             attributes="{}",
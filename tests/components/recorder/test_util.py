@@ -256,3 +256,22 @@ def test_perodic_db_cleanups(hass_recorder):
     with patch.object(hass.data[DATA_INSTANCE].engine, "execute") as execute_mock:
         util.perodic_db_cleanups(hass.data[DATA_INSTANCE])
     assert execute_mock.call_args[0][0] == "PRAGMA wal_checkpoint(TRUNCATE);"
+
+
+def test_lru():
+    """Test the LRU evicts the least recently used key."""
+    lru = util.LRU(2)
+    lru["a"] = 1
+    lru["b"] = 2
+    assert lru.get("a") == 1
+    lru["c"] = 3
+    assert len(lru) == 2
+    assert "b" not in lru
+    assert lru.get("b") is None
+    assert lru.get("a") == 1
+    assert lru.get("c") == 3
+
+    lru.evict_values([3])
+    assert len(lru) == 1
+    assert lru.pop("a") == 1
+    assert "a" not in lru
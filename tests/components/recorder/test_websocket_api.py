@@ -0,0 +1,88 @@
+"""The tests for the recorder websocket API."""
+from datetime import datetime
+from unittest.mock import patch
+
+from homeassistant.components.recorder.purge import PurgeProgress
+from homeassistant.util import dt as dt_util
+
+from .common import async_wait_recording_done
+from .conftest import SetupRecorderInstanceT
+
+
+async def test_purge_progress(
+    hass, hass_ws_client, async_setup_recorder_instance: SetupRecorderInstanceT
+):
+    """Test the progress of the running purge."""
+    instance = await async_setup_recorder_instance(hass)
+    client = await hass_ws_client()
+
+    await client.send_json({"id": 1, "type": "recorder/purge_progress"})
+    response = await client.receive_json()
+    assert response["success"]
+    assert response["result"] is None
+
+    purge_before = datetime(2021, 7, 1, tzinfo=dt_util.UTC)
+    started = datetime(2021, 7, 11, 4, 12, tzinfo=dt_util.UTC)
+    instance.purge_progress = PurgeProgress(
+        purge_before,
+        started,
+        states_purged=2000,
+        states_remaining=500,
+    )
+
+    await client.send_json({"id": 2, "type": "recorder/purge_progress"})
+    response = await client.receive_json()
+    assert response["success"]
+    assert response["result"] == {
+        "purge_before": "2021-07-01T00:00:00+00:00",
+        "started": "2021-07-11T04:12:00+00:00",
+        "states_purged": 2000,
+        "events_purged": 0,
+        "states_remaining": 500,
+        "events_remaining": None,
+    }
+
+
+async def test_purge_progress_requires_admin(
+    hass,
+    hass_ws_client,
+    hass_admin_user,
+    async_setup_recorder_instance: SetupRecorderInstanceT,
+):
+    """Test the progress of the running purge is only available to admins."""
+    await async_setup_recorder_instance(hass)
+    hass_admin_user.groups = []
+    client = await hass_ws_client()
+
+    await client.send_json({"id": 1, "type": "recorder/purge_progress"})
+    response = await client.receive_json()
+    assert not response["success"]
+    assert response["error"]["code"] == "unauthorized"
+
+
+async def test_history_cache(
+    hass, hass_ws_client, async_setup_recorder_instance: SetupRecorderInstanceT
+):
+    """Test the statistics of the history cache."""
+    instance = await async_setup_recorder_instance(hass, {"history_cache_size": 1})
+    client = await hass_ws_client()
+
+    hass.states.async_set("light.kitchen", "on")
+    await async_wait_recording_done(hass, instance)
+
+    await client.send_json({"id": 1, "type": "recorder/history_cache"})
+    response = await client.receive_json()
+    assert response["success"]
+    assert response["result"] == {
+        "hits": 0,
+        "misses": 0,
+        "states": 1,
+        "size": instance.history_cache.as_dict()["size"],
+        "max_size": 1024 * 1024,
+    }
+
+    with patch.object(instance, "history_cache", None):
+        await client.send_json({"id": 2, "type": "recorder/history_cache"})
+        response = await client.receive_json()
+    assert response["success"]
+    assert response["result"] is None
@@ -72,6 +72,38 @@ async def test_if_fires_on_change_bool(hass, calls):
     assert calls[0].data["id"] == 0
 
 
+async def test_trigger_render_stats(hass, calls):
+    """Test the render statistics of the template are passed to the trigger."""
+    assert await async_setup_component(
+        hass,
+        automation.DOMAIN,
+        {
+            automation.DOMAIN: {
+                "trigger": {
+                    "platform": "template",
+                    "value_template": '{{ states.test.entity.state == "world" }}',
+                },
+                "action": {
+                    "service": "test.automation",
+                    "data_template": {
+                        "stats": "{{ trigger.render_stats.hits }} "
+                        "{{ trigger.render_stats.misses }} "
+                        "{{ trigger.render_stats.hit_rate }}"
+                    },
+                },
+            }
+        },
+    )
+
+    hass.states.async_set("test.entity", "hello", {"unit": "x"})
+    await hass.async_block_till_done()
+    hass.states.async_set("test.entity", "world")
+    await hass.async_block_till_done()
+
+    assert len(calls) == 1
+    assert calls[0].data["stats"] == "1 1 0.5"
+
+
 async def test_if_fires_on_change_str(hass, calls):
     """Test for firing on change."""
     assert await async_setup_component(
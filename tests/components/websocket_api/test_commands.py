@@ -393,6 +393,166 @@ async def test_subscribe_unsubscribe_events(hass, websocket_client):
     assert sum(hass.bus.async_listeners().values()) == init_count
 
 
+async def test_subscribe_entities(hass, websocket_client, hass_admin_user):
+    """Test subscribe entities command with state diffs."""
+    hass_admin_user.mock_policy(
+        {"entities": {"entity_ids": {"light.permitted": True, "light.other": True}}}
+    )
+    hass.states.async_set("light.permitted", "off", {"color": "red"})
+    hass.states.async_set("light.not_permitted", "off")
+    hass.states.async_set("light.other", "off")
+    permitted_state = hass.states.get("light.permitted")
+
+    await websocket_client.send_json(
+        {"id": 7, "type": "subscribe_entities", "entity_ids": ["light.permitted"]}
+    )
+
+    msg = await websocket_client.receive_json()
+    assert msg["id"] == 7
+    assert msg["type"] == const.TYPE_RESULT
+    assert msg["success"]
+
+    msg = await websocket_client.receive_json()
+    assert msg["id"] == 7
+    assert msg["type"] == "event"
+    assert msg["event"] == {
+        "a": {
+            "light.permitted": {
+                "a": {"color": "red"},
+                "c": permitted_state.context.id,
+                "lc": permitted_state.last_changed.timestamp(),
+                "s": "off",
+            }
+        }
+    }
+
+    hass.states.async_set("light.other", "on")
+    hass.states.async_set("light.not_permitted", "on")
+    hass.states.async_set("light.permitted", "on", {"brightness": 255})
+    await hass.async_block_till_done()
+    new_state = hass.states.get("light.permitted")
+
+    msg = await websocket_client.receive_json()
+    assert msg["id"] == 7
+    assert msg["type"] == "event"
+    assert msg["event"] == {
+        "c": {
+            "light.permitted": {
+                "+": {
+                    "a": {"brightness": 255},
+                    "c": new_state.context.id,
+                    "lc": new_state.last_changed.timestamp(),
+                    "s": "on",
+                },
+                "-": {"a": ["color"]},
+            }
+        }
+    }
+
+    hass.states.async_set("light.permitted", "on", {"brightness": 128})
+    await hass.async_block_till_done()
+    new_state = hass.states.get("light.permitted")
+
+    msg = await websocket_client.receive_json()
+    assert msg["event"] == {
+        "c": {
+            "light.permitted": {
+                "+": {
+                    "a": {"brightness": 128},
+                    "c": new_state.context.id,
+                    "lu": new_state.last_updated.timestamp(),
+                }
+            }
+        }
+    }
+
+    hass.states.async_remove("light.permitted")
+    await hass.async_block_till_done()
+
+    msg = await websocket_client.receive_json()
+    assert msg["event"] == {"r": ["light.permitted"]}
+
+
+async def test_subscribe_entities_all_allowed(hass, websocket_client, hass_admin_user):
+    """Test subscribe entities without entity filter only sends readable states."""
+    hass_admin_user.groups = []
+    hass_admin_user.mock_policy({"entities": {"entity_ids": {"light.permitted": True}}})
+    hass.states.async_set("light.not_permitted", "off")
+
+    await websocket_client.send_json({"id": 7, "type": "subscribe_entities"})
+
+    msg = await websocket_client.receive_json()
+    assert msg["success"]
+
+    msg = await websocket_client.receive_json()
+    assert msg["event"] == {"a": {}}
+
+    hass.states.async_set("light.not_permitted", "on")
+    hass.states.async_set("light.permitted", "on")
+    await hass.async_block_till_done()
+    state = hass.states.get("light.permitted")
+
+    msg = await websocket_client.receive_json()
+    assert msg["event"] == {
+        "a": {
+            "light.permitted": {
+                "a": {},
+                "c": state.context.id,
+                "lc": state.last_changed.timestamp(),
+                "s": "on",
+            }
+        }
+    }
+
+
+async def test_subscribe_entities_batched(hass, websocket_client):
+    """Test subscribe entities sends the states of a batch in one message."""
+    hass.states.async_set("light.kitchen", "off")
+    hass.states.async_set("light.bowl", "off")
+
+    await websocket_client.send_json({"id": 7, "type": "subscribe_entities"})
+
+    msg = await websocket_client.receive_json()
+    assert msg["success"]
+    msg = await websocket_client.receive_json()
+    assert set(msg["event"]["a"]) == {"light.kitchen", "light.bowl"}
+
+    hass.states.async_set_many(
+        [
+            ("light.kitchen", "on", None, False, None),
+            ("light.bowl", "off", None, False, None),
+            ("light.ceiling", "on", None, False, None),
+        ]
+    )
+    hass.states.async_remove("light.bowl")
+    await hass.async_block_till_done()
+    state = hass.states.get("light.ceiling")
+
+    msg = await websocket_client.receive_json()
+    assert msg["event"] == {
+        "a": {
+            "light.ceiling": {
+                "a": {},
+                "c": state.context.id,
+                "lc": state.last_changed.timestamp(),
+                "s": "on",
+            }
+        },
+        "c": {
+            "light.kitchen": {
+                "+": {
+                    "c": state.context.id,
+                    "lc": state.last_changed.timestamp(),
+                    "s": "on",
+                }
+            }
+        },
+    }
+
+    msg = await websocket_client.receive_json()
+    assert msg["event"] == {"r": ["light.bowl"]}
+
+
 async def test_get_states(hass, websocket_client):
     """Test get_states command."""
     hass.states.async_set("greeting.hello", "world")
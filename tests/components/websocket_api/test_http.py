@@ -80,3 +80,92 @@ async def test_non_json_message(hass, websocket_client, caplog):
         f"Unable to serialize to JSON. Bad data found at $.result[0](State: test_domain.entity).attributes.bad={bad_data}(<class 'object'>"
         in caplog.text
     )
+
+
+async def test_coalesce_messages(hass, websocket_client):
+    """Test queued messages are sent as one frame when the client supports it."""
+    await websocket_client.send_json(
+        {
+            "id": 1,
+            "type": "supported_features",
+            "features": {const.FEATURE_COALESCE_MESSAGES: 1},
+        }
+    )
+    msg = await websocket_client.receive_json()
+    assert msg["success"]
+
+    await websocket_client.send_json(
+        {"id": 2, "type": "subscribe_events", "event_type": "test_event"}
+    )
+    msg = await websocket_client.receive_json()
+    assert msg["success"]
+
+    for idx in range(3):
+        hass.bus.async_fire("test_event", {"idx": idx})
+
+    msg = await websocket_client.receive_json()
+    assert isinstance(msg, list)
+    assert [event["event"]["data"] for event in msg] == [
+        {"idx": 0},
+        {"idx": 1},
+        {"idx": 2},
+    ]
+
+    # A single queued message is not wrapped in an array
+    hass.bus.async_fire("test_event", {"idx": 3})
+    msg = await websocket_client.receive_json()
+    assert msg["event"]["data"] == {"idx": 3}
+
+
+async def test_coalesce_superseded_states(hass, websocket_client):
+    """Test pending state changes of an entity are replaced by newer ones."""
+    await websocket_client.send_json(
+        {
+            "id": 1,
+            "type": "supported_features",
+            "features": {const.FEATURE_COALESCE_MESSAGES: 1},
+        }
+    )
+    msg = await websocket_client.receive_json()
+    assert msg["success"]
+
+    await websocket_client.send_json(
+        {"id": 2, "type": "subscribe_events", "event_type": "state_changed"}
+    )
+    msg = await websocket_client.receive_json()
+    assert msg["success"]
+
+    hass.states.async_set("light.kitchen", "on")
+    hass.states.async_set("light.living_room", "on")
+    hass.states.async_set("light.kitchen", "off")
+    hass.states.async_set("light.kitchen", "on", {"brightness": 100})
+
+    msg = await websocket_client.receive_json()
+    assert [
+        (
+            event["event"]["data"]["entity_id"],
+            event["event"]["data"]["new_state"]["state"],
+            event["event"]["data"]["new_state"]["attributes"],
+        )
+        for event in msg
+    ] == [
+        ("light.kitchen", "on", {"brightness": 100}),
+        ("light.living_room", "on", {}),
+    ]
+
+
+async def test_no_coalesce_without_feature(hass, websocket_client):
+    """Test messages are sent one by one if the client did not enable it."""
+    await websocket_client.send_json(
+        {"id": 2, "type": "subscribe_events", "event_type": "state_changed"}
+    )
+    msg = await websocket_client.receive_json()
+    assert msg["success"]
+
+    hass.states.async_set("light.kitchen", "on")
+    hass.states.async_set("light.kitchen", "off")
+
+    msg = await websocket_client.receive_json()
+    assert msg["event"]["data"]["new_state"]["state"] == "on"
+    msg = await websocket_client.receive_json()
+    assert msg["event"]["data"]["new_state"]["state"] == "off"
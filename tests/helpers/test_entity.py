@@ -569,6 +569,30 @@ async def test_set_context_expired(hass):
     assert ent._context_set is None
 
 
+async def test_async_write_ha_states(hass):
+    """Test writing the state of multiple entities at once."""
+    context = Context()
+    entities = []
+    for idx in range(3):
+        ent = entity.Entity()
+        ent.hass = hass
+        ent.entity_id = f"hello.world_{idx}"
+        entities.append(ent)
+    entities[0].async_set_context(context)
+
+    entity.async_write_ha_states(hass, entities)
+
+    states = [hass.states.get(f"hello.world_{idx}") for idx in range(3)]
+    assert all(state.state == STATE_UNKNOWN for state in states)
+    assert states[0].context == context
+    assert states[1].context != context
+    assert states[1].context is states[2].context
+    assert states[0].last_updated == states[1].last_updated == states[2].last_updated
+
+    with pytest.raises(RuntimeError):
+        entity.async_write_ha_states(hass, [entity.Entity()])
+
+
 async def test_warn_disabled(hass, caplog):
     """Test we warn once if we write to a disabled entity."""
     entry = entity_registry.RegistryEntry(
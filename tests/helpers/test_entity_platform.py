@@ -105,6 +105,118 @@ async def test_polling_updates_entities_with_exception(hass):
     assert len(update_err) == 1
 
 
+async def test_polling_spreads_updates(hass):
+    """Test polled entities are updated at their own phase of the interval."""
+    component = EntityComponent(_LOGGER, DOMAIN, hass, timedelta(seconds=20))
+
+    updated = []
+    entities = []
+    for idx in range(4):
+        ent = MockEntity(should_poll=True, entity_id=f"{DOMAIN}.poll_{idx}")
+        ent.async_update = Mock(side_effect=lambda ent=ent: updated.append(ent))
+        entities.append(ent)
+
+    await component.async_add_entities(entities)
+    platform = entities[0].platform
+    now = hass.loop.time()
+    phases = {
+        entity_id: timer.when() - now
+        for entity_id, timer in platform._polling_timers.items()
+    }
+    assert len(set(phases.values())) == 4
+    assert all(0 < phase <= 20 for phase in phases.values())
+
+    first = min(phases, key=phases.get)
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=phases[first]))
+    await hass.async_block_till_done()
+    assert [ent.entity_id for ent in updated] == [first]
+
+    # The first entity is due again a full interval after it was due
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + timedelta(seconds=phases[first] + 20)
+    )
+    await hass.async_block_till_done()
+    assert {ent.entity_id for ent in updated} == set(phases)
+    assert len(updated) == 5
+    assert platform.polling_stats.updates == 5
+    assert platform.polling_stats.overruns == 0
+
+
+async def test_polling_keeps_phase_after_lag(hass):
+    """Test updates that started late do not move the phase of an entity."""
+    component = EntityComponent(_LOGGER, DOMAIN, hass, timedelta(seconds=20))
+    ent = MockEntity(should_poll=True, entity_id=f"{DOMAIN}.poll")
+    ent.async_update = Mock()
+    await component.async_add_entities([ent])
+    platform = ent.platform
+
+    timer = platform._polling_timers[ent.entity_id]
+    due = timer.when()
+    # The phase is on a grid of the interval shared by all platforms
+    assert due % 20 == pytest.approx(entity_platform._polling_phase(ent.entity_id, 20))
+
+    timer.cancel()
+    with patch.object(hass.loop, "time", return_value=due + 45):
+        platform._async_poll_entity(ent, due)
+    await hass.async_block_till_done()
+
+    # The updates missed while the loop lagged are skipped
+    assert platform._polling_timers[ent.entity_id].when() == due + 60
+    assert ent.async_update.called
+    assert platform.polling_stats.max_lag == 45
+
+
+async def test_polling_skips_entity_that_no_longer_polls(hass):
+    """Test an entity that no longer polls is updated again once it polls."""
+    component = EntityComponent(_LOGGER, DOMAIN, hass, timedelta(seconds=20))
+    ent = MockEntity(should_poll=True)
+    ent.async_update = Mock()
+    await component.async_add_entities([ent])
+
+    ent._values["should_poll"] = False
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=20))
+    await hass.async_block_till_done()
+
+    assert not ent.async_update.called
+    assert ent.entity_id in ent.platform._polling_timers
+
+    ent._values["should_poll"] = True
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=40))
+    await hass.async_block_till_done()
+
+    assert ent.async_update.called
+
+
+async def test_polling_overrun(hass, caplog):
+    """Test an update still running when the next one is due is skipped."""
+    component = EntityComponent(_LOGGER, DOMAIN, hass, timedelta(seconds=20))
+    update_started = asyncio.Event()
+    finish_update = asyncio.Event()
+
+    async def slow_update():
+        update_started.set()
+        await finish_update.wait()
+
+    ent = MockEntity(should_poll=True)
+    ent.async_update = slow_update
+    await component.async_add_entities([ent])
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=20))
+    await update_started.wait()
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=40))
+    await asyncio.sleep(0)
+
+    stats = ent.platform.polling_stats
+    assert stats.updates == 1
+    assert stats.overruns == 1
+    assert stats.max_lag >= stats.average_lag >= 0
+    assert "took longer than the scheduled update interval" in caplog.text
+
+    finish_update.set()
+    await hass.async_block_till_done()
+    assert ent.platform._polling_updates == set()
+
+
 async def test_update_state_adds_entities(hass):
     """Test if updating poll entities cause an entity to be added works."""
     component = EntityComponent(_LOGGER, DOMAIN, hass)
@@ -150,8 +262,11 @@ async def test_update_state_adds_entities_with_update_before_add_false(hass):
     assert not ent.update.called
 
 
-@patch("homeassistant.helpers.entity_platform.async_track_time_interval")
-async def test_set_scan_interval_via_platform(mock_track, hass):
+@patch(
+    "homeassistant.helpers.entity_platform._polling_phase",
+    wraps=entity_platform._polling_phase,
+)
+async def test_set_scan_interval_via_platform(mock_phase, hass):
     """Test the setting of the scan interval via platform."""
 
     def platform_setup(hass, config, add_entities, discovery_info=None):
@@ -168,8 +283,8 @@ async def test_set_scan_interval_via_platform(mock_track, hass):
     component.setup({DOMAIN: {"platform": "platform"}})
 
     await hass.async_block_till_done()
-    assert mock_track.called
-    assert timedelta(seconds=30) == mock_track.call_args[0][2]
+    assert mock_phase.called
+    assert mock_phase.call_args[0][1] == 30
 
 
 async def test_adding_entities_with_generator_and_thread_callback(hass):
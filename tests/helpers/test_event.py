@@ -1968,6 +1968,95 @@ async def test_track_template_result_refresh_cancel(hass):
     assert refresh_runs == ["duck"]
 
 
+async def test_async_track_template_result_skips_unchanged_states(hass):
+    """Test templates are not rendered when the states they read did not change."""
+    hass.states.async_set("sensor.test", "1")
+    template_state = Template("{{ states.sensor.test.state }}", hass)
+    template_updated = Template("{{ states.sensor.test.last_updated }}", hass)
+
+    refresh_runs = []
+
+    @ha.callback
+    def refresh_listener(event, updates):
+        refresh_runs.append([update.template for update in updates])
+
+    info = async_track_template_result(
+        hass,
+        [TrackTemplate(template_state, None), TrackTemplate(template_updated, None)],
+        refresh_listener,
+    )
+
+    hass.states.async_set("sensor.test", "1", force_update=True)
+    await hass.async_block_till_done()
+    hass.states.async_set("sensor.test", "1", {"unit": "x"})
+    await hass.async_block_till_done()
+
+    assert refresh_runs == [[template_updated], [template_updated]]
+    assert info.render_stats[template_state].hits == 2
+    assert info.render_stats[template_state].misses == 0
+
+    hass.states.async_set("sensor.test", "2")
+    await hass.async_block_till_done()
+
+    assert refresh_runs[-1] == [template_state, template_updated]
+    assert info.render_stats[template_state].hits == 2
+    assert info.render_stats[template_state].misses == 1
+    assert info.render_stats[template_state].hit_rate == pytest.approx(2 / 3)
+    assert info.render_stats[template_updated].hits == 0
+    assert info.render_stats[template_updated].misses == 3
+
+
+async def test_async_track_template_result_renders_expand(hass):
+    """Test templates reading states through expand are rendered on changes."""
+    hass.states.async_set("sensor.a", "1")
+    template = Template("{{ expand('sensor.a') | first }}", hass)
+
+    refresh_runs = []
+
+    @ha.callback
+    def refresh_listener(event, updates):
+        refresh_runs.append(hass.states.get("sensor.a").state)
+
+    async_track_template_result(hass, [TrackTemplate(template, None)], refresh_listener)
+
+    hass.states.async_set("sensor.a", "2")
+    await hass.async_block_till_done()
+    hass.states.async_set("sensor.a", "3")
+    await hass.async_block_till_done()
+
+    assert refresh_runs == ["2", "3"]
+
+
+async def test_async_track_template_result_renders_uncacheable_templates(hass):
+    """Test templates that depend on more than the states they read are rendered."""
+    hass.states.async_set("sensor.test", "1")
+    templates = [
+        Template("{{ states.sensor.test.state }} {{ [1, 2] | random }}", hass),
+        Template("{{ states.sensor.test.state }} {{ lipsum(n=1) }}", hass),
+        Template("{{ states.sensor.test.state }} {{ device_entities('abc') }}", hass),
+    ]
+    for template in templates:
+        assert not template.async_render_to_info().cacheable
+    assert (
+        Template("{{ states.sensor.test.state }}", hass)
+        .async_render_to_info()
+        .cacheable
+    )
+
+    info = async_track_template_result(
+        hass,
+        [TrackTemplate(template, None) for template in templates],
+        ha.callback(lambda event, updates: None),
+    )
+
+    hass.states.async_set("sensor.test", "1", {"unit": "x"})
+    await hass.async_block_till_done()
+
+    for template in templates:
+        assert info.render_stats[template].hits == 0
+        assert info.render_stats[template].misses == 1
+
+
 async def test_async_track_template_result_multiple_templates(hass):
     """Test tracking multiple templates."""
 
@@ -1,10 +1,18 @@
 """Test Home Assistant remote methods and classes."""
 from datetime import timedelta
+import json
+import math
+from types import MappingProxyType
 
 import pytest
 
 from homeassistant import core
-from homeassistant.helpers.json import ExtendedJSONEncoder, JSONEncoder
+from homeassistant.helpers.json import (
+    ExtendedJSONEncoder,
+    JSONEncoder,
+    json_dumps,
+    json_encoder_default,
+)
 from homeassistant.util import dt as dt_util
 
 
@@ -29,6 +37,38 @@ def test_json_encoder(hass):
         ha_json_enc.default(1)
 
 
+def test_json_encoder_default(hass):
+    """Test converting Home Assistant objects."""
+    state = core.State("test.test", "hello", {"milk": "beer"})
+    event = core.Event("test_event", {"state": state})
+    now = dt_util.utcnow()
+
+    assert json_encoder_default(now) == now.isoformat()
+    assert json_encoder_default({"milk"}) == ["milk"]
+    assert json_encoder_default(state.attributes) == {"milk": "beer"}
+    assert json_encoder_default(state) == state.as_dict()
+    assert json_encoder_default(event) == event.as_dict()
+    # Again to use the cached conversion of the type
+    assert json_encoder_default(state) is state.as_dict()
+
+    with pytest.raises(TypeError):
+        json_encoder_default(object())
+
+
+def test_json_dumps(hass):
+    """Test serializing with json_dumps."""
+    state = core.State("test.test", "hello", {"milk": "beer"})
+    event = core.Event("test_event", {"state": state, "time": dt_util.utcnow()})
+    data = {"event": event, "attributes": MappingProxyType({"milk": "beer"})}
+
+    assert json_dumps(data) == json.dumps(data, cls=JSONEncoder)
+    assert json_dumps(math.nan) == "NaN"
+    with pytest.raises(ValueError):
+        json_dumps(math.nan, allow_nan=False)
+    with pytest.raises(TypeError):
+        json_dumps(object())
+
+
 def test_trace_json_encoder(hass):
     """Test the Trace JSON Encoder."""
     ha_json_enc = ExtendedJSONEncoder()
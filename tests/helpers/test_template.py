@@ -2,7 +2,7 @@
 from datetime import datetime
 import math
 import random
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 import pytest
 import voluptuous as vol
@@ -191,6 +191,29 @@ def test_iterating_domain_states(hass):
     )
 
 
+def test_iterating_states_reuses_template_states(hass):
+    """Test iterating states only wraps new and changed states."""
+    hass.states.async_set("sensor.back_door", "open")
+    hass.states.async_set("sensor.temperature", 10)
+
+    first = list(template.AllStates(hass))
+    assert [state.entity_id for state in first] == [
+        "sensor.back_door",
+        "sensor.temperature",
+    ]
+    assert list(template.AllStates(hass)) == first
+    assert all(
+        reused is wrapper
+        for reused, wrapper in zip(template.AllStates(hass).sensor, first)
+    )
+
+    hass.states.async_set("sensor.temperature", 11)
+    second = list(template.AllStates(hass))
+    assert second[0] is first[0]
+    assert second[1] is not first[1]
+    assert second[1].state == "11"
+
+
 def test_float(hass):
     """Test float."""
     hass.states.async_set("sensor.temperature", "12")
@@ -741,6 +764,25 @@ def test_render_with_possible_json_value_with_valid_json(hass):
     assert tpl.async_render_with_possible_json_value('{"hello": "world"}') == "world"
 
 
+def test_render_with_possible_json_value_with_parse_json(hass):
+    """Render with possible JSON value parsed by the caller."""
+    tpl = template.Template("{{ value_json.hello }}", hass)
+    parse_json = Mock(return_value={"hello": "parsed"})
+    assert (
+        tpl.async_render_with_possible_json_value(
+            '{"hello": "world"}', parse_json=parse_json
+        )
+        == "parsed"
+    )
+    assert len(parse_json.mock_calls) == 1
+
+    parse_json = Mock(side_effect=ValueError)
+    tpl = template.Template("{{ value_json }}", hass)
+    assert (
+        tpl.async_render_with_possible_json_value("hello", parse_json=parse_json) == ""
+    )
+
+
 def test_render_with_possible_json_value_with_invalid_json(hass):
     """Render with possible JSON value with invalid JSON."""
     tpl = template.Template("{{ value_json }}", hass)
@@ -1132,6 +1174,87 @@ def test_regex_findall_index(hass):
     assert tpl.async_render() == "LHR"
 
 
+def test_filter_cache_info(hass):
+    """Test compiled patterns and parsed times are cached."""
+    before = template.filter_cache_info()
+    tpl = template.Template(
+        "{{ value | regex_search('f[a-z]+', ignorecase=True) }}"
+        "{{ strptime(value, '%Y-%m-%d') }}",
+        hass,
+    )
+    assert tpl.async_render({"value": "2021-07-24"}) == "False2021-07-24 00:00:00"
+    assert tpl.async_render({"value": "2021-07-24"}) == "False2021-07-24 00:00:00"
+
+    info = template.filter_cache_info()
+    assert info["regex"]["hits"] >= before["regex"]["hits"] + 1
+    assert info["strptime"]["hits"] >= before["strptime"]["hits"] + 1
+    assert info["regex"]["maxsize"] == template.FILTER_CACHE_SIZE
+    assert info["strptime"]["currsize"] <= template.FILTER_CACHE_SIZE
+
+
+@pytest.mark.parametrize(
+    "template_str,fast",
+    [
+        ("{{ states('sensor.power') | float * 2 }}", True),
+        ("{{ states('sensor.power') | float * 2 }} W", True),
+        ("{{ (states('sensor.unknown') | float(5) / 3) | round(2) }}", True),
+        ("{{ state_attr('light.bowl', 'brightness') > 50 }}", True),
+        ("{{ is_state('light.bowl', 'on') and 1 < 2 < 3 }}", True),
+        ("{{ 'yes' if states('light.bowl') in ['on', 'home'] else 'no' }}", True),
+        ("{{ value | int + 1 }}", True),
+        ("{{ missing }}", True),
+        ("{{ states.sensor.power.state }}", False),
+        ("{% if is_state('light.bowl', 'on') %}on{% endif %}", False),
+        ("{{ states('sensor.power') | replace('.', ',') }}", False),
+        ("{{ states('sensor.power') is defined }}", False),
+    ],
+)
+def test_fast_render(hass, template_str, fast):
+    """Test simple templates are rendered without Jinja with the same result."""
+    hass.states.async_set("sensor.power", "21.5")
+    hass.states.async_set("light.bowl", "on", {"brightness": 100})
+
+    tpl = template.Template(template_str, hass)
+    tpl.ensure_valid()
+    assert (tpl._fast_render is not None) is fast
+
+    info = render_to_info(hass, template_str, {"value": "3"})
+    jinja_tpl = template.Template(template_str, hass)
+    jinja_tpl.ensure_valid()
+    jinja_tpl._fast_render = None
+    jinja_info = jinja_tpl.async_render_to_info({"value": "3"})
+
+    assert info.result() == jinja_info.result()
+    assert info.entities == jinja_info.entities
+
+
+def test_fast_render_shadowed_global(hass):
+    """Test a variable shadowing a called global is rendered by Jinja."""
+    tpl = template.Template("{{ states('sensor.power') }}", hass)
+    tpl.ensure_valid()
+    assert tpl._fast_render is not None
+
+    with pytest.raises(TemplateError):
+        tpl.async_render({"states": "not callable"})
+
+
+def test_fast_render_limited(hass):
+    """Test the fast render path keeps hass functions unsupported in limited templates."""
+    tpl = template.Template("{{ states('sensor.power') }}", hass)
+    with pytest.raises(TemplateError):
+        tpl.async_render(limited=True)
+
+
+def test_fast_render_filters_do_not_need_context(hass):
+    """Test the filters called by the fast render path do not need a context."""
+    env = template.TemplateEnvironment(hass)
+    for name in template._FAST_RENDER_FILTERS:
+        assert getattr(env.filters[name], "jinja_pass_arg", None) is None
+    for name in template._FAST_RENDER_GLOBALS - template._FAST_RENDER_HASS_GLOBALS:
+        if name != "states":
+            assert getattr(env.globals[name], "jinja_pass_arg", None) is None
+
+
 def test_bitwise_and(hass):
     """Test bitwise_and method."""
     tpl = template.Template(
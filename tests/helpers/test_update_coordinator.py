@@ -12,7 +12,7 @@ import requests
 from homeassistant import config_entries
 from homeassistant.const import EVENT_HOMEASSISTANT_STOP
 from homeassistant.core import CoreState
-from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.exceptions import ConfigEntryAuthFailed, ConfigEntryNotReady
 from homeassistant.helpers import update_coordinator
 from homeassistant.util.dt import utcnow
 
@@ -381,3 +381,135 @@ async def test_not_schedule_refresh_if_system_option_disable_polling(hass):
     crd = get_crd(hass, DEFAULT_UPDATE_INTERVAL)
     crd.async_add_listener(lambda: None)
     assert crd._unsub_refresh is None
+
+
+async def test_refresh_shares_fetch_in_flight(hass, crd):
+    """Test concurrent refreshes await the fetch already in flight."""
+    fetching = asyncio.Event()
+    release = asyncio.Event()
+    calls = 0
+
+    async def refresh() -> int:
+        nonlocal calls
+        calls += 1
+        fetching.set()
+        await release.wait()
+        return calls
+
+    crd.update_method = refresh
+    update_callback = Mock()
+    crd.async_add_listener(update_callback)
+
+    first = hass.async_create_task(crd.async_refresh())
+    await fetching.wait()
+    second = hass.async_create_task(crd.async_refresh())
+    await asyncio.sleep(0)
+
+    # A scheduled refresh is skipped while the fetch is in flight
+    await crd._handle_refresh_interval(utcnow())
+
+    release.set()
+    await asyncio.gather(first, second)
+
+    assert calls == 1
+    assert crd.data == 1
+    assert update_callback.call_count == 1
+    assert crd.stats.fetches == 1
+    assert crd.stats.shared == 1
+    assert crd.stats.skipped == 1
+    assert crd._unsub_refresh is not None
+
+    await crd.async_refresh()
+    assert calls == 2
+
+
+async def test_refresh_shares_fetch_auth_failed(hass, crd):
+    """Test auth failures are raised to callers sharing a fetch that asked for it."""
+    release = asyncio.Event()
+
+    async def refresh() -> int:
+        await release.wait()
+        raise ConfigEntryAuthFailed
+
+    crd.update_method = refresh
+
+    first = hass.async_create_task(crd.async_refresh())
+    await asyncio.sleep(0)
+    second = hass.async_create_task(
+        crd._async_refresh(log_failures=False, raise_on_auth_failed=True)
+    )
+    await asyncio.sleep(0)
+
+    release.set()
+    await first
+    with pytest.raises(ConfigEntryAuthFailed):
+        await second
+
+
+async def test_refresh_backoff(hass, crd):
+    """Test the refresh interval backs off on repeated failures and recovers."""
+    crd.update_method = AsyncMock(side_effect=update_coordinator.UpdateFailed)
+    crd.async_add_listener(Mock())
+
+    # The first failure is retried at the update interval
+    await crd.async_refresh()
+    assert crd.stats.consecutive_failures == 1
+    assert crd.refresh_interval == DEFAULT_UPDATE_INTERVAL
+
+    async_fire_time_changed(hass, utcnow() + DEFAULT_UPDATE_INTERVAL)
+    await hass.async_block_till_done()
+    assert crd.update_method.call_count == 2
+    assert crd.refresh_interval == DEFAULT_UPDATE_INTERVAL * 2
+
+    # Backed off, no refresh after the update interval
+    async_fire_time_changed(hass, utcnow() + DEFAULT_UPDATE_INTERVAL)
+    await hass.async_block_till_done()
+    assert crd.update_method.call_count == 2
+
+    async_fire_time_changed(hass, utcnow() + DEFAULT_UPDATE_INTERVAL * 2)
+    await hass.async_block_till_done()
+    assert crd.update_method.call_count == 3
+    assert crd.refresh_interval == DEFAULT_UPDATE_INTERVAL * 4
+
+    crd.stats.consecutive_failures = 100
+    assert crd.refresh_interval == update_coordinator.REFRESH_BACKOFF_MAX_INTERVAL
+
+    crd.update_method = AsyncMock(return_value=1)
+    await crd.async_refresh()
+    assert crd.stats.consecutive_failures == 0
+    assert crd.stats.failures == 3
+    assert crd.refresh_interval == DEFAULT_UPDATE_INTERVAL
+
+    async_fire_time_changed(hass, utcnow() + DEFAULT_UPDATE_INTERVAL)
+    await hass.async_block_till_done()
+    assert crd.update_method.call_count == 2
+
+
+async def test_refresh_stats(crd):
+    """Test the fetch duration histogram of the statistics."""
+    with patch(
+        "homeassistant.helpers.update_coordinator.monotonic",
+        side_effect=[0, 0.05, 10, 13, 100, 200],
+    ):
+        await crd.async_refresh()
+        await crd.async_refresh()
+        await crd.async_refresh()
+
+    assert crd.stats.as_dict() == {
+        "fetches": 3,
+        "failures": 0,
+        "consecutive_failures": 0,
+        "shared": 0,
+        "skipped": 0,
+        "fetch_durations": {
+            "0.1": 1,
+            "0.25": 0,
+            "0.5": 0,
+            "1.0": 0,
+            "2.5": 0,
+            "5.0": 1,
+            "10.0": 0,
+            "30.0": 0,
+            "+Inf": 1,
+        },
+    }
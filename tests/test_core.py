@@ -3,6 +3,7 @@
 import asyncio
 from datetime import datetime, timedelta
 import functools
+import json
 import logging
 import os
 from tempfile import TemporaryDirectory
@@ -33,11 +34,13 @@ from homeassistant.const import (
 )
 import homeassistant.core as ha
 from homeassistant.exceptions import (
+    HomeAssistantError,
     InvalidEntityFormatError,
     InvalidStateError,
     MaxLengthExceeded,
     ServiceNotFound,
 )
+from homeassistant.helpers.json import JSONEncoder
 import homeassistant.util.dt as dt_util
 from homeassistant.util.unit_system import METRIC_SYSTEM
 
@@ -383,6 +386,51 @@ def test_state_as_dict():
     assert state.as_dict() is state.as_dict()
 
 
+def test_state_as_dict_json():
+    """Test a State as JSON."""
+    last_time = datetime(1984, 12, 8, 12, 0, 0)
+    state = ha.State(
+        "happy.happy",
+        "on",
+        {"pig": "dog"},
+        last_updated=last_time,
+        last_changed=last_time,
+    )
+    assert json.loads(state.as_dict_json()) == state.as_dict()
+    # 2nd time to verify cache
+    assert state.as_dict_json() is state.as_dict_json()
+
+    state = ha.State("happy.happy", "on", {"bad": object()})
+    with pytest.raises(TypeError):
+        state.as_dict_json()
+
+
+def test_event_as_dict_json():
+    """Test an Event as JSON."""
+    old_state = ha.State("light.null", "off")
+    new_state = ha.State("light.null", "on", {"brightness": 10})
+    event = ha.Event(
+        EVENT_STATE_CHANGED,
+        {"entity_id": "light.null", "old_state": old_state, "new_state": new_state},
+    )
+    expected = json.loads(json.dumps(event.as_dict(), cls=JSONEncoder))
+    assert json.loads(ha.event_as_dict_json(event)) == expected
+
+    event.data["old_state"] = None
+    assert json.loads(ha.event_as_dict_json(event))["data"]["old_state"] is None
+
+    event = ha.Event("some_event", {"value": 1})
+    assert json.loads(ha.event_as_dict_json(event)) == event.as_dict()
+
+    # The regular encoder serializes states the cache can not
+    new_state = ha.State("light.null", "on", {"brightness": float("nan")})
+    event = ha.Event(
+        EVENT_STATE_CHANGED,
+        {"entity_id": "light.null", "old_state": None, "new_state": new_state},
+    )
+    assert "NaN" in ha.event_as_dict_json(event)
+
+
 async def test_eventbus_add_remove_listener(hass):
     """Test remove_listener method."""
     old_count = len(hass.bus.async_listeners())
@@ -431,6 +479,119 @@ async def test_eventbus_filtered_listener(hass):
     unsub()
 
 
+async def test_eventbus_entity_ids_listener(hass):
+    """Test we can listen for events indexed by entity_id."""
+    calls = []
+    filtered = []
+
+    @ha.callback
+    def listener(event):
+        """Mock listener."""
+        calls.append(event)
+
+    @ha.callback
+    def filter(event):
+        """Mock filter."""
+        filtered.append(event)
+        return event.data.get("pass", True)
+
+    old_count = hass.bus.async_listeners().get("test", 0)
+    unsub = hass.bus.async_listen(
+        "test", listener, event_filter=filter, entity_ids=["Light.Kitchen", "light.bed"]
+    )
+    assert hass.bus.async_listeners()["test"] == old_count + 2
+
+    hass.bus.async_fire("test", {"entity_id": "light.other"})
+    hass.bus.async_fire("test", {"other": "light.kitchen"})
+    hass.bus.async_fire("test")
+    await hass.async_block_till_done()
+
+    assert len(calls) == 0
+    assert len(filtered) == 0
+
+    hass.bus.async_fire("test", {"entity_id": "light.kitchen"})
+    hass.bus.async_fire("test", {"entity_id": "light.bed", "pass": False})
+    await hass.async_block_till_done()
+
+    assert len(calls) == 1
+    assert calls[0].data["entity_id"] == "light.kitchen"
+    assert len(filtered) == 2
+
+    unsub()
+    assert hass.bus.async_listeners().get("test", 0) == old_count
+
+    hass.bus.async_fire("test", {"entity_id": "light.kitchen"})
+    await hass.async_block_till_done()
+
+    assert len(calls) == 1
+
+    with pytest.raises(HomeAssistantError):
+        hass.bus.async_listen(MATCH_ALL, listener, entity_ids="light.kitchen")
+
+
+async def test_eventbus_match_all_dispatch(hass):
+    """Test match all listeners are added to and removed from the dispatch index."""
+    calls = []
+
+    @ha.callback
+    def listener(event):
+        """Mock listener."""
+        calls.append(event.event_type)
+
+    unsub_test = hass.bus.async_listen("test", listener)
+    unsub_all = hass.bus.async_listen(MATCH_ALL, listener)
+
+    hass.bus.async_fire("test")
+    hass.bus.async_fire("no_specific_listeners")
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_CLOSE)
+    await hass.async_block_till_done()
+
+    assert calls == ["test", "test", "no_specific_listeners"]
+
+    calls.clear()
+    unsub_all()
+    hass.bus.async_fire("test")
+    hass.bus.async_fire("no_specific_listeners")
+    await hass.async_block_till_done()
+
+    assert calls == ["test"]
+    unsub_test()
+
+
+async def test_eventbus_dispatch_index_invalidated(hass):
+    """Test listeners added after an event was fired receive the next events."""
+    calls = []
+
+    @ha.callback
+    def listener(event):
+        """Mock listener."""
+        calls.append(event.data.get("entity_id"))
+
+    hass.bus.async_fire("test", {"entity_id": "light.kitchen"})
+    unsub_test = hass.bus.async_listen("test", listener)
+    unsub_entity = hass.bus.async_listen("test", listener, entity_ids="light.kitchen")
+    hass.bus.async_fire("test", {"entity_id": "light.kitchen"})
+    await hass.async_block_till_done()
+
+    assert calls == ["light.kitchen", "light.kitchen"]
+
+    calls.clear()
+    unsub_entity()
+    unsub_all = hass.bus.async_listen(MATCH_ALL, listener)
+    hass.bus.async_fire("test", {"entity_id": "light.kitchen"})
+    await hass.async_block_till_done()
+
+    assert calls == ["light.kitchen", "light.kitchen"]
+
+    calls.clear()
+    unsub_all()
+    unsub_test()
+    hass.bus.async_fire("test", {"entity_id": "light.kitchen"})
+    await hass.async_block_till_done()
+
+    assert calls == []
+
+
 async def test_eventbus_unsubscribe_listener(hass):
     """Test unsubscribe listener from returned function."""
     calls = []
@@ -687,6 +848,46 @@ async def test_statemachine_remove(hass):
     assert len(events) == 1
 
 
+async def test_statemachine_all_sorted(hass):
+    """Test states are returned sorted by entity id."""
+    hass.states.async_set("light.kitchen", "on")
+    hass.states.async_set("light_switch.bowl", "off")
+    hass.states.async_set("light.bowl", "on")
+    hass.states.async_set("switch.ac", "off")
+    hass.states.async_set("light.attic", "off")
+
+    assert [state.entity_id for state in hass.states.async_all_sorted()] == [
+        "light.attic",
+        "light.bowl",
+        "light.kitchen",
+        "light_switch.bowl",
+        "switch.ac",
+    ]
+    assert [state.entity_id for state in hass.states.async_all_sorted("light")] == [
+        "light.attic",
+        "light.bowl",
+        "light.kitchen",
+    ]
+    assert hass.states.async_all_sorted("unknown") == []
+
+    # Updates keep the order and return the new state
+    hass.states.async_set("light.bowl", "off")
+    assert [state.state for state in hass.states.async_all_sorted("light")] == [
+        "off",
+        "off",
+        "on",
+    ]
+
+    hass.states.async_remove("light.bowl")
+    hass.states.async_remove("switch.ac")
+    assert [state.entity_id for state in hass.states.async_all_sorted()] == [
+        "light.attic",
+        "light.kitchen",
+        "light_switch.bowl",
+    ]
+    assert hass.states.async_all_sorted("switch") == []
+
+
 async def test_statemachine_case_insensitivty(hass):
     """Test insensitivty."""
     events = async_capture_events(hass, EVENT_STATE_CHANGED)
@@ -728,6 +929,69 @@ async def test_statemachine_force_update(hass):
     assert len(events) == 1
 
 
+async def test_statemachine_set_many(hass):
+    """Test setting multiple states at once."""
+    hass.states.async_set("light.bowl", "on", {"brightness": 100})
+    events = async_capture_events(hass, EVENT_STATE_CHANGED)
+    batches = []
+
+    @ha.callback
+    def batch_listener(batch):
+        """Mock batch listener."""
+        batches.append(batch)
+
+    unsub = hass.states.async_listen_batched(batch_listener)
+    own_context = ha.Context()
+
+    hass.states.async_set_many(
+        [
+            ("light.bowl", "on", {"brightness": 100}, False, None),
+            ("light.Kitchen", "off", None, False, None),
+            ("switch.ac", "on", {}, False, own_context),
+            ("sensor.temp", "21", {"unit": "C"}, False, None),
+        ]
+    )
+    await hass.async_block_till_done()
+
+    assert len(events) == 3
+    assert len(batches) == 1
+    assert all(event is batch for event, batch in zip(events, batches[0]))
+    assert [event.data["entity_id"] for event in batches[0]] == [
+        "light.kitchen",
+        "switch.ac",
+        "sensor.temp",
+    ]
+
+    kitchen = hass.states.get("light.kitchen")
+    ac_state = hass.states.get("switch.ac")
+    temp = hass.states.get("sensor.temp")
+    assert kitchen.last_updated == temp.last_updated == ac_state.last_updated
+    assert kitchen.context is temp.context
+    assert ac_state.context is own_context
+    assert events[0].time_fired == kitchen.last_updated
+
+    hass.states.async_set("light.bowl", "off")
+    hass.states.async_remove("switch.ac")
+    await hass.async_block_till_done()
+
+    assert len(batches) == 3
+    assert batches[1] == [events[3]]
+    assert batches[1][0] is events[3]
+    assert batches[1][0].data["new_state"].state == "off"
+    assert batches[2][0] is events[4]
+    assert batches[2][0].data["new_state"] is None
+
+    unsub()
+    hass.states.async_set_many([("light.bowl", "on", None, False, None)])
+    await hass.async_block_till_done()
+
+    assert len(batches) == 3
+    assert len(events) == 6
+
+    with pytest.raises(HomeAssistantError):
+        hass.states.async_listen_batched(lambda batch: None)
+
+
 def test_service_call_repr():
     """Test ServiceCall repr."""
     call = ha.ServiceCall("homeassistant", "start")